@@ -1,20 +1,97 @@
+import asyncio
+from collections import Counter, deque
+from collections.abc import AsyncIterator, Hashable, Iterable, Iterator
+from contextlib import ExitStack, contextmanager
 from pathlib import Path
+from types import TracebackType
+from typing import Any, Self
 
 from loguru import logger
 
+from .cache import ParseCache
+from .config import GlobalConfig
 from .errors import ParseError, UnknownPlatform
 from .parsers.base import BaseParser
+from .parsers.lazy import ParserLike, get_lazy_registry
+from .parsers.router import ParserRouter
 from .types import Platform
-from .types.callback import ProgressCallback
+from .types.callback import ProgressCallback, ProgressUnit
 from .types.result import AnyParseResult, DownloadResult
+from .utils.http_client import HttpClientPool, use_http_pool
+from .utils.progress import ProgressListener
+from .utils.singleflight import SingleFlight
 from .utils.utils import run_sync
 
 logger.disable(__name__)
 
 
+@contextmanager
+def _wrap_parse_error() -> Iterator[None]:
+    """将解析器抛出的未知异常统一包装为 ParseError"""
+    try:
+        yield
+    except ParseError:
+        raise
+    except Exception as e:
+        raise ParseError(str(e)) from e
+
+
 class ParseHub:
-    def __init__(self) -> None:
-        self.parsers: list[type[BaseParser]] = BaseParser.get_registry()
+    def __init__(self, *, cache: ParseCache | None = None) -> None:
+        """
+        :param cache: 解析结果缓存, 默认不缓存
+        """
+        self.cache = cache
+        self._router: ParserRouter | None = None
+        self.parsers = get_lazy_registry()
+        self.http: HttpClientPool | None = None
+        """HTTP 客户端池, 仅在 ``async with ParseHub() as hub:`` 期间可用"""
+        self._http_ctx: ExitStack | None = None
+        self._parse_flight = SingleFlight()
+        self._download_flight = SingleFlight()
+        self._download_listeners: dict[Hashable, list[ProgressListener]] = {}
+
+    @property
+    def parsers(self) -> list[ParserLike]:
+        """解析器注册表, 内置解析器为 LazyParser, 路由命中后才导入"""
+        return self._parsers
+
+    @parsers.setter
+    def parsers(self, parsers: list[ParserLike]) -> None:
+        self._parsers = parsers
+        self._router = None
+
+    @property
+    def router(self) -> ParserRouter:
+        """解析器路由, 在首次使用时根据 parsers 构建"""
+        if self._router is None:
+            self._router = ParserRouter(self._parsers)
+        return self._router
+
+    async def __aenter__(self) -> Self:
+        """启用共享的 HTTP 客户端池, 在 async with 块内的解析和下载会复用连接"""
+        if self.http is None:
+            self.http = HttpClientPool()
+            self._http_ctx = ExitStack()
+            self._http_ctx.enter_context(use_http_pool(self.http))
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """关闭 HTTP 客户端池"""
+        if self._http_ctx is not None:
+            self._http_ctx.close()
+            self._http_ctx = None
+        if self.http is not None:
+            await self.http.aclose()
+            self.http = None
 
     async def parse(self, url: str, *, proxy: str | None = None, cookie: str | dict | None = None) -> AnyParseResult:
         """解析
@@ -23,16 +100,34 @@ class ParseHub:
         :param cookie: cookie
         :return: AnyParseResult
         """
-        parser = self.get_parser(url)
-        if not parser:
+        if not (routed := self.route(url)):
             raise UnknownPlatform(url)
-        try:
+        return await self._parse_routed(*routed, proxy=proxy, cookie=cookie)
+
+    async def _parse_routed(
+        self, parser: type[BaseParser], url: str, *, proxy: str | None, cookie: str | dict | None
+    ) -> AnyParseResult:
+        p, raw_url = await self._resolve(parser, url, proxy=proxy, cookie=cookie)
+        return await self._parse_raw(p, raw_url)
+
+    async def _resolve(
+        self, parser: type[BaseParser], url: str, *, proxy: str | None, cookie: str | dict | None
+    ) -> tuple[BaseParser, str]:
+        """创建解析器实例并获取原始链接"""
+        with _wrap_parse_error(), use_http_pool(self.http):
             p = parser(proxy=proxy, cookie=cookie)
-            return await p.parse(url)
-        except ParseError:
-            raise
-        except Exception as e:
-            raise ParseError(str(e)) from e
+            return p, await p.get_raw_url(url, clean_all=False)
+
+    async def _parse_raw(self, parser: BaseParser, raw_url: str) -> AnyParseResult:
+        """解析原始链接, 同一链接的并发解析只会请求一次"""
+
+        async def run() -> AnyParseResult:
+            with _wrap_parse_error(), use_http_pool(self.http):
+                if self.cache is not None:
+                    return await self.cache.parse_raw_url(parser, raw_url)
+                return await parser.parse_raw_url(raw_url)
+
+        return await self._parse_flight.do(parser.request_key(raw_url), run)
 
     def parse_sync(self, url: str, *, proxy: str | None = None, cookie: str | dict | None = None) -> AnyParseResult:
         """
@@ -44,6 +139,167 @@ class ParseHub:
         """
         return run_sync(self.parse(url, proxy=proxy, cookie=cookie))
 
+    async def parse_many(
+        self,
+        urls: Iterable[str],
+        *,
+        concurrency: int = 16,
+        per_platform_limit: int | None = 4,
+        ordered: bool = False,
+        proxy: str | None = None,
+        cookie: str | dict | None = None,
+    ) -> AsyncIterator[tuple[str, AnyParseResult | Exception]]:
+        """批量解析
+        :param urls: 分享文案 / 分享链接, 按需读取, 可以是生成器等惰性的可迭代对象
+        :param concurrency: 全局最大并发数
+        :param per_platform_limit: 单个平台的最大并发数, 为 None 时不限制
+        :param ordered: 按输入顺序产出结果, 默认按完成顺序产出
+        :param proxy: 代理
+        :param cookie: cookie
+        :return: 异步迭代器, 产出 (输入, 解析结果或异常);
+            提前结束迭代时请关闭迭代器 (如 ``contextlib.aclosing``), 以取消未完成的任务
+
+        Example:
+            ::
+
+                async for url, result in ph.parse_many(urls, concurrency=32, per_platform_limit=4):
+                    if isinstance(result, Exception):
+                        print(f"{url} 解析失败: {result}")
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency 必须大于 0")
+        if per_platform_limit is not None and per_platform_limit < 1:
+            raise ValueError("per_platform_limit 必须大于 0")
+
+        # 固定数量的 worker 从输入中按需取出链接, 不预先为每个链接创建任务.
+        # 平台名额已满的链接暂存起来, 先处理后面其他平台的链接; 暂存的链接数和有序模式下领先于
+        # 下一个待产出结果的链接数都不超过 lookahead, 内存占用不随输入长度增长
+        lookahead = concurrency * 4
+        items = iter(urls)
+        pulled = 0
+        exhausted = False
+        pending: dict[Platform | None, deque[tuple[int, str, type[BaseParser], str]]] = {}
+        pending_count = 0
+        running: Counter[Platform | None] = Counter()
+        changed = asyncio.Condition()
+        next_index = 0
+        done: asyncio.Queue[tuple[int, str, AnyParseResult | Exception] | None] = asyncio.Queue(concurrency)
+
+        def has_room(platform: Platform | None) -> bool:
+            return per_platform_limit is None or platform is None or running[platform] < per_platform_limit
+
+        def take() -> tuple[int, str, type[BaseParser] | None, str] | None:
+            """取出下一个可以开始的链接并占用平台名额, 暂时没有时返回 None"""
+            nonlocal pulled, exhausted, pending_count
+            job: tuple[int, str, type[BaseParser] | None, str] | None = None
+            for platform, queue in pending.items():
+                if queue and has_room(platform):
+                    pending_count -= 1
+                    job = queue.popleft()
+                    break
+            while job is None and not exhausted and pending_count < lookahead:
+                if ordered and pulled >= next_index + lookahead:
+                    break
+                try:
+                    url = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                index, pulled = pulled, pulled + 1
+                if not (routed := self.route(url)):
+                    return index, url, None, url
+                parser, matched_url = routed
+                if has_room(parser.__platform__):
+                    job = index, url, parser, matched_url
+                else:
+                    pending.setdefault(parser.__platform__, deque()).append((index, url, parser, matched_url))
+                    pending_count += 1
+            if job is not None and job[2] is not None:
+                running[job[2].__platform__] += 1
+            return job
+
+        async def notify() -> None:
+            async with changed:
+                changed.notify_all()
+
+        async def worker() -> None:
+            while True:
+                async with changed:
+                    while (job := take()) is None and not (exhausted and not pending_count):
+                        await changed.wait()
+                if job is None:
+                    await done.put(None)
+                    return
+                index, url, parser, matched_url = job
+                result: AnyParseResult | Exception
+                if parser is None:
+                    result = UnknownPlatform(url)
+                else:
+                    try:
+                        result = await self._parse_routed(parser, matched_url, proxy=proxy, cookie=cookie)
+                    except Exception as e:
+                        result = e
+                    finally:
+                        running[parser.__platform__] -= 1
+                    await notify()
+                await done.put((index, url, result))
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        buffered: dict[int, tuple[str, AnyParseResult | Exception]] = {}
+        try:
+            remaining = len(workers)
+            while remaining:
+                if (item := await done.get()) is None:
+                    remaining -= 1
+                    continue
+                index, url, result = item
+                if not ordered:
+                    yield url, result
+                    continue
+                buffered[index] = (url, result)
+                while next_index in buffered:
+                    yield buffered.pop(next_index)
+                    next_index += 1
+                await notify()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    def parse_many_sync(
+        self,
+        urls: Iterable[str],
+        *,
+        concurrency: int = 16,
+        per_platform_limit: int | None = 4,
+        proxy: str | None = None,
+        cookie: str | dict | None = None,
+    ) -> list[tuple[str, AnyParseResult | Exception]]:
+        """
+        同步批量解析, 按输入顺序返回
+        :param urls: 分享文案 / 分享链接
+        :param concurrency: 全局最大并发数
+        :param per_platform_limit: 单个平台的最大并发数, 为 None 时不限制
+        :param proxy: 代理
+        :param cookie: cookie
+        :return: [(输入, 解析结果或异常)]
+        """
+
+        async def collect() -> list[tuple[str, AnyParseResult | Exception]]:
+            return [
+                item
+                async for item in self.parse_many(
+                    urls,
+                    concurrency=concurrency,
+                    per_platform_limit=per_platform_limit,
+                    ordered=True,
+                    proxy=proxy,
+                    cookie=cookie,
+                )
+            ]
+
+        return run_sync(collect())
+
     async def download(
         self,
         url: str,
@@ -56,6 +312,9 @@ class ParseHub:
         parse_proxy: str | None = None,
         parse_cookie: str | dict | None = None,
         save_metadata: bool = False,
+        aggregate_bytes: bool = False,
+        digest: str | None = None,
+        resume: bool = False,
     ) -> DownloadResult:
         """下载
         :param url: 分享文案 / 分享链接
@@ -67,6 +326,9 @@ class ParseHub:
         :param parse_proxy: 解析代理
         :param parse_cookie: 解析 cookie
         :param save_metadata: 保存解析结果为 metadata.json, 默认为 False
+        :param aggregate_bytes: 多文件下载时改为报告所有文件的总字节进度, 默认为 False
+        :param digest: 下载时计算文件摘要的算法, 例如 sha256、blake2b, 结果保存在 MediaFile.digest
+        :param resume: 下载到固定目录并保留未完成的文件, 再次下载时断点续传, 见 ParseResult.download
         :return: DownloadResult
 
         Note:
@@ -80,15 +342,55 @@ class ParseHub:
                 - ``bytes``: 字节进度，用于单文件下载时报告已下载/总字节数
                 - ``count``: 计数进度，用于多文件下载时报告已完成/总文件数
         """
-        result = await self.parse(url, proxy=parse_proxy, cookie=parse_cookie)
-        return await result.download(
-            path,
-            callback=callback,
-            callback_args=callback_args,
-            callback_kwargs=callback_kwargs,
-            proxy=proxy,
-            save_metadata=save_metadata,
+        if not (routed := self.route(url)):
+            raise UnknownPlatform(url)
+        parser, raw_url = await self._resolve(*routed, proxy=parse_proxy, cookie=parse_cookie)
+
+        # 同一链接下载到同一目录的并发调用共享一次下载, 进度回调会广播给所有调用者
+        save_dir = Path(path) if path else GlobalConfig.default_save_dir
+        key = (
+            parser.request_key(raw_url),
+            str(save_dir.resolve()),
+            proxy,
+            save_metadata,
+            aggregate_bytes,
+            digest,
+            resume,
         )
+        listeners = self._download_listeners.setdefault(key, [])
+        listener = ProgressListener(callback, args=callback_args, kwargs=callback_kwargs) if callback else None
+        if listener:
+            listeners.append(listener)
+
+        async def broadcast(current: int, total: int, unit: ProgressUnit, *args: Any, **kwargs: Any) -> None:
+            # 各调用者的回调在独立的任务中执行, 出错或较慢的回调不会中断或拖慢共享的下载
+            for item in listeners:
+                item.notify(current, total, unit)
+
+        async def run() -> DownloadResult:
+            result = await self._parse_raw(parser, raw_url)
+            with use_http_pool(self.http):
+                return await result.download(
+                    path,
+                    callback=broadcast,
+                    proxy=proxy,
+                    save_metadata=save_metadata,
+                    aggregate_bytes=aggregate_bytes,
+                    digest=digest,
+                    resume=resume,
+                )
+
+        try:
+            download = await self._download_flight.do(key, run)
+            if listener:
+                await listener.drain()
+            return download
+        finally:
+            if listener:
+                listener.cancel()
+                listeners.remove(listener)
+            if key not in self._download_flight and self._download_listeners.get(key) is listeners:
+                del self._download_listeners[key]
 
     def download_sync(
         self,
@@ -101,6 +403,9 @@ class ParseHub:
         parse_proxy: str | None = None,
         parse_cookie: str | dict | None = None,
         save_metadata: bool = False,
+        aggregate_bytes: bool = False,
+        digest: str | None = None,
+        resume: bool = False,
     ) -> DownloadResult:
         """
         同步下载
@@ -113,6 +418,9 @@ class ParseHub:
         :param parse_proxy: 解析代理
         :param parse_cookie: 解析 cookie
         :param save_metadata: 保存解析结果为 metadata.json, 默认为 False
+        :param aggregate_bytes: 多文件下载时改为报告所有文件的总字节进度, 默认为 False
+        :param digest: 下载时计算文件摘要的算法, 例如 sha256、blake2b, 结果保存在 MediaFile.digest
+        :param resume: 下载到固定目录并保留未完成的文件, 再次下载时断点续传, 见 ParseResult.download
         :return: DownloadResult
 
         Note:
@@ -137,6 +445,9 @@ class ParseHub:
                 parse_proxy=parse_proxy,
                 parse_cookie=parse_cookie,
                 save_metadata=save_metadata,
+                aggregate_bytes=aggregate_bytes,
+                digest=digest,
+                resume=resume,
             )
         )
 
@@ -168,21 +479,28 @@ class ParseHub:
 
         :return: 原始链接
         """
-        parser = self.get_parser(url)
-        if not parser:
+        if not (routed := self.route(url)):
             raise UnknownPlatform(url)
+        parser, matched_url = routed
         try:
-            return await parser(proxy=proxy).get_raw_url(url, clean_all=clean_all)
+            with use_http_pool(self.http):
+                return await parser(proxy=proxy).get_raw_url(matched_url, clean_all=clean_all)
         except Exception as e:
             raise ParseError from e
 
+    def route(self, url: str) -> tuple[type[BaseParser], str] | None:
+        """路由到解析器
+        :param url: 分享文案 / 分享链接
+        :return: (解析器, 提取出的链接)
+        """
+        return self.router.route(url)
+
     def _select_parser(self, url: str) -> type[BaseParser] | None:
         """选择解析器
         :param url: 分享文案 / 分享链接
         """
-        for parser in self.parsers:
-            if parser.match(url):
-                return parser
+        if routed := self.route(url):
+            return routed[0]
         return None
 
     def get_parser(self, url: str) -> type[BaseParser] | None:
@@ -0,0 +1,296 @@
+"""解析结果缓存
+
+以 ``get_raw_url(clean_all=True)`` 得到的规范链接为键缓存解析结果, 相同链接在有效期内不再重复请求平台接口.
+缓存内容为 pickle 序列化的解析结果, 以保留各平台解析结果子类 (如下载时需要的请求头). 磁盘缓存只应指向可信的本地文件
+"""
+
+import asyncio
+import pickle
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from .types.platform import Platform
+from .types.result import AnyParseResult
+
+if TYPE_CHECKING:
+    from .parsers.base import BaseParser
+
+DEFAULT_PLATFORM_TTL: dict[Platform, float] = {
+    # 媒体链接带签名或有效期, 过期后无法下载
+    Platform.BILIBILI: 10 * 60,
+    Platform.DOUYIN: 10 * 60,
+    Platform.TIKTOK: 10 * 60,
+    Platform.KUAISHOU: 10 * 60,
+    Platform.PIPIX: 10 * 60,
+    Platform.XHS: 30 * 60,
+    Platform.INSTAGRAM: 30 * 60,
+    Platform.FACEBOOK: 30 * 60,
+    # 文章内容和图片链接长期有效
+    Platform.WEIXIN: 7 * 24 * 60 * 60,
+    Platform.PTT: 24 * 60 * 60,
+}
+"""各平台默认缓存有效期, 单位: 秒"""
+
+
+@dataclass
+class CacheStats:
+    """缓存命中统计"""
+
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class CacheBackend(ABC):
+    """缓存存储后端"""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        """获取未过期的缓存, 不存在或已过期时返回 None"""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """写入缓存
+        :param key: 键
+        :param value: 值
+        :param ttl: 有效期, 单位: 秒
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+    async def aclose(self) -> None:  # noqa: B027
+        """释放后端资源"""
+
+
+class MemoryCache(CacheBackend):
+    """进程内 LRU 缓存"""
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        """
+        :param maxsize: 最大条目数
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize 必须大于 0")
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def get(self, key: str) -> bytes | None:
+        if (item := self._data.get(key)) is None:
+            return None
+        expires_at, value = item
+        if expires_at <= time.time():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._data[key] = (time.time() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    async def clear(self) -> None:
+        self._data.clear()
+
+
+class SQLiteCache(CacheBackend):
+    """本地 SQLite 缓存, 可在多次运行之间保留"""
+
+    def __init__(self, path: str | Path) -> None:
+        """
+        :param path: 数据库文件路径, 不存在时自动创建
+        """
+        self.path = Path(path)
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS parse_cache (key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value BLOB)"
+            )
+            conn.execute("DELETE FROM parse_cache WHERE expires_at <= ?", (time.time(),))
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _get(self, key: str) -> bytes | None:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute("SELECT value FROM parse_cache WHERE key = ? AND expires_at > ?", (key, time.time()))
+                .fetchone()
+            )
+        return row[0] if row else None
+
+    def _execute(self, sql: str, params: tuple = ()) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(sql, params)
+            conn.commit()
+
+    async def get(self, key: str) -> bytes | None:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT OR REPLACE INTO parse_cache (key, expires_at, value) VALUES (?, ?, ?)",
+            (key, time.time() + ttl, value),
+        )
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._execute, "DELETE FROM parse_cache WHERE key = ?", (key,))
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._execute, "DELETE FROM parse_cache")
+
+    async def purge(self) -> None:
+        """删除已过期的条目"""
+        await asyncio.to_thread(self._execute, "DELETE FROM parse_cache WHERE expires_at <= ?", (time.time(),))
+
+    async def aclose(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class ParseCache:
+    """解析结果缓存
+
+    Example:
+        ::
+
+            cache = ParseCache(SQLiteCache("cache.sqlite3"), platform_ttl={Platform.XHS: 600})
+            ph = ParseHub(cache=cache)
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend | None = None,
+        *,
+        ttl: float = 60 * 60,
+        platform_ttl: Mapping[Platform, float] | None = None,
+    ) -> None:
+        """
+        :param backend: 存储后端, 默认为 MemoryCache
+        :param ttl: 默认有效期, 单位: 秒
+        :param platform_ttl: 各平台有效期, 覆盖 DEFAULT_PLATFORM_TTL, 小于等于 0 时该平台不缓存
+        """
+        self.backend = backend if backend is not None else MemoryCache()
+        self.ttl = ttl
+        self.platform_ttl = {**DEFAULT_PLATFORM_TTL, **(platform_ttl or {})}
+        self.stats = CacheStats()
+        """全部平台的命中统计"""
+        self.platform_stats: dict[Platform, CacheStats] = {}
+        """各平台的命中统计"""
+
+    def get_ttl(self, platform: Platform | None) -> float:
+        """获取平台的缓存有效期"""
+        if platform is None:
+            return self.ttl
+        return self.platform_ttl.get(platform, self.ttl)
+
+    async def parse(self, parser: "BaseParser", url: str) -> AnyParseResult:
+        """优先从缓存读取解析结果, 未命中时解析并写入缓存
+        :param parser: 解析器实例
+        :param url: 分享文案 / 分享链接
+        :return: 解析结果
+        """
+        return await self.parse_raw_url(parser, await parser.get_raw_url(url, clean_all=False))
+
+    async def parse_raw_url(self, parser: "BaseParser", raw_url: str) -> AnyParseResult:
+        """同 parse, 链接已经由 ``get_raw_url(clean_all=False)`` 处理
+        :param parser: 解析器实例
+        :param raw_url: 原始链接
+        :return: 解析结果
+        """
+        ttl = self.get_ttl(parser.__platform__)
+        if ttl <= 0:
+            return await parser.parse_raw_url(raw_url)
+
+        key = parser.request_key(raw_url)
+        if (result := await self._load(key)) is not None:
+            self._record(parser.__platform__, hit=True)
+            return result
+        self._record(parser.__platform__, hit=False)
+
+        result = await parser.parse_raw_url(raw_url)
+        await self._store(key, result, ttl)
+        return result
+
+    async def invalidate(self, parser: "BaseParser", url: str) -> None:
+        """删除链接对应的缓存
+        :param parser: 解析器实例
+        :param url: 分享文案 / 分享链接
+        """
+        raw_url = await parser.get_raw_url(url, clean_all=False)
+        await self.backend.delete(parser.request_key(raw_url))
+
+    async def clear(self) -> None:
+        await self.backend.clear()
+
+    async def aclose(self) -> None:
+        await self.backend.aclose()
+
+    async def _load(self, key: str) -> AnyParseResult | None:
+        try:
+            if (data := await self.backend.get(key)) is None:
+                return None
+            result: AnyParseResult = pickle.loads(data)
+            return result
+        except Exception as e:
+            # 缓存损坏或结构变化时按未命中处理
+            logger.opt(exception=e).warning(f"读取解析缓存失败: {key}")
+            return None
+
+    async def _store(self, key: str, result: AnyParseResult, ttl: float) -> None:
+        try:
+            await self.backend.set(key, pickle.dumps(result), ttl)
+        except Exception as e:
+            logger.opt(exception=e).warning(f"写入解析缓存失败: {key}")
+
+    def _record(self, platform: Platform | None, *, hit: bool) -> None:
+        stats = [self.stats]
+        if platform is not None:
+            stats.append(self.platform_stats.setdefault(platform, CacheStats()))
+        for s in stats:
+            if hit:
+                s.hits += 1
+            else:
+                s.misses += 1
+
+
+__all__ = ["CacheBackend", "CacheStats", "DEFAULT_PLATFORM_TTL", "MemoryCache", "ParseCache", "SQLiteCache"]
@@ -1,7 +1,7 @@
 import sys
 from pathlib import Path
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class _GlobalConfig(BaseModel):
@@ -13,6 +13,30 @@ class _GlobalConfig(BaseModel):
     )
     default_save_dir: Path = Path(sys.argv[0]).parent / "downloads"
     """默认下载目录"""
+    download_concurrency: int = Field(default=4, ge=1)
+    """同一帖子中同时下载的媒体文件数"""
+    download_segments: int = Field(default=1, ge=1)
+    """视频分段下载的连接数, 为 1 时不分段. 大于 1 时每个视频先用一次 Range 请求探测, 服务器不支持时改为单连接下载"""
+    progress_interval: float = Field(default=0.5, ge=0)
+    """下载进度回调的最小间隔, 单位: 秒"""
+    progress_min_bytes: int = Field(default=0, ge=0)
+    """两次下载进度回调之间的最小字节数"""
+    progress_min_percent: float = Field(default=0, ge=0, le=100)
+    """两次下载进度回调之间的最小百分比"""
+    media_store_dir: Path | None = None
+    """媒体库目录, 设置后下载的文件按内容存入媒体库, 再次下载相同的文件时直接从媒体库链接"""
+    media_store_max_size: int = Field(default=10 * 1024**3, ge=0)
+    """媒体库大小上限, 单位: 字节, 超出时按最近使用时间淘汰"""
+    download_host_connections: int = Field(default=8, ge=1)
+    """进程内同一域名的最大下载连接数"""
+    download_bandwidth: int | None = Field(default=None, gt=0)
+    """进程内所有下载的总速度上限, 单位: 字节/秒, 为 None 时不限速"""
+    download_platform_bandwidth: dict[str, int] = {}
+    """各平台的下载速度上限, 键为平台 id, 单位: 字节/秒"""
+    media_info_cache_size: int = Field(default=0, ge=0)
+    """内存中缓存的媒体信息 (宽高、时长) 条数, 按文件 inode、大小和修改时间缓存, 默认为 0 不使用内存缓存"""
+    media_info_cache_path: Path | None = None
+    """媒体信息磁盘缓存的 SQLite 文件路径, 设置后在多次运行之间保留读取结果"""
 
 
 GlobalConfig = _GlobalConfig()
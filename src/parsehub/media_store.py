@@ -0,0 +1,302 @@
+"""内容寻址的本地媒体库
+
+下载完成的媒体文件按 sha256 存入媒体库, 并以规范化的 CDN 链接建立索引. 再次下载相同链接时,
+先用 ``Range: bytes=0-0`` 请求核对文件大小及 ETag / Last-Modified, 一致则将媒体库中的文件链接到输出目录,
+不再重新下载; 远端没有返回 ETag 和 Last-Modified 时无法确认文件未变化, 总是重新下载.
+不同链接指向的相同内容只保存一份. 媒体库超过大小上限时按最近使用时间淘汰.
+
+输出目录中的文件可能与媒体库中的文件共享 inode (硬链接), 请勿原地修改下载得到的文件
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from loguru import logger
+
+from .config import GlobalConfig
+from .utils.http_client import ProxyTypes, http_client
+from .utils.scheduler import download_scheduler
+
+_SIGNATURE_PARAMS: dict[str, re.Pattern[str]] = {
+    domain: re.compile(pattern)
+    for domains, pattern in (
+        (
+            ("douyinvod.com", "douyincdn.com", "zjcdn.com", "tiktokcdn.com", "tiktokcdn-us.com", "byteimg.com"),
+            r"(?i)^(x-expires|x-signature|expires?|signature|sign|policy)$",
+        ),
+        (("bilivideo.com", "bilivideo.cn"), r"(?i)^(deadline|upsig|uparams|e|trid|mid|oi|gen|os|og|nbs|platform)$"),
+        (("cdninstagram.com", "fbcdn.net"), r"(?i)^(oe|oh|_nc_.*|ccb|efg)$"),
+        (("xhscdn.com",), r"(?i)^(sign|t)$"),
+        (("sinaimg.cn", "weibocdn.com"), r"(?i)^(expires|ssig|kid)$"),
+        (("amazonaws.com",), r"(?i)^(x-amz-.*)$"),
+        (("aliyuncs.com",), r"(?i)^(expires|signature|ossaccesskeyid|x-oss-.*)$"),
+    )
+    for domain in domains
+}
+"""各平台 CDN 链接中随请求变化的签名 / 有效期参数, 不参与索引. 其他域名的参数全部保留"""
+
+
+def normalize_url(url: str) -> str:
+    """规范化 CDN 链接: 忽略协议、片段和已知 CDN 的签名参数, 其余参数排序"""
+    parts = urlsplit(url)
+    host = parts.hostname or ""
+    signature = _signature_params(host)
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if signature is None or not signature.match(k)
+    )
+    normalized = f"{host}{parts.path}"
+    return f"{normalized}?{urlencode(query)}" if query else normalized
+
+
+def _signature_params(host: str) -> re.Pattern[str] | None:
+    labels = host.lower().split(".")
+    for i in range(len(labels) - 1):
+        if (pattern := _SIGNATURE_PARAMS.get(".".join(labels[i:]))) is not None:
+            return pattern
+    return None
+
+
+class MediaStore:
+    """本地媒体库
+
+    Example:
+        ::
+
+            GlobalConfig.media_store_dir = Path("./media_store")
+            GlobalConfig.media_store_max_size = 20 * 1024**3
+    """
+
+    def __init__(self, root: str | Path, *, max_size: int = 10 * 1024**3) -> None:
+        """
+        :param root: 媒体库目录
+        :param max_size: 媒体库大小上限, 单位: 字节
+        """
+        self.root = Path(root)
+        self.max_size = max_size
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.root / "index.sqlite3", check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS objects (digest TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+                "accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS urls (key TEXT PRIMARY KEY, digest TEXT NOT NULL, etag TEXT, "
+                "length INTEGER NOT NULL, last_modified TEXT)"
+            )
+            if "last_modified" not in {row[1] for row in conn.execute("PRAGMA table_info(urls)")}:
+                conn.execute("ALTER TABLE urls ADD COLUMN last_modified TEXT")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / digest
+
+    async def fetch(
+        self, url: str, dest: str | Path, *, headers: dict | None = None, proxy: ProxyTypes = None
+    ) -> str | None:
+        """媒体库中有该链接的文件且与远端一致时, 将其链接到 dest
+        :param url: 媒体链接
+        :param dest: 目标路径
+        :param headers: 核对远端文件时的请求头
+        :param proxy: 代理
+        :return: 命中时返回文件的 sha256, 否则返回 None
+        """
+        key = normalize_url(url)
+        try:
+            if (entry := await asyncio.to_thread(self._lookup, key)) is None:
+                return None
+            digest, etag, last_modified, length = entry
+            if not await self._validate(url, etag, last_modified, length, headers=headers, proxy=proxy):
+                return None
+            return digest if await asyncio.to_thread(self._checkout, digest, Path(dest)) else None
+        except Exception as e:
+            logger.opt(exception=e).warning(f"读取媒体库失败: {key}")
+            return None
+
+    async def add(
+        self,
+        url: str,
+        path: str | Path,
+        *,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        sha256: str | None = None,
+    ) -> None:
+        """将下载完成的文件存入媒体库
+        :param url: 媒体链接
+        :param path: 文件路径
+        :param etag: 响应头中的 ETag
+        :param last_modified: 响应头中的 Last-Modified
+        :param sha256: 下载时已计算的 sha256, 提供时不再读取文件计算
+        """
+        key = normalize_url(url)
+        try:
+            await asyncio.to_thread(self._add, key, Path(path), etag, last_modified, sha256)
+        except Exception as e:
+            logger.opt(exception=e).warning(f"写入媒体库失败: {key}")
+
+    def size(self) -> int:
+        """媒体库当前大小, 单位: 字节"""
+        with self._lock:
+            size: int = self._connect().execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+        return size
+
+    async def aclose(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _lookup(self, key: str) -> tuple[str, str | None, str | None, int] | None:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT urls.digest, urls.etag, urls.last_modified, urls.length FROM urls "
+                    "JOIN objects USING (digest) WHERE key = ?",
+                    (key,),
+                )
+                .fetchone()
+            )
+        return (row[0], row[1], row[2], row[3]) if row else None
+
+    async def _validate(
+        self,
+        url: str,
+        etag: str | None,
+        last_modified: str | None,
+        length: int,
+        *,
+        headers: dict | None,
+        proxy: ProxyTypes,
+    ) -> bool:
+        """远端文件大小一致, 且 ETag 或 Last-Modified 一致时认为文件未变化"""
+        if not etag and not last_modified:
+            return False
+        async with (
+            download_scheduler.transfer(url),
+            http_client(proxy=proxy) as client,
+            client.stream("GET", url, headers={**(headers or {}), "Range": "bytes=0-0"}, follow_redirects=True) as r,
+        ):
+            if r.status_code == 206 and (match := re.search(r"/(\d+)$", r.headers.get("Content-Range", ""))):
+                remote_length = int(match.group(1))
+            elif r.status_code == 200 and "Content-Encoding" not in r.headers:
+                remote_length = int(r.headers.get("Content-Length", -1))
+            else:
+                return False
+            remote_etag: str | None = r.headers.get("ETag")
+            remote_last_modified = r.headers.get("Last-Modified")
+        if remote_length != length:
+            return False
+        if etag and remote_etag:
+            return etag.removeprefix("W/") == remote_etag.removeprefix("W/")
+        return bool(last_modified and last_modified == remote_last_modified)
+
+    def _checkout(self, digest: str, dest: Path) -> bool:
+        src = self.object_path(digest)
+        if not src.exists():
+            with self._lock:
+                conn = self._connect()
+                conn.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+                conn.execute("DELETE FROM urls WHERE digest = ?", (digest,))
+                conn.commit()
+            return False
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.unlink(missing_ok=True)
+        _clone_file(src, dest)
+        with self._lock:
+            conn = self._connect()
+            conn.execute("UPDATE objects SET accessed_at = ? WHERE digest = ?", (time.time(), digest))
+            conn.commit()
+        return True
+
+    def _add(self, key: str, path: Path, etag: str | None, last_modified: str | None, digest: str | None) -> None:
+        if digest is None:
+            sha256 = hashlib.sha256()
+            with path.open("rb") as f:
+                while chunk := f.read(1024 * 1024):
+                    sha256.update(chunk)
+            digest = sha256.hexdigest()
+        size = path.stat().st_size
+
+        obj = self.object_path(digest)
+        if not obj.exists():
+            obj.parent.mkdir(parents=True, exist_ok=True)
+            tmp = obj.with_name(f"{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+            _clone_file(path, tmp)
+            os.replace(tmp, obj)
+
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO objects (digest, size, accessed_at) VALUES (?, ?, ?)",
+                (digest, size, time.time()),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO urls (key, digest, etag, last_modified, length) VALUES (?, ?, ?, ?, ?)",
+                (key, digest, etag, last_modified, size),
+            )
+            conn.commit()
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """按最近使用时间删除对象, 直到媒体库大小不超过上限"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+        if total <= self.max_size:
+            return
+        for digest, size in conn.execute("SELECT digest, size FROM objects ORDER BY accessed_at").fetchall():
+            if total <= self.max_size:
+                break
+            self.object_path(digest).unlink(missing_ok=True)
+            conn.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+            conn.execute("DELETE FROM urls WHERE digest = ?", (digest,))
+            total -= size
+        conn.commit()
+
+
+def _clone_file(src: Path, dst: Path) -> None:
+    """依次尝试 reflink (写时复制)、硬链接、复制"""
+    try:
+        import fcntl
+
+        with src.open("rb") as s, dst.open("wb") as d:
+            fcntl.ioctl(d.fileno(), 0x40049409, s.fileno())  # FICLONE
+        return
+    except (ImportError, OSError):
+        dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+_stores: dict[Path, MediaStore] = {}
+
+
+def get_media_store() -> MediaStore | None:
+    """获取 GlobalConfig.media_store_dir 对应的媒体库, 未设置时返回 None"""
+    if GlobalConfig.media_store_dir is None:
+        return None
+    root = GlobalConfig.media_store_dir.resolve()
+    if (store := _stores.get(root)) is None:
+        store = _stores[root] = MediaStore(root)
+    store.max_size = GlobalConfig.media_store_max_size
+    return store
+
+
+__all__ = ["MediaStore", "get_media_store", "normalize_url"]
@@ -1,8 +1,10 @@
+import hashlib
 import importlib
+import json
 import pkgutil
 import re
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, ClassVar
 from urllib.parse import parse_qs, urlencode, urlparse
 
 import httpx
@@ -11,12 +13,15 @@ from ... import parsers
 from ...config.config import GlobalConfig
 from ...types import AnyParseResult, ParseError
 from ...types.platform import Platform
+from ...utils.redirect import redirect_resolver
 from ...utils.utils import match_url, normalize_cookie
 
 
 class BaseParser(ABC):
     _registry: list[type["BaseParser"]] = []
     _registry_initialized: bool = False
+    _match_pattern: ClassVar[re.Pattern[str] | None] = None
+    _special_pattern: ClassVar[re.Pattern[str] | None] = None
 
     __platform__: Platform | None = None
     """平台"""
@@ -24,6 +29,10 @@ class BaseParser(ABC):
     """支持的类型, 例如: 图文, 视频, 动态"""
     __match__: str | None = None
     """匹配规则"""
+    __special_match__: str | None = None
+    """非链接形式输入的匹配规则, 例如 Bilibili 的 BV 号"""
+    __hosts__: list[str] = []
+    """链接域名 (含子域名), 用于路由时按域名预筛选解析器. 为空时该解析器会参与所有链接的匹配"""
     __reserved_parameters__: list[str] = []
     """要保留的参数, 例如翻页. 默认清除全部参数"""
     __after_clean_parameters__: list[str] = []
@@ -37,6 +46,8 @@ class BaseParser(ABC):
 
     def __init_subclass__(cls, /, register: bool = True, **kwargs: Any) -> None:
         super().__init_subclass__(**kwargs)
+        cls._match_pattern = re.compile(cls.__match__) if cls.__match__ else None
+        cls._special_pattern = re.compile(cls.__special_match__) if cls.__special_match__ else None
         if register:
             if not cls.__platform__:
                 raise ValueError(
@@ -56,8 +67,17 @@ class BaseParser(ABC):
     @classmethod
     def match(cls, text: str) -> bool:
         """判断是否匹配该解析器"""
-        url = match_url(text)
-        return bool(cls.__match__ and re.match(cls.__match__, url))
+        return cls.match_special(text) or cls.is_match_url(match_url(text))
+
+    @classmethod
+    def is_match_url(cls, url: str) -> bool:
+        """判断已提取的链接是否匹配该解析器"""
+        return bool(url and cls._match_pattern and cls._match_pattern.match(url))
+
+    @classmethod
+    def match_special(cls, text: str) -> bool:
+        """匹配非链接形式的输入, 默认使用 __special_match__"""
+        return bool(cls._special_pattern and cls._special_pattern.match(text))
 
     async def parse(self, url: str) -> AnyParseResult:
         """解析
@@ -65,12 +85,34 @@ class BaseParser(ABC):
         :return: 解析结果
         """
         raw_url = await self.get_raw_url(url, clean_all=False)
+        return await self.parse_raw_url(raw_url)
+
+    async def parse_raw_url(self, raw_url: str) -> AnyParseResult:
+        """解析已经由 ``get_raw_url(clean_all=False)`` 处理过的链接
+        :param raw_url: 原始链接
+        :return: 解析结果
+        """
         result = await self._do_parse(raw_url)
         result.platform = self.__platform__
-        raw_url_clean = self._clean_params(raw_url, self.__after_clean_parameters__)
-        result.raw_url = raw_url_clean
+        result.raw_url = self.canonical_url(raw_url)
         return result
 
+    def canonical_url(self, raw_url: str) -> str:
+        """由 ``get_raw_url(clean_all=False)`` 的结果得到与 ``clean_all=True`` 相同的链接, 不发起请求"""
+        return self._clean_params(raw_url, self.__after_clean_parameters__)
+
+    def request_key(self, raw_url: str) -> str:
+        """请求标识, 由平台、规范链接和 Cookie 摘要组成, 用于缓存和合并相同的并发请求
+        :param raw_url: ``get_raw_url(clean_all=False)`` 的结果
+        """
+        platform = self.__platform__.id if self.__platform__ else type(self).__name__
+        key = f"{platform}:{self.canonical_url(raw_url)}"
+        if self.cookie:
+            # 带 Cookie 的结果可能包含登录后才可见的内容, 不与匿名请求共享
+            digest = hashlib.sha256(json.dumps(self.cookie, sort_keys=True, default=str).encode()).hexdigest()
+            key = f"{key}#{digest[:16]}"
+        return key
+
     @abstractmethod
     async def _do_parse(self, raw_url: str) -> AnyParseResult:
         """解析
@@ -111,18 +153,15 @@ class BaseParser(ABC):
         if not url.startswith("http"):
             url = f"https://{url}"
         if any(x in url for x in self.__redirect_keywords__):
-            async with httpx.AsyncClient(proxy=self.proxy, timeout=30) as client:
-                try:
-                    r = await client.get(
-                        url,
-                        follow_redirects=True,
-                        headers={"User-Agent": GlobalConfig.ua},
-                    )
-                except (httpx.ReadTimeout, httpx.ConnectTimeout) as e:
-                    raise ParseError("获取原始链接超时") from e
-                except Exception as e:
-                    raise ParseError("获取原始链接失败") from e
-                url = str(r.url)
+            scope = self.__platform__.id if self.__platform__ else None
+            try:
+                url = await redirect_resolver.resolve(
+                    url, proxy=self.proxy, scope=scope, headers={"User-Agent": GlobalConfig.ua}, timeout=30
+                )
+            except (httpx.ReadTimeout, httpx.ConnectTimeout) as e:
+                raise ParseError("获取原始链接超时") from e
+            except Exception as e:
+                raise ParseError("获取原始链接失败") from e
 
         parsed_url = urlparse(url)
         query_params = parse_qs(parsed_url.query)
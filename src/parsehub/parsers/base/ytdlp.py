@@ -1,10 +1,8 @@
 import asyncio
-from collections.abc import Callable
+from collections.abc import AsyncIterator, Callable
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, cast
-
-from yt_dlp import YoutubeDL
+from typing import TYPE_CHECKING, Any, cast
 
 from ...types import (
     AnyParseResult,
@@ -16,10 +14,14 @@ from ...types import (
     VideoParseResult,
     VideoRef,
 )
+from ...utils.digest import StreamingDigest
 from .base import BaseParser
 
+if TYPE_CHECKING:
+    from yt_dlp import YoutubeDL
+
 
-def switch_ytdlp_proxy(ydl: YoutubeDL, proxy: str | None) -> None:
+def switch_ytdlp_proxy(ydl: "YoutubeDL", proxy: str | None) -> None:
     """切换同一个 YoutubeDL 实例后续请求使用的代理。"""
     ydl.params["proxy"] = proxy or ""
 
@@ -34,6 +36,8 @@ def switch_ytdlp_proxy(ydl: YoutubeDL, proxy: str | None) -> None:
 
 def download_video(yto_params: dict[str, Any], url: str, proxy: str | None = None) -> None:
     """在独立线程中下载视频"""
+    from yt_dlp import YoutubeDL
+
     try:
         with YoutubeDL(yto_params) as ydl:
             info = ydl.extract_info(url, download=False)
@@ -141,6 +145,9 @@ class YtParser(BaseParser, register=False):
         )
 
     def _extract_info(self, url: str) -> dict[str, Any]:
+        # yt-dlp 导入耗时较长, 在首次使用时再导入
+        from yt_dlp import YoutubeDL
+
         params = self.params.copy()
         if self.proxy:
             params["proxy"] = self.proxy
@@ -191,6 +198,9 @@ class YtVideoParseResult(VideoParseResult):
         callback_kwargs: dict | None = None,
         proxy: str | None = None,
         headers: dict | None = None,
+        aggregate_bytes: bool = False,
+        digest: str | None = None,
+        resume: bool = False,
     ) -> "DownloadResult":
         if callback_kwargs is None:
             callback_kwargs = {}
@@ -231,16 +241,31 @@ class YtVideoParseResult(VideoParseResult):
             await callback(100, 100, "bytes", *callback_args, **callback_kwargs)
 
         video_path = v[0]
+        file_digest = None
+        if digest:
+            # 文件由 yt-dlp 下载合并, 只能在完成后读取文件计算
+            hasher = StreamingDigest(digest)
+            await hasher.sync(video_path, video_path.stat().st_size)
+            file_digest = hasher.hexdigest()
         return DownloadResult(
             VideoFile(
                 path=str(video_path),
                 height=self.dl.height,
                 width=self.dl.width,
                 duration=self.dl.duration,
+                digest=file_digest,
             ),
             output_dir,
+            digest_algorithm=digest,
         )
 
+    async def stream(
+        self, index: int = 0, *, proxy: str | None = None, live_photo_video: bool = False
+    ) -> AsyncIterator[bytes]:
+        # 媒体链接是页面地址, 需要 yt-dlp 选择并合并音视频格式, 无法直接流式读取
+        raise DownloadError("yt-dlp 解析的视频不支持流式读取, 请使用 download")
+        yield b""
+
     async def _run_download(self, paramss: dict[str, Any], count: int = 0, *, proxy: str | None = None) -> None:
         if count > 2:
             raise DownloadError("下载失败 -2")
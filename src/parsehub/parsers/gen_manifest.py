@@ -0,0 +1,9 @@
+"""重新生成解析器清单::
+
+python -m parsehub.parsers.gen_manifest
+"""
+
+from .lazy import write_manifest
+
+if __name__ == "__main__":
+    print(f"已写入 {write_manifest()}")
@@ -0,0 +1,125 @@
+"""按需导入的解析器
+
+解析器模块会导入 yt-dlp、instaloader、cryptography 等较重的依赖. 路由只需要平台、匹配规则和域名,
+这些信息保存在静态清单 ``manifest.py`` 中, 只有路由命中后才导入对应的解析器模块.
+
+新增或修改内置解析器后需要重新生成清单::
+
+    python -m parsehub.parsers.gen_manifest && ruff format src/parsehub/parsers/manifest.py
+"""
+
+import importlib
+import re
+from pathlib import Path
+from pprint import pformat
+from typing import Any
+
+from ..types.platform import Platform
+from ..utils.utils import match_url
+from .base.base import BaseParser
+from .manifest import MANIFEST
+
+
+class LazyParser:
+    """清单中的解析器, 提供路由所需的类属性, 在 load 时才导入解析器模块"""
+
+    def __init__(
+        self,
+        *,
+        module: str,
+        name: str,
+        platform: str,
+        match: str | None = None,
+        special_match: str | None = None,
+        hosts: list[str] | None = None,
+        supported_type: list[str] | None = None,
+    ) -> None:
+        self.module = module
+        self.name = name
+        self.__platform__ = next(p for p in Platform if p.id == platform)
+        self.__match__ = match
+        self.__special_match__ = special_match
+        self.__hosts__ = hosts or []
+        self.__supported_type__ = supported_type or []
+        self._match_pattern = re.compile(match) if match else None
+        self._special_pattern = re.compile(special_match) if special_match else None
+        self._parser: type[BaseParser] | None = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.module}.{self.name})"
+
+    @property
+    def loaded(self) -> bool:
+        return self._parser is not None
+
+    def load(self) -> type[BaseParser]:
+        """导入并返回解析器类"""
+        if self._parser is None:
+            parser = getattr(importlib.import_module(self.module), self.name)
+            if not (isinstance(parser, type) and issubclass(parser, BaseParser)):
+                raise TypeError(f"{self.module}.{self.name} 不是解析器")
+            self._parser = parser
+        return self._parser
+
+    def match(self, text: str) -> bool:
+        return self.match_special(text) or self.is_match_url(match_url(text))
+
+    def is_match_url(self, url: str) -> bool:
+        return bool(url and self._match_pattern and self._match_pattern.match(url))
+
+    def match_special(self, text: str) -> bool:
+        return bool(self._special_pattern and self._special_pattern.match(text))
+
+
+ParserLike = type[BaseParser] | LazyParser
+
+
+def load_parser(parser: ParserLike) -> type[BaseParser]:
+    """获取解析器类, LazyParser 会在此时导入"""
+    return parser.load() if isinstance(parser, LazyParser) else parser
+
+
+def get_lazy_registry() -> list[ParserLike]:
+    """获取解析器注册表, 不导入内置解析器模块
+
+    在此之前已导入的解析器直接使用解析器类, 清单外的解析器 (例如用户自定义的解析器) 排在内置解析器之前
+    """
+    registered = {(p.__module__, p.__name__): p for p in BaseParser._registry}
+    builtin = {(spec["module"], spec["name"]) for spec in MANIFEST}
+    extra: list[ParserLike] = [p for key, p in registered.items() if key not in builtin]
+    return extra + [registered.get((spec["module"], spec["name"])) or LazyParser(**spec) for spec in MANIFEST]
+
+
+def build_manifest(parsers: list[type[BaseParser]]) -> list[dict[str, Any]]:
+    """根据解析器类生成清单"""
+    manifest = []
+    for parser in parsers:
+        if parser.__platform__ is None:
+            continue
+        if parser.match_special.__func__ is not BaseParser.match_special.__func__:  # type: ignore[attr-defined]
+            raise TypeError(f"{parser.__name__} 重写了 match_special, 无法写入清单, 请改用 __special_match__")
+        manifest.append(
+            {
+                "module": parser.__module__,
+                "name": parser.__name__,
+                "platform": parser.__platform__.id,
+                "match": parser.__match__,
+                "special_match": parser.__special_match__,
+                "hosts": list(parser.__hosts__),
+                "supported_type": list(parser.__supported_type__),
+            }
+        )
+    return manifest
+
+
+def write_manifest(path: str | Path | None = None) -> Path:
+    """导入全部内置解析器并重新生成清单文件"""
+    path = Path(path) if path else Path(__file__).with_name("manifest.py")
+    registry = [p for p in BaseParser.get_registry() if p.__module__.startswith(f"{__package__}.parser.")]
+    path.write_text(
+        '"""解析器清单\n\n由 ``python -m parsehub.parsers.gen_manifest`` 生成, 请勿手动修改\n"""\n\n'
+        "from typing import Any\n\n"
+        f"MANIFEST: list[dict[str, Any]] = {pformat(build_manifest(registry), width=110, sort_dicts=False)}\n",
+        encoding="utf-8",
+    )
+    return path
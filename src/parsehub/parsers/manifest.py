@@ -0,0 +1,171 @@
+"""解析器清单
+
+由 ``python -m parsehub.parsers.gen_manifest`` 生成, 请勿手动修改
+"""
+
+from typing import Any
+
+MANIFEST: list[dict[str, Any]] = [
+    {
+        "module": "parsehub.parsers.parser.bilibili",
+        "name": "BiliParse",
+        "platform": "bilibili",
+        "match": "^(http(s)?://)?((((w){3}.|(m).|(t).)?bilibili\\.com)/(video|opus|\\b\\d{18,19}\\b)|b23.tv|bili2233.cn).*",
+        "special_match": "(?i)bv",
+        "hosts": ["bilibili.com", "b23.tv", "bili2233.cn"],
+        "supported_type": ["视频", "动态"],
+    },
+    {
+        "module": "parsehub.parsers.parser.coolapk",
+        "name": "CoolapkParser",
+        "platform": "coolapk",
+        "match": "^(http(s)?://)www.coolapk.com/(feed|picture)/.*",
+        "special_match": None,
+        "hosts": ["coolapk.com"],
+        "supported_type": ["图文"],
+    },
+    {
+        "module": "parsehub.parsers.parser.douyin",
+        "name": "DouyinParser",
+        "platform": "douyin",
+        "match": "^(http(s)?://)?.+douyin.com/(?!share/user|qishui).+",
+        "special_match": None,
+        "hosts": ["douyin.com", "iesdouyin.com"],
+        "supported_type": ["视频", "图文"],
+    },
+    {
+        "module": "parsehub.parsers.parser.facebook",
+        "name": "FacebookParse",
+        "platform": "facebook",
+        "match": "^(http(s)?://)?.+facebook.com/.*",
+        "special_match": None,
+        "hosts": ["facebook.com"],
+        "supported_type": ["视频", "图文"],
+    },
+    {
+        "module": "parsehub.parsers.parser.instagram",
+        "name": "InstagramParser",
+        "platform": "instagram",
+        "match": "^(http(s)?://)(www\\.|)instagram\\.com/(p|reel|share|.*/p|.*/reel)/.*",
+        "special_match": None,
+        "hosts": ["instagram.com"],
+        "supported_type": ["视频", "图文"],
+    },
+    {
+        "module": "parsehub.parsers.parser.kuaishou",
+        "name": "KuaiShouParser",
+        "platform": "kuaishou",
+        "match": "^(http(s)?://)?(www|v)\\.kuaishou.com/.+",
+        "special_match": None,
+        "hosts": ["kuaishou.com"],
+        "supported_type": ["视频"],
+    },
+    {
+        "module": "parsehub.parsers.parser.pipix",
+        "name": "PipixParser",
+        "platform": "pipix",
+        "match": "^(http(s)?://)?h5.pipix.com/(s|ppx/item)/.+",
+        "special_match": None,
+        "hosts": ["pipix.com"],
+        "supported_type": ["视频", "图文"],
+    },
+    {
+        "module": "parsehub.parsers.parser.pttcc",
+        "name": "PTTParser",
+        "platform": "ptt",
+        "match": "^(http(s)?://)?.+ptt\\.cc/bbs/.*",
+        "special_match": None,
+        "hosts": ["ptt.cc"],
+        "supported_type": ["图文"],
+    },
+    {
+        "module": "parsehub.parsers.parser.threads",
+        "name": "ThreadsParser",
+        "platform": "threads",
+        "match": "^(http(s)?://)?.+threads.com/(?:@)?[\\w.]+/post/.*",
+        "special_match": None,
+        "hosts": ["threads.com"],
+        "supported_type": ["视频", "图文"],
+    },
+    {
+        "module": "parsehub.parsers.parser.tieba",
+        "name": "TieBaParser",
+        "platform": "tieba",
+        "match": "^(http(s)?://)?.+tieba.baidu.com/p/\\d+",
+        "special_match": None,
+        "hosts": ["tieba.baidu.com"],
+        "supported_type": ["视频", "图文"],
+    },
+    {
+        "module": "parsehub.parsers.parser.tiktok",
+        "name": "TikTokParser",
+        "platform": "tiktok",
+        "match": "^(http(s)?://)?.+tiktok.com/(?!share/user|qishui).+",
+        "special_match": None,
+        "hosts": ["tiktok.com"],
+        "supported_type": ["视频", "图文"],
+    },
+    {
+        "module": "parsehub.parsers.parser.twitter",
+        "name": "TwitterParser",
+        "platform": "twitter",
+        "match": "^(http(s)?://)?.+(twitter|fixupx|x).com/.*/status/\\d+",
+        "special_match": None,
+        "hosts": ["twitter.com", "x.com", "fixupx.com", "fxtwitter.com", "vxtwitter.com", "fixvx.com"],
+        "supported_type": ["视频", "图文"],
+    },
+    {
+        "module": "parsehub.parsers.parser.weibo",
+        "name": "WeiboParser",
+        "platform": "weibo",
+        "match": "^(http(s)?://)((m\\.|video\\.|)weibo\\.(com|cn)/(?!(u/)).+|mapp\\.api\\.weibo\\.cn/fx/.+)",
+        "special_match": None,
+        "hosts": ["weibo.com", "weibo.cn"],
+        "supported_type": ["视频", "图文"],
+    },
+    {
+        "module": "parsehub.parsers.parser.weixin",
+        "name": "WXParser",
+        "platform": "weixin",
+        "match": "^(http(s)?://)mp.weixin.qq.com/s/.*",
+        "special_match": None,
+        "hosts": ["mp.weixin.qq.com"],
+        "supported_type": ["图文"],
+    },
+    {
+        "module": "parsehub.parsers.parser.xhs",
+        "name": "XHSParser",
+        "platform": "xhs",
+        "match": "^(http(s)?://)?.+(xiaohongshu|xhslink).com/.+",
+        "special_match": None,
+        "hosts": ["xiaohongshu.com", "xhslink.com"],
+        "supported_type": ["视频", "图文"],
+    },
+    {
+        "module": "parsehub.parsers.parser.xiaoheihe",
+        "name": "XiaoHeiHeParser",
+        "platform": "xiaoheihe",
+        "match": "^(http(s)?://)?.+xiaoheihe.cn/(v3|app)/bbs/(app|link).+",
+        "special_match": None,
+        "hosts": ["xiaoheihe.cn"],
+        "supported_type": ["视频", "图文"],
+    },
+    {
+        "module": "parsehub.parsers.parser.youtube",
+        "name": "YtbParse",
+        "platform": "youtube",
+        "match": "^(http(s)?://).*youtu(be|.be)?(\\.com)?/(?!(live|post))(?!@).+",
+        "special_match": None,
+        "hosts": ["youtube.com", "youtu.be"],
+        "supported_type": ["视频", "音乐"],
+    },
+    {
+        "module": "parsehub.parsers.parser.zuiyou",
+        "name": "ZuiYouParser",
+        "platform": "zuiyou",
+        "match": "^(http(s)?://)share.xiaochuankeji.cn/hybrid/share/post\\?pid=\\d+",
+        "special_match": None,
+        "hosts": ["share.xiaochuankeji.cn"],
+        "supported_type": ["视频", "图文"],
+    },
+]
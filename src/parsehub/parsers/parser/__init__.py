@@ -1,16 +1,45 @@
-# ruff: noqa: F403
-from .bilibili import *
-from .coolapk import *
-from .douyin import *
-from .facebook import *
-from .instagram import *
-from .pttcc import *
-from .threads import *
-from .tieba import *
-from .twitter import *
-from .weibo import *
-from .weixin import *
-from .xhs import *
-from .xiaoheihe import *
-from .youtube import *
-from .zuiyou import *
+"""内置解析器
+
+解析器模块在首次访问时才导入, 避免导入本包时加载所有平台的依赖
+"""
+
+import importlib
+from typing import Any
+
+_EXPORTS = {
+    "BiliParse": "bilibili",
+    "BiliVideoParseResult": "bilibili",
+    "CoolapkParser": "coolapk",
+    "CoolapkImageParseResult": "coolapk",
+    "CoolapkMultimediaParseResult": "coolapk",
+    "CoolapkRichTextParseResult": "coolapk",
+    "DouyinParser": "douyin",
+    "FacebookParse": "facebook",
+    "InstagramParser": "instagram",
+    "PTTParser": "pttcc",
+    "PTTRichTextParseResult": "pttcc",
+    "ThreadsParser": "threads",
+    "TieBaParser": "tieba",
+    "TwitterParser": "twitter",
+    "WeiboParser": "weibo",
+    "WXParser": "weixin",
+    "XHSParser": "xhs",
+    "XiaoHeiHeParser": "xiaoheihe",
+    "YtbParse": "youtube",
+    "ZuiYouParser": "zuiyou",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if (module := _EXPORTS.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_EXPORTS})
+
+
+__all__ = list(_EXPORTS)
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import re
-from pathlib import Path
 from typing import cast
 from urllib.parse import parse_qs, urlparse
 
@@ -10,13 +9,11 @@ from loguru import logger
 from ...config.config import GlobalConfig
 from ...provider_api.bilibili import BiliAPI, BiliDynamic
 from ...types import (
-    DownloadResult,
     ImageParseResult,
     ImageRef,
     LivePhotoRef,
     ParseError,
     Platform,
-    ProgressCallback,
     VideoParseResult,
     VideoRef,
 )
@@ -28,6 +25,8 @@ class BiliParse(YtParser):
     __platform__ = Platform.BILIBILI
     __supported_type__ = ["视频", "动态"]
     __match__ = r"^(http(s)?://)?((((w){3}.|(m).|(t).)?bilibili\.com)/(video|opus|\b\d{18,19}\b)|b23.tv|bili2233.cn).*"
+    __special_match__ = r"(?i)bv"
+    __hosts__ = ["bilibili.com", "b23.tv", "bili2233.cn"]
     __reserved_parameters__ = ["p"]
     __redirect_keywords__ = ["b23.tv", "bili2233.cn"]
 
@@ -64,13 +63,6 @@ class BiliParse(YtParser):
         else:
             return False
 
-    @classmethod
-    def match(cls, url: str) -> bool:
-        if cls._is_bvid(url):
-            return True
-        else:
-            return super().match(url)
-
     async def get_raw_url(self, url: str, clean_all: bool = False) -> str:
         """获取原始链接"""
         if self._is_bvid(url):
@@ -165,25 +157,8 @@ class BiliParse(YtParser):
 
 
 class BiliVideoParseResult(VideoParseResult):
-    async def _do_download(
-        self,
-        *,
-        output_dir: str | Path,
-        callback: ProgressCallback | None = None,
-        callback_args: tuple = (),
-        callback_kwargs: dict | None = None,
-        proxy: str | None = None,
-        headers: dict | None = None,
-    ) -> DownloadResult:
-        headers = {"referer": "https://www.bilibili.com", "User-Agent": GlobalConfig.ua}
-        return await super()._do_download(
-            output_dir=output_dir,
-            callback=callback,
-            callback_args=callback_args,
-            callback_kwargs=callback_kwargs,
-            proxy=proxy,
-            headers=headers,
-        )
+    def _request_options(self, proxy: str | None, headers: dict | None) -> tuple[str | None, dict | None]:
+        return proxy, {"referer": "https://www.bilibili.com", "User-Agent": GlobalConfig.ua}
 
 
 __all__ = [
@@ -1,18 +1,15 @@
 import re
-from pathlib import Path
 from typing import Union
 
 from ...provider_api.coolapk import Coolapk
 from ...types import (
     AniRef,
-    DownloadResult,
     ImageParseResult,
     ImageRef,
     MultimediaParseResult,
     ParseError,
     ParseResult,
     Platform,
-    ProgressCallback,
     RichTextParseResult,
 )
 from ..base.base import BaseParser
@@ -22,6 +19,7 @@ class CoolapkParser(BaseParser):
     __platform__ = Platform.COOLAPK
     __supported_type__ = ["图文"]
     __match__ = r"^(http(s)?://)www.coolapk.com/(feed|picture)/.*"
+    __hosts__ = ["coolapk.com"]
     __after_clean_parameters__ = ["shareKey", "s"]
 
     async def _do_parse(
@@ -60,30 +58,14 @@ class CoolapkParser(BaseParser):
 
 
 class CoolapkParseResult(ParseResult):
-    async def _do_download(
-        self,
-        *,
-        output_dir: str | Path,
-        callback: ProgressCallback | None = None,
-        callback_args: tuple = (),
-        callback_kwargs: dict | None = None,
-        proxy: str | None = None,
-        headers: dict | None = None,
-    ) -> "DownloadResult":
+    def _request_options(self, proxy: str | None, headers: dict | None) -> tuple[str | None, dict | None]:
         headers = {
             "Accept": (
                 "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,"
                 "*/*;q=0.8,application/signed-exchange;v=b3;q=0.7"
             )
         }
-        return await super()._do_download(
-            output_dir=output_dir,
-            callback=callback,
-            callback_args=callback_args,
-            callback_kwargs=callback_kwargs,
-            proxy=proxy,
-            headers=headers,
-        )
+        return proxy, headers
 
 
 class CoolapkImageParseResult(ImageParseResult, CoolapkParseResult): ...
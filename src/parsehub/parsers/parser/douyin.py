@@ -1,12 +1,9 @@
 from dataclasses import dataclass, field
 from enum import Enum
-from pathlib import Path
 from typing import Self, Union
 
-from ... import ProgressCallback
 from ...provider_api.douyin import DouyinWebCrawler
 from ...types import (
-    DownloadResult,
     ImageParseResult,
     ImageRef,
     LivePhotoRef,
@@ -24,6 +21,7 @@ class DouyinParser(BaseParser):
     __platform__ = Platform.DOUYIN
     __supported_type__ = ["视频", "图文"]
     __match__ = r"^(http(s)?://)?.+douyin.com/(?!share/user|qishui).+"
+    __hosts__ = ["douyin.com", "iesdouyin.com"]
     __redirect_keywords__ = ["v.douyin", "iesdouyin"]
     __reserved_parameters__ = ["modal_id"]
 
@@ -65,27 +63,8 @@ class DouyinParser(BaseParser):
 
 
 class DouyinParseResult(ParseResult):
-    async def _do_download(
-        self,
-        *,
-        output_dir: str | Path,
-        callback: ProgressCallback | None = None,
-        callback_args: tuple = (),
-        callback_kwargs: dict | None = None,
-        proxy: str | None = None,
-        headers: dict | None = None,
-    ) -> "DownloadResult":
-        headers = {
-            "Referer": "https://www.douyin.com/",
-        }
-        return await super()._do_download(
-            output_dir=output_dir,
-            callback=callback,
-            callback_args=callback_args,
-            callback_kwargs=callback_kwargs,
-            proxy=proxy,
-            headers=headers,
-        )
+    def _request_options(self, proxy: str | None, headers: dict | None) -> tuple[str | None, dict | None]:
+        return proxy, {"Referer": "https://www.douyin.com/"}
 
 
 class DouyinVideoParseResult(DouyinParseResult, VideoParseResult): ...
@@ -11,6 +11,7 @@ class FacebookParse(YtParser):
     __platform__ = Platform.FACEBOOK
     __supported_type__ = ["视频", "图文"]
     __match__ = r"^(http(s)?://)?.+facebook.com/.*"
+    __hosts__ = ["facebook.com"]
 
     def __init__(self, *, proxy: str | None = None, cookie: str | dict | None = None) -> None:
         super().__init__(proxy=proxy, cookie=cookie)
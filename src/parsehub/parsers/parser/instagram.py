@@ -14,6 +14,7 @@ class InstagramParser(BaseParser):
     __platform__ = Platform.INSTAGRAM
     __supported_type__ = ["视频", "图文"]
     __match__ = r"^(http(s)?://)(www\.|)instagram\.com/(p|reel|share|.*/p|.*/reel)/.*"
+    __hosts__ = ["instagram.com"]
     __redirect_keywords__ = ["share"]
 
     async def _do_parse(self, raw_url: str) -> VideoParseResult | ImageParseResult | MultimediaParseResult:
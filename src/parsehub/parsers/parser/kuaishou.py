@@ -7,6 +7,7 @@ class KuaiShouParser(BaseParser):
     __platform__ = Platform.KUAISHOU
     __supported_type__ = ["视频"]
     __match__ = r"^(http(s)?://)?(www|v)\.kuaishou.com/.+"
+    __hosts__ = ["kuaishou.com"]
     __redirect_keywords__ = ["v.kuaishou", "/f/"]
 
     async def _do_parse(self, raw_url: str) -> VideoParseResult:
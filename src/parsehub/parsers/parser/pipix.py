@@ -9,6 +9,7 @@ class PipixParser(BaseParser):
     __platform__ = Platform.PIPIX
     __supported_type__ = ["视频", "图文"]
     __match__ = r"^(http(s)?://)?h5.pipix.com/(s|ppx/item)/.+"
+    __hosts__ = ["pipix.com"]
     __redirect_keywords__ = ["/s/"]
 
     async def _do_parse(self, raw_url: str) -> Union["ImageParseResult", "VideoParseResult"]:
@@ -1,10 +1,8 @@
 from __future__ import annotations
 
-from pathlib import Path
-
 from ...config import GlobalConfig
 from ...provider_api.pttcc import PTTCC
-from ...types import DownloadResult, ImageRef, ProgressCallback, RichTextParseResult
+from ...types import ImageRef, RichTextParseResult
 from ...types.platform import Platform
 from ..base.base import BaseParser
 
@@ -21,34 +19,15 @@ class PTTRichTextParseResult(RichTextParseResult):
         self.parse_proxy = proxy
         super().__init__(title=title, media=media, markdown_content=markdown_content)
 
-    async def _do_download(
-        self,
-        *,
-        output_dir: str | Path,
-        callback: ProgressCallback | None = None,
-        callback_args: tuple = (),
-        callback_kwargs: dict | None = None,
-        proxy: str | None = None,
-        headers: dict | None = None,
-    ) -> DownloadResult:
-        resolved_proxy = proxy or self.parse_proxy
-        resolved_headers = {"User-Agent": GlobalConfig.ua}
-        if headers:
-            resolved_headers.update(headers)
-        return await super()._do_download(
-            output_dir=output_dir,
-            callback=callback,
-            callback_args=callback_args,
-            callback_kwargs=callback_kwargs,
-            proxy=resolved_proxy,
-            headers=resolved_headers,
-        )
+    def _request_options(self, proxy: str | None, headers: dict | None) -> tuple[str | None, dict | None]:
+        return proxy or self.parse_proxy, {"User-Agent": GlobalConfig.ua, **(headers or {})}
 
 
 class PTTParser(BaseParser):
     __platform__ = Platform.PTT
     __supported_type__ = ["图文"]
     __match__ = r"^(http(s)?://)?.+ptt\.cc/bbs/.*"
+    __hosts__ = ["ptt.cc"]
 
     async def _do_parse(self, raw_url: str) -> PTTRichTextParseResult:
         parsed = await PTTCC.parse(raw_url, proxy=self.proxy, cookies=self.cookie)
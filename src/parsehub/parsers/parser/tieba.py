@@ -1,9 +1,8 @@
 from typing import Union
 
-import httpx
-
 from ...provider_api.tieba import TieBa, TieBaError, TieBaPostType, TieBaVideo
 from ...types import AniRef, ImageParseResult, ImageRef, ParseError, Platform, VideoParseResult, VideoRef
+from ...utils.http_client import http_client
 from ..base.base import BaseParser
 
 
@@ -11,6 +10,7 @@ class TieBaParser(BaseParser):
     __platform__ = Platform.TIEBA
     __supported_type__ = ["视频", "图文"]
     __match__ = r"^(http(s)?://)?.+tieba.baidu.com/p/\d+"
+    __hosts__ = ["tieba.baidu.com"]
 
     async def _do_parse(self, raw_url: str) -> Union["ImageParseResult", "VideoParseResult"]:
         try:
@@ -40,7 +40,7 @@ class TieBaParser(BaseParser):
                 images: list[ImageRef | AniRef] = []
                 if isinstance(tb.media, list):
                     for i in tb.media:
-                        async with httpx.AsyncClient(proxy=self.proxy) as cli:
+                        async with http_client(proxy=self.proxy, scope="tieba") as cli:
                             try:
                                 r = await cli.head(i.url)
                                 r.raise_for_status()
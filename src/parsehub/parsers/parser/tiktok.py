@@ -1,12 +1,9 @@
 from dataclasses import dataclass, field
 from enum import Enum
-from pathlib import Path
 from typing import Any, Self, Union
 
-from ... import ProgressCallback
 from ...provider_api.tiktok import TikTokWebCrawler
 from ...types import (
-    DownloadResult,
     ImageParseResult,
     ImageRef,
     ParseError,
@@ -21,6 +18,7 @@ class TikTokParser(BaseParser):
     __platform__ = Platform.TIKTOK
     __supported_type__ = ["视频", "图文"]
     __match__ = r"^(http(s)?://)?.+tiktok.com/(?!share/user|qishui).+"
+    __hosts__ = ["tiktok.com"]
     __redirect_keywords__ = ["vt.tiktok"]
 
     async def _do_parse(self, raw_url: str) -> Union["VideoParseResult", "ImageParseResult"]:
@@ -60,27 +58,8 @@ class TikTokParser(BaseParser):
 
 
 class TikTokVideoParseResult(VideoParseResult):
-    async def _do_download(
-        self,
-        *,
-        output_dir: str | Path,
-        callback: ProgressCallback | None = None,
-        callback_args: tuple = (),
-        callback_kwargs: dict | None = None,
-        proxy: str | None = None,
-        headers: dict | None = None,
-    ) -> "DownloadResult":
-        headers = {
-            "Referer": "https://www.tiktok.com/",
-        }
-        return await super()._do_download(
-            output_dir=output_dir,
-            callback=callback,
-            callback_args=callback_args,
-            callback_kwargs=callback_kwargs,
-            proxy=proxy,
-            headers=headers,
-        )
+    def _request_options(self, proxy: str | None, headers: dict | None) -> tuple[str | None, dict | None]:
+        return proxy, {"Referer": "https://www.tiktok.com/"}
 
 
 def media_urls(data: dict | str | list | None) -> list[str]:
@@ -25,6 +25,7 @@ class TwitterParser(BaseParser):
     __platform__ = Platform.TWITTER
     __supported_type__ = ["视频", "图文"]
     __match__ = r"^(http(s)?://)?.+(twitter|fixupx|x).com/.*/status/\d+"
+    __hosts__ = ["twitter.com", "x.com", "fixupx.com", "fxtwitter.com", "vxtwitter.com", "fixvx.com"]
 
     async def _do_parse(self, raw_url: str) -> MultimediaParseResult | RichTextParseResult:
         tweet = await self._parse(raw_url)
@@ -18,6 +18,7 @@ class WeiboParser(BaseParser):
     __platform__ = Platform.WEIBO
     __supported_type__ = ["视频", "图文"]
     __match__ = r"^(http(s)?://)((m\.|video\.|)weibo\.(com|cn)/(?!(u/)).+|mapp\.api\.weibo\.cn/fx/.+)"
+    __hosts__ = ["weibo.com", "weibo.cn"]
     __reserved_parameters__ = ["fid"]
 
     async def _do_parse(self, raw_url: str) -> MultimediaParseResult | VideoParseResult | ImageParseResult:
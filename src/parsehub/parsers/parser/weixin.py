@@ -7,6 +7,7 @@ class WXParser(BaseParser):
     __platform__ = Platform.WEIXIN
     __supported_type__ = ["图文"]
     __match__ = r"^(http(s)?://)mp.weixin.qq.com/s/.*"
+    __hosts__ = ["mp.weixin.qq.com"]
 
     async def _do_parse(self, raw_url: str) -> "RichTextParseResult":
         wx = await WX.parse(raw_url, self.proxy)
@@ -1,8 +1,6 @@
 import re
 from typing import Union
 
-import httpx
-
 from ...provider_api.xhs import XHSAPI, XHSMedia, XHSMediaType, XHSPostType
 from ...types import (
     ImageParseResult,
@@ -14,6 +12,7 @@ from ...types import (
     VideoParseResult,
     VideoRef,
 )
+from ...utils.http_client import http_client
 from ..base import BaseParser
 
 
@@ -21,6 +20,7 @@ class XHSParser(BaseParser):
     __platform__ = Platform.XHS
     __supported_type__ = ["视频", "图文"]
     __match__ = r"^(http(s)?://)?.+(xiaohongshu|xhslink).com/.+"
+    __hosts__ = ["xiaohongshu.com", "xhslink.com"]
     __redirect_keywords__ = ["xhslink", "item"]
     __after_clean_parameters__ = ["xsec_token"]
 
@@ -67,7 +67,7 @@ class XHSParser(BaseParser):
                 raise ParseError("不支持的类型")
 
     async def get_ext_by_url(self, url: str) -> str:
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
+        async with http_client(proxy=self.proxy, scope="xhs") as client:
             try:
                 response = await client.head(url, follow_redirects=True)
             except Exception:
@@ -18,6 +18,7 @@ class XiaoHeiHeParser(BaseParser):
     __platform__ = Platform.XIAOHEIHE
     __supported_type__ = ["视频", "图文"]
     __match__ = r"^(http(s)?://)?.+xiaoheihe.cn/(v3|app)/bbs/(app|link).+"
+    __hosts__ = ["xiaoheihe.cn"]
     __redirect_keywords__ = ["api.xiaoheihe"]
 
     async def _do_parse(self, raw_url: str) -> AnyParseResult:
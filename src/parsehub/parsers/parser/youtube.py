@@ -9,6 +9,7 @@ class YtbParse(YtParser):
     __platform__ = Platform.YOUTUBE
     __supported_type__ = ["视频", "音乐"]
     __match__ = r"^(http(s)?://).*youtu(be|.be)?(\.com)?/(?!(live|post))(?!@).+"
+    __hosts__ = ["youtube.com", "youtu.be"]
     __redirect_keywords__ = ["m.youtube.com"]
     __reserved_parameters__ = ["v", "list", "index"]
 
@@ -7,6 +7,7 @@ class ZuiYouParser(BaseParser):
     __platform__ = Platform.ZUIYOU
     __supported_type__ = ["视频", "图文"]
     __match__ = r"^(http(s)?://)share.xiaochuankeji.cn/hybrid/share/post\?pid=\d+"
+    __hosts__ = ["share.xiaochuankeji.cn"]
     __reserved_parameters__ = ["pid"]
 
     async def _do_parse(self, raw_url: str) -> MultimediaParseResult:
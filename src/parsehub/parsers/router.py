@@ -0,0 +1,77 @@
+from collections.abc import Sequence
+from urllib.parse import urlsplit
+
+from ..utils.utils import match_url
+from .base.base import BaseParser
+from .lazy import LazyParser, ParserLike, load_parser
+
+
+class ParserRouter:
+    """解析器路由
+
+    根据注册表一次性构建域名索引, 路由时只提取一次链接, 再按域名后缀找到候选解析器,
+    仅对候选解析器执行匹配规则. 未声明 ``__hosts__`` 的解析器会作为所有域名的候选.
+    LazyParser 只在命中后才会导入
+    """
+
+    def __init__(self, parsers: Sequence[ParserLike]) -> None:
+        self.parsers = list(parsers)
+        self._special = [p for p in self.parsers if _has_match_special(p)]
+        self._fallback = [p for p in self.parsers if not p.__hosts__]
+
+        by_host: dict[str, list[ParserLike]] = {}
+        for parser in self.parsers:
+            for host in parser.__hosts__:
+                by_host.setdefault(host.lower().strip("."), []).append(parser)
+
+        # 候选列表与兜底解析器合并, 保持注册顺序
+        order = {parser: i for i, parser in enumerate(self.parsers)}
+        self._by_host = {
+            host: sorted({*candidates, *self._fallback}, key=order.__getitem__) for host, candidates in by_host.items()
+        }
+
+    def route(self, text: str) -> tuple[type[BaseParser], str] | None:
+        """路由
+        :param text: 分享文案 / 分享链接
+        :return: (解析器, 提取出的链接), 没有匹配的解析器时返回 None
+        """
+        for parser in self._special:
+            if parser.match_special(text):
+                return load_parser(parser), text.strip()
+
+        url = match_url(text)
+        if not url:
+            return None
+        for parser in self.candidates(url):
+            if parser.is_match_url(url):
+                return load_parser(parser), url
+        return None
+
+    def candidates(self, url: str) -> list[ParserLike]:
+        """获取链接的候选解析器, 按域名从长到短匹配"""
+        labels = _hostname(url).split(".")
+        for i in range(len(labels)):
+            if (candidates := self._by_host.get(".".join(labels[i:]))) is not None:
+                return candidates
+        return self._fallback
+
+
+def _hostname(url: str) -> str:
+    if "://" not in url:
+        url = f"http://{url}"
+    try:
+        host = urlsplit(url).hostname
+    except ValueError:
+        return ""
+    return (host or "").rstrip(".")
+
+
+def _has_match_special(parser: ParserLike) -> bool:
+    if parser.__special_match__:
+        return True
+    if isinstance(parser, LazyParser):
+        return False
+    return parser.match_special.__func__ is not BaseParser.match_special.__func__  # type: ignore[attr-defined]
+
+
+__all__ = ["ParserRouter"]
@@ -12,6 +12,8 @@ from typing import Any, cast
 
 import httpx
 
+from ..utils.http_client import get_http_pool, http_client
+
 USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36"
 )
@@ -55,12 +57,12 @@ class BiliAPI:
         headers |= {
             "referer": f"https://t.bilibili.com/{dyn_id}",
         }
-        response = await self._get_client().get(
-            "https://api.bilibili.com/x/polymer/web-dynamic/v1/detail",
-            headers=headers,
-            params=params,
-            cookies=cookie,
-        )
+        async with http_client(proxy=self.proxy, scope="bilibili", cookies=cookie) as client:
+            response = await client.get(
+                "https://api.bilibili.com/x/polymer/web-dynamic/v1/detail",
+                headers=headers,
+                params=params,
+            )
         response.raise_for_status()
         mj = response.json()
         if not (data := mj.get("data")):
@@ -81,6 +83,7 @@ class BiliAPI:
         response = await self._get_client().get(
             "https://api.bilibili.com/x/web-interface/view/detail",
             params={"bvid": bvid},
+            headers=self.headers,
         )
         if response.status_code == 412:
             raise Exception("由于触发哔哩哔哩安全风控策略，该次访问请求被拒绝。")
@@ -116,6 +119,7 @@ class BiliAPI:
         response = await self._get_client().get(
             "https://api.bilibili.com/x/player/playurl",
             params=params,
+            headers=self.headers,
             cookies=cookies,
         )
         return cast(dict[str, Any], response.json())
@@ -124,6 +128,7 @@ class BiliAPI:
         """获取 buvid"""
         response = await self._get_client().get(
             "https://api.bilibili.com/x/frontend/finger/spi",
+            headers=self.headers,
         )
         data = response.json()
         return data["data"]["b_3"], data["data"]["b_4"]
@@ -147,12 +152,15 @@ class BiliAPI:
                 "w_rid": w_rid,
                 "wts": wts,
             },
+            headers=self.headers,
         )
         return AISummaryResult.parse(result.json())
 
     def _get_client(self) -> httpx.AsyncClient:
+        if (pool := get_http_pool()) is not None:
+            return pool.get(proxy=self.proxy, scope="bilibili")
         if self._client is None or getattr(self._client, "is_closed", False):
-            self._client = httpx.AsyncClient(proxy=self.proxy, headers=self.headers)
+            self._client = httpx.AsyncClient(proxy=self.proxy)
         return self._client
 
     async def aclose(self):
@@ -535,7 +543,7 @@ class BiliWbiSigner:
     @staticmethod
     async def fetch_wbi_keys() -> tuple[str, str]:
         """获取最新的 img_key 和 sub_key"""
-        async with httpx.AsyncClient() as client:
+        async with http_client(scope="bilibili") as client:
             try:
                 resp = await client.get(
                     "https://api.bilibili.com/x/web-interface/nav",
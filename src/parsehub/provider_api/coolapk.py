@@ -1,11 +1,11 @@
 from dataclasses import dataclass
 
-import httpx
 from bs4 import BeautifulSoup
 from markdown import markdown
 from markdownify import MarkdownConverter
 
 from ..config import GlobalConfig
+from ..utils.http_client import http_client
 
 
 @dataclass
@@ -17,8 +17,8 @@ class Coolapk:
 
     @classmethod
     async def parse(cls, url: str, proxy: str | None = None) -> "Coolapk":
-        async with httpx.AsyncClient(headers={"User-Agent": GlobalConfig.ua}, proxy=proxy) as client:
-            result = await client.get(url)
+        async with http_client(proxy=proxy, scope="coolapk") as client:
+            result = await client.get(url, headers={"User-Agent": GlobalConfig.ua})
         soup = BeautifulSoup(result.text, "lxml")
         # 酷安网页版不加载实况照片
         title_element = soup.find(class_="message-title")
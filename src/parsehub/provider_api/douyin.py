@@ -9,10 +9,10 @@ from random import choice, randint
 from typing import Any, cast
 from urllib.parse import quote, urlencode
 
-import httpx
 from gmssl import func, sm3
 
 from ..errors import ParseError
+from ..utils.http_client import http_client
 
 DEFAULT_USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
@@ -719,8 +719,8 @@ class DouyinWebCrawler:
         }
 
     async def get_aweme_id(self, url: str) -> str:
-        async with httpx.AsyncClient(proxy=self.proxy, timeout=10) as client:
-            response = await client.get(url, follow_redirects=True)
+        async with http_client(proxy=self.proxy, scope="douyin") as client:
+            response = await client.get(url, follow_redirects=True, timeout=10)
             response.raise_for_status()
             response_url = str(response.url)
             for pattern in [
@@ -735,9 +735,7 @@ class DouyinWebCrawler:
             raise ValueError("未在响应的地址中找到 aweme_id")
 
     async def fetch_one_video(self, aweme_id: str) -> dict:
-        async with httpx.AsyncClient(
-            headers=self._get_headers(), proxy=self.proxy, timeout=10, cookies=self.cookie
-        ) as client:
+        async with http_client(proxy=self.proxy, scope="douyin", cookies=self.cookie) as client:
             params = {
                 "device_platform": "webapp",
                 "aid": "6383",
@@ -768,7 +766,7 @@ class DouyinWebCrawler:
                 try:
                     a_bogus = ABogus().get_value(params)
                     endpoint = f"{POST_DETAIL}?{urlencode(params)}&a_bogus={quote(a_bogus, safe='')}"
-                    response = await client.get(endpoint)
+                    response = await client.get(endpoint, headers=self._get_headers(), timeout=10)
                     response.raise_for_status()
                     return cast(dict[str, Any], response.json())
                 except Exception as e:
@@ -1,10 +1,9 @@
 from dataclasses import dataclass
 from typing import Any, cast
 
-import httpx
-
 from .. import ParseError
 from ..config.config import GlobalConfig
+from ..utils.http_client import http_client
 
 
 class KuaiShouAPI:
@@ -107,8 +106,8 @@ class KuaiShouAPI:
         }
         """,
         }
-        async with httpx.AsyncClient(proxy=self.proxy, headers=self.headers, cookies=self.cookie) as client:
-            response = await client.post(self.api_url, json=body)
+        async with http_client(proxy=self.proxy, scope="kuaishou", cookies=self.cookie) as client:
+            response = await client.post(self.api_url, json=body, headers=self.headers)
             response.raise_for_status()
             raw_data = response.json()
             if not (data := raw_data.get("data")):
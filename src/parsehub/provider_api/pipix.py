@@ -4,10 +4,10 @@ from dataclasses import dataclass
 from enum import Enum
 from urllib.parse import unquote
 
-import httpx
 from bs4 import BeautifulSoup
 
 from ..config import GlobalConfig
+from ..utils.http_client import http_client
 
 
 class Pipix:
@@ -15,7 +15,7 @@ class Pipix:
         self.proxy = proxy
 
     async def parse(self, t_url: str) -> "PipixPost":
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
+        async with http_client(proxy=self.proxy, scope="pipix") as client:
             resp = await client.get(t_url, headers={"User-Agent": GlobalConfig.ua})
             resp.raise_for_status()
             return self._parse_data(resp.text)
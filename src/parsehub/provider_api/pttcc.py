@@ -3,11 +3,11 @@ from __future__ import annotations
 from dataclasses import dataclass
 from urllib.parse import urljoin
 
-import httpx
 from bs4 import BeautifulSoup
 from markdownify import MarkdownConverter
 
 from ..config import GlobalConfig
+from ..utils.http_client import http_client
 
 
 @dataclass
@@ -23,12 +23,8 @@ class PTTCC:
         if isinstance(cookies, dict):
             request_cookies.update(cookies)
 
-        async with httpx.AsyncClient(
-            headers={"User-Agent": GlobalConfig.ua},
-            proxy=proxy,
-            cookies=request_cookies,
-        ) as client:
-            response = await client.get(url)
+        async with http_client(proxy=proxy, scope="ptt", cookies=request_cookies) as client:
+            response = await client.get(url, headers={"User-Agent": GlobalConfig.ua})
         response.raise_for_status()
 
         soup = BeautifulSoup(response.text, "html.parser")
@@ -7,9 +7,8 @@ import string
 from dataclasses import dataclass
 from enum import Enum
 
-import httpx
-
 from ..config.config import GlobalConfig
+from ..utils.http_client import http_client
 
 
 class ThreadsAPI:
@@ -36,7 +35,7 @@ class ThreadsAPI:
             "lsd": lsd,
         }
 
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
+        async with http_client(proxy=self.proxy, scope="threads") as client:
             response = await client.post("https://www.threads.com/ajax/route-definition", headers=headers, data=data)
             response.raise_for_status()
             jsonp = [json.loads(j.strip()) for j in response.text.strip().split("for (;;);") if j]
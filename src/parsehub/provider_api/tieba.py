@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Any, cast
 
-import httpx
+from ..utils.http_client import http_client
 
 
 class TieBa:
@@ -23,7 +23,7 @@ class TieBa:
         return hashlib.md5((base_str + salt).encode("utf-8")).hexdigest()
 
     async def fetch_tbs(self) -> str:
-        async with httpx.AsyncClient(proxy=self.proxy) as cli:
+        async with http_client(proxy=self.proxy, scope="tieba") as cli:
             result = await cli.get("http://tieba.baidu.com/dc/common/tbs")
             result.raise_for_status()
         result = result.json()
@@ -54,8 +54,8 @@ class TieBa:
             "_client_type": "20",
         }
         data["sign"] = self.gen_sign(data)
-        async with httpx.AsyncClient(proxy=self.proxy, timeout=30) as cli:
-            result = await cli.post("https://tieba.baidu.com/c/f/pb/page_pc", data=data)
+        async with http_client(proxy=self.proxy, scope="tieba") as cli:
+            result = await cli.post("https://tieba.baidu.com/c/f/pb/page_pc", data=data, timeout=30)
             result.raise_for_status()
             result = result.json()
         if result["error_code"]:
@@ -2,12 +2,14 @@ import asyncio
 import html
 import json
 import re
+from contextlib import AbstractAsyncContextManager
 from typing import Any, NamedTuple, cast
 from urllib.parse import urlencode, urlparse
 
 import httpx
 
 from ..config import GlobalConfig
+from ..utils.http_client import http_client
 
 TIKTOK_APP_FEED = "https://api22-normal-c-alisg.tiktokv.com/aweme/v1/feed/"
 
@@ -79,14 +81,11 @@ class TikTokWebCrawler:
         except Exception as web_error:
             raise RuntimeError(f"获取 TikTok 作品失败: feed={primary_error}; web={web_error}") from web_error
 
-    def _client(self, *, headers: dict[str, str] | None = None) -> httpx.AsyncClient:
-        return httpx.AsyncClient(
-            headers=headers or self.headers,
-            timeout=self.timeout,
-            follow_redirects=True,
-            proxy=self.proxy,
-            cookies=self.cookies,
-        )
+    def _client(self) -> AbstractAsyncContextManager[httpx.AsyncClient]:
+        return http_client(proxy=self.proxy, scope="tiktok", cookies=self.cookies)
+
+    def _request_options(self, *, headers: dict[str, str] | None = None) -> dict[str, Any]:
+        return {"headers": headers or self.headers, "timeout": self.timeout, "follow_redirects": True}
 
     @classmethod
     def extract_url(cls, text: str) -> str:
@@ -112,7 +111,7 @@ class TikTokWebCrawler:
             return url
 
         async with self._client() as client:
-            response = await client.get(url)
+            response = await client.get(url, **self._request_options())
             response.raise_for_status()
             resolved = str(response.url)
 
@@ -127,10 +126,11 @@ class TikTokWebCrawler:
 
         headers = dict(TIKTOK_WEB_HEADERS)
         headers["User-Agent"] = FACEBOOK_EXTERNAL_HIT_UA
-        async with self._client(headers=headers) as client:
-            response = await client.head(url)
+        options = self._request_options(headers=headers)
+        async with self._client() as client:
+            response = await client.head(url, **options)
             if response.status_code >= 400:
-                response = await client.get(url)
+                response = await client.get(url, **options)
             response.raise_for_status()
             return str(response.url)
 
@@ -152,7 +152,7 @@ class TikTokWebCrawler:
         for attempt in range(self.max_retries):
             try:
                 async with self._client() as client:
-                    response = await client.get(endpoint)
+                    response = await client.get(endpoint, **self._request_options())
                     response.raise_for_status()
                     payload = response.json()
 
@@ -197,10 +197,11 @@ class TikTokWebCrawler:
         return item
 
     async def download_webpage(self, url: str) -> str:
-        async with self._client(headers=TIKTOK_WEB_HEADERS) as client:
+        options = self._request_options(headers=TIKTOK_WEB_HEADERS)
+        async with self._client() as client:
             last_webpage = ""
             for attempt in range(self.max_retries):
-                response = await client.get(url)
+                response = await client.get(url, **options)
                 if urlparse(str(response.url)).path == "/login":
                     raise RuntimeError("TikTok 要求登录才能访问这个内容")
                 response.raise_for_status()
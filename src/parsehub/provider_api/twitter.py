@@ -6,11 +6,11 @@ from collections.abc import Callable
 from dataclasses import dataclass
 from typing import Literal, NamedTuple
 
-import httpx
 from loguru import logger
 
 from ..config import GlobalConfig
 from ..types import ParseError
+from ..utils.http_client import http_client
 
 
 class Twitter:
@@ -63,12 +63,11 @@ class Twitter:
             "fieldToggles": '{"withArticleRichContentState":true,"withArticlePlainText":false}',
         }
 
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
+        async with http_client(proxy=self.proxy, scope="twitter", cookies=cookie) as client:
             response = await client.get(
                 "https://api.twitter.com/graphql/kPLTRmMnzbPTv70___D06w/TweetResultByRestId",
                 params=params,
                 headers=headers,
-                cookies=cookie,
             )
         response.raise_for_status()
         return self.parse(response.json())
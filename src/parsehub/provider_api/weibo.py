@@ -8,7 +8,7 @@ from inspect import signature
 from typing import Any, Self, Union
 from urllib.parse import urlparse
 
-import httpx
+from ..utils.http_client import http_client
 
 
 class WeiboAPI:
@@ -28,8 +28,8 @@ class WeiboAPI:
         parsed = urlparse(url)
 
         async def fn() -> str:
-            async with httpx.AsyncClient(proxy=self.proxy, follow_redirects=False, timeout=30) as client:
-                response = await client.get(url)
+            async with http_client(proxy=self.proxy, scope="weibo") as client:
+                response = await client.get(url, follow_redirects=False, timeout=30)
                 if response.is_error:
                     response.raise_for_status()
             return response.headers.get("location") or url
@@ -59,8 +59,8 @@ class WeiboAPI:
             "referer": "https://weibo.com",
         }
         api = f"https://weibo.com/ajax/statuses/show?id={bid}&isGetLongText=true"
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
-            response = await client.get(api, cookies=self._cookies, headers=headers)
+        async with http_client(proxy=self.proxy, scope="weibo", cookies=self._cookies) as client:
+            response = await client.get(api, headers=headers)
             response.raise_for_status()
             result: dict = response.json()
             return result
@@ -74,9 +74,9 @@ class WeiboAPI:
             "page": f"/tv/show/{oid}",
         }
         data = {"data": f'{{"Component_Play_Playinfo":{{"oid":"{oid}"}}}}'}
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
+        async with http_client(proxy=self.proxy, scope="weibo", cookies=self._cookies) as client:
             response = await client.post(
-                "https://weibo.com/tv/api/component", cookies=self._cookies, headers=headers, data=data, params=params
+                "https://weibo.com/tv/api/component", headers=headers, data=data, params=params
             )
             response.raise_for_status()
             result: dict = response.json()
@@ -1,13 +1,13 @@
 from dataclasses import dataclass
 from typing import Any, cast
 
-import httpx
 from bs4 import BeautifulSoup, Tag
 from markdown import markdown
 from markdownify import MarkdownConverter
 
 from ..config import GlobalConfig
 from ..types import ParseError
+from ..utils.http_client import http_client
 
 
 class WXConverter(MarkdownConverter):
@@ -32,7 +32,7 @@ class WX:
 
     @staticmethod
     async def parse(url: str, proxy: str | None = None) -> "WX":
-        async with httpx.AsyncClient(proxy=proxy) as client:
+        async with http_client(proxy=proxy, scope="weixin") as client:
             response = await client.get(url, headers={"User-Agent": GlobalConfig.ua})
             html = response.text
             return WX._parse_html(html)
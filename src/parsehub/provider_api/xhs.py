@@ -7,9 +7,10 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Any, cast
 
-import httpx
 from bs4 import BeautifulSoup
 
+from ..utils.http_client import http_client
+
 
 class XHSAPI:
     def __init__(self, proxy: str | None = None, cookie: dict | None = None):
@@ -17,7 +18,7 @@ class XHSAPI:
         self.cookie = cookie
 
     async def __fetch_html(self, url: str) -> str:
-        async with httpx.AsyncClient(proxy=self.proxy, cookies=self.cookie) as client:
+        async with http_client(proxy=self.proxy, scope="xhs", cookies=self.cookie) as client:
             return (await client.get(url, timeout=30)).text
 
     @staticmethod
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from enum import Enum
 from urllib.parse import urlparse
 
-import httpx
+from ..utils.http_client import http_client
 
 
 class MediaType(Enum):
@@ -50,7 +50,7 @@ class ZuiYou:
 
     async def parse(self, url: str) -> ZuiYouPost:
         pid = self.get_id_by_url(url)
-        async with httpx.AsyncClient(proxy=self.proxy) as cli:
+        async with http_client(proxy=self.proxy, scope="zuiyou") as cli:
             result = await cli.post(self.api_url, json={"pid": pid})
         return ZuiYouPost.parse(result.json())
 
@@ -11,11 +11,13 @@ class MediaFile:
         path: 路径
         width: 宽度
         height: 高度
+        digest: 下载时计算的文件摘要 (十六进制), 算法见 DownloadResult.digest_algorithm
     """
 
     path: str | Path
     width: int = 0
     height: int = 0
+    digest: str | None = None
 
     def __post_init__(self) -> None:
         if not self.width:
@@ -36,6 +38,7 @@ class VideoFile(MediaFile):
         width: 宽度
         height: 高度
         duration: 视频时长，单位: 秒
+        digest: 文件摘要
     """
 
     duration: int = 0
@@ -55,6 +58,7 @@ class ImageFile(MediaFile):
         path: 路径
         width: 宽度
         height: 高度
+        digest: 文件摘要
     """
 
 
@@ -66,6 +70,7 @@ class AniFile(MediaFile):
         width: 宽度
         height: 高度
         duration: 视频时长，单位: 秒
+        digest: 文件摘要
     """
 
     duration: int = 0
@@ -87,9 +92,12 @@ class LivePhotoFile(MediaFile):
         height: 高度
         video_path: 视频路径
         duration: 视频时长，单位: 秒
+        digest: 图片文件的摘要
+        video_digest: 视频文件的摘要
     """
 
     video_path: str | Path | None = None
+    video_digest: str | None = None
     duration: int = 3
 
     def __post_init__(self) -> None:
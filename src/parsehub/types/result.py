@@ -1,20 +1,30 @@
+import asyncio
+import hashlib
 import json
+import os
 import shutil
 import time
 from abc import ABC
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
 from dataclasses import asdict
 from pathlib import Path
-from typing import Any, ClassVar
+from typing import ClassVar
 
 import aiofiles
+import httpx
 from bs4 import BeautifulSoup
 from markdown import markdown as md_to_html
 from slugify import slugify
 
 from ..config import GlobalConfig
 from ..errors import DeleteError, DownloadError
-from ..utils.downloader import download
+from ..media_store import get_media_store
+from ..utils.digest import StreamingDigest
+from ..utils.downloader import DownloadSession, download, iter_bytes
+from ..utils.media_info import MediaInfo
+from ..utils.media_probe import HeaderProbe
+from ..utils.progress import ProgressThrottle
+from ..utils.scheduler import download_job
 from ..utils.utils import run_sync
 from .callback import ProgressCallback
 from .media_file import AniFile, AnyMediaFile, ImageFile, LivePhotoFile, VideoFile
@@ -74,6 +84,15 @@ class ParseResult(ABC):  # noqa: B024
             "media": media,
         }
 
+    def _request_options(self, proxy: str | None, headers: dict | None) -> tuple[str | None, dict | None]:
+        """
+        下载媒体时使用的代理和请求头, 平台需要 Referer、User-Agent 等请求头时重写
+        :param proxy: 调用方指定的代理
+        :param headers: 调用方指定的请求头
+        :return: (代理, 请求头)
+        """
+        return proxy, headers
+
     async def _do_download(
         self,
         *,
@@ -83,87 +102,149 @@ class ParseResult(ABC):  # noqa: B024
         callback_kwargs: dict | None = None,
         proxy: str | None = None,
         headers: dict | None = None,
+        aggregate_bytes: bool = False,
+        digest: str | None = None,
+        resume: bool = False,
     ) -> "DownloadResult":
         """
-        执行下载
+        执行下载, 多个媒体按 GlobalConfig.download_concurrency 并发下载
         :param output_dir: 输出的子目录
         :param callback: 下载进度回调函数
         :param callback_args: 回调函数的参数
         :param callback_kwargs: 回调函数的关键字参数
         :param proxy: 代理
         :param headers: 请求头
+        :param aggregate_bytes: 多个媒体时汇总所有文件的字节进度 (unit=bytes), 默认报告已完成的文件数 (unit=count)
+        :param digest: 下载时计算文件摘要的算法, 例如 sha256、blake2b
+        :param resume: 记录已完成的文件, 再次下载到同一目录时直接使用
         :return: DownloadResult
         """
         if self.media is None:
             raise DownloadError("没有可下载的媒体")
         media_list = list(self.media) if isinstance(self.media, Sequence) else [self.media]
         is_single = not isinstance(self.media, Sequence)
+        callback_kwargs = callback_kwargs or {}
+        proxy, headers = self._request_options(proxy, headers)
+
+        limit = asyncio.Semaphore(GlobalConfig.download_concurrency)
+        # 各文件的 (已下载, 总大小), 总大小在文件开始下载后才能确定
+        file_bytes: dict[str, tuple[int, int]] = {}
+        # 各文件的进度已在 download 中节流, 汇总后的进度再节流一次, 避免并发文件数倍增回调频率
+        aggregate = (
+            ProgressThrottle(callback, args=("bytes", *callback_args), kwargs=callback_kwargs)
+            if callback and aggregate_bytes and not is_single
+            else None
+        )
 
-        result_list: list[AnyMediaFile] = []
-
-        for i, media in enumerate(media_list):
-            dl_progress = None
-            dl_progress_args = ()
-            dl_progress_kwargs: dict = {}
-            if callback and is_single:
-
-                async def _byte_callback(current: int, total: int, *args: Any, **kwargs: Any) -> None:
-                    await callback(current, total, "bytes", *args, **kwargs)
-
-                dl_progress = _byte_callback
-                dl_progress_args = callback_args
-                dl_progress_kwargs = callback_kwargs or {}
-
-            try:
+        def byte_progress(key: str) -> Callable[[int, int], Awaitable[None]] | None:
+            if not callback or not (is_single or aggregate_bytes):
+                return None
+
+            async def _byte_callback(current: int, total: int) -> None:
+                file_bytes[key] = (current, total)
+                done = sum(c for c, _ in file_bytes.values())
+                size = sum(t for _, t in file_bytes.values()) if all(t for _, t in file_bytes.values()) else 0
+                if aggregate:
+                    await aggregate(done, size)
+                else:
+                    await callback(done, size, "bytes", *callback_args, **callback_kwargs)
+
+            return _byte_callback
+
+        store = get_media_store()
+
+        async def fetch_file(url: str, path: str, segments: int = 1) -> "_Fetched":
+            progress = byte_progress(path)
+            # 媒体库按 sha256 存储, 未指定其他算法时下载中顺带计算, 入库时不再读取文件
+            hasher = StreamingDigest(digest or "sha256") if digest or store else None
+            async with limit:
+                if store and (stored := await store.fetch(url, path, headers=headers, proxy=proxy)):
+                    size = os.path.getsize(path)
+                    if progress:
+                        await progress(size, size)
+                    if hasher and hasher.algorithm != "sha256":
+                        await hasher.sync(path, size)
+                        return path, hasher.hexdigest(), None
+                    return path, stored if digest else None, None
+
+                # 最后一个响应 (重定向之后) 的 ETag / Last-Modified, 媒体库用于核对远端文件是否变化
+                validators: list[httpx.Headers] = []
+                # 下载时解析文件头, 创建 MediaFile 时不再打开文件读取宽高、时长
+                probe = HeaderProbe()
                 f = await download(
-                    media.url,
-                    f"{output_dir}/{i}.{media.ext}",
+                    url,
+                    path,
                     headers=headers,
                     proxy=proxy,
-                    progress=dl_progress,
-                    progress_args=dl_progress_args,
-                    progress_kwargs=dl_progress_kwargs,
+                    progress=progress,
+                    segments=segments,
+                    response_hook=lambda r: validators.append(r.headers),
+                    digest=hasher,
+                    probe=probe,
+                    resume=resume,
                 )
-            except Exception as e:
-                shutil.rmtree(output_dir, ignore_errors=True)
-                raise DownloadError(f"下载失败: {e}") from e
-
-            mf: AnyMediaFile
-            match media:
-                case ImageRef():
-                    mf = ImageFile(path=f, width=media.width, height=media.height)
-                case VideoRef():
-                    mf = VideoFile(path=f, width=media.width, height=media.height, duration=media.duration)
-                case AniRef():
-                    mf = AniFile(path=f, width=media.width, height=media.height, duration=media.duration)
-                case LivePhotoRef():
-                    mf = LivePhotoFile(path=f, width=media.width, height=media.height, duration=media.duration)
-                    if media.video_url:
-                        try:
-                            vf = await download(
-                                media.video_url,
-                                f"{output_dir}/{i}_video.{media.video_ext}",
-                                headers=headers,
-                                proxy=proxy,
-                            )
-                        except Exception as e:
-                            shutil.rmtree(output_dir, ignore_errors=True)
-                            raise DownloadError(f"LivePhoto 视频下载失败: {e}") from e
-                        else:
-                            mf.video_path = vf
-
-            result_list.append(mf)
-
-            if callback and not is_single:
-                await callback(
-                    len(result_list),
-                    len(media_list),
-                    "count",
-                    *callback_args,
+                if store:
+                    sha256 = hasher.hexdigest() if hasher and hasher.algorithm == "sha256" else None
+                    last = validators[-1] if validators else httpx.Headers()
+                    await store.add(
+                        url, f, etag=last.get("ETag"), last_modified=last.get("Last-Modified"), sha256=sha256
+                    )
+                return f, hasher.hexdigest() if digest and hasher else None, probe.info
+
+        async def fetch(i: int, media: AnyMediaRef) -> tuple[int, "_Downloaded"]:
+            path = f"{output_dir}/{i}.{media.ext}"
+            video_task = None
+            if isinstance(media, LivePhotoRef) and media.video_url:
+                video_task = asyncio.create_task(
+                    fetch_file(media.video_url, f"{output_dir}/{i}_video.{media.video_ext}")
                 )
+            try:
+                try:
+                    segments = GlobalConfig.download_segments if isinstance(media, VideoRef) else 1
+                    file = await fetch_file(media.url, path, segments)
+                except Exception as e:
+                    raise DownloadError(f"下载失败: {e}") from e
+                try:
+                    video = await video_task if video_task else None
+                except Exception as e:
+                    raise DownloadError(f"LivePhoto 视频下载失败: {e}") from e
+            finally:
+                if video_task and not video_task.done():
+                    video_task.cancel()
+                    await asyncio.gather(video_task, return_exceptions=True)
+
+            return i, (file, video)
+
+        downloaded: list[_Downloaded | None] = [None] * len(media_list)
+        # 同一帖子的所有文件共享下载会话, 复用到同一 CDN 的连接
+        async with DownloadSession():
+            # 任务创建时复制当前上下文, 帖子内的所有下载属于同一个下载任务, 在调度器中公平排队
+            with download_job(self.platform.id if self.platform else None):
+                tasks = [asyncio.create_task(fetch(i, media)) for i, media in enumerate(media_list)]
+            try:
+                for completed, next_done in enumerate(asyncio.as_completed(tasks), start=1):
+                    i, item = await next_done
+                    downloaded[i] = item
+                    if callback and not is_single and not aggregate_bytes:
+                        await callback(completed, len(media_list), "count", *callback_args)
+                # 下载时未能解析文件头的需要用 OpenCV / Pillow 读取文件, 在线程池中并发读取, 不阻塞事件循环
+                files = await asyncio.gather(
+                    *(
+                        asyncio.to_thread(_media_file, media, *item)
+                        for media, item in zip(media_list, downloaded, strict=True)
+                        if item is not None
+                    )
+                )
+            except BaseException:
+                # 任意一个失败时取消其余下载, 等待其退出后再由 download 决定是否清理目录
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
 
-        result_media = result_list[0] if is_single else result_list
-        return DownloadResult(result_media, output_dir)
+        if aggregate:
+            await aggregate.flush()
+        return DownloadResult(files[0] if is_single else files, output_dir, digest_algorithm=digest)
 
     async def download(
         self,
@@ -174,6 +255,9 @@ class ParseResult(ABC):  # noqa: B024
         callback_kwargs: dict | None = None,
         proxy: str | None = None,
         save_metadata: bool = False,
+        aggregate_bytes: bool = False,
+        digest: str | None = None,
+        resume: bool = False,
     ) -> "DownloadResult":
         """
         :param path: 保存路径
@@ -182,6 +266,10 @@ class ParseResult(ABC):  # noqa: B024
         :param callback_kwargs: 回调函数的关键字参数
         :param proxy: 代理
         :param save_metadata: 保存解析结果为 metadata.json, 默认为 False
+        :param aggregate_bytes: 多文件下载时改为报告所有文件的总字节进度, 默认为 False
+        :param digest: 下载时计算文件摘要的算法, 例如 sha256、blake2b, 结果保存在 MediaFile.digest
+        :param resume: 使用由标题和原始链接确定的固定目录, 失败时保留未完成的文件;
+            再次下载时已完成的文件直接使用, 未完成的文件断点续传. 默认每次下载到新目录, 失败时删除
         :return: DownloadResult
 
         Note:
@@ -194,16 +282,28 @@ class ParseResult(ABC):  # noqa: B024
             - unit: 进度单位
                 - ``bytes``: 字节进度，用于单文件下载时报告已下载/总字节数
                 - ``count``: 计数进度，用于多文件下载时报告已完成/总文件数
+
+            多文件并发下载, 并发数由 ``GlobalConfig.download_concurrency`` 控制.
+            ``aggregate_bytes=True`` 时多文件下载也报告 ``bytes``, total 为已开始下载的文件大小之和, 未知时为 0
         """
         save_dir = Path(path) if path else GlobalConfig.default_save_dir
         r = slugify(
-            self.title or self.content or str(time.time_ns()), allow_unicode=True, max_length=20, lowercase=False
+            self.title or self.content or ("" if resume and self.raw_url else str(time.time_ns())),
+            allow_unicode=True,
+            max_length=20,
+            lowercase=False,
         )
-        output_dir = save_dir.joinpath(r)
-        counter = 2
-        while output_dir.exists():
-            output_dir = save_dir.joinpath(f"{r}_{counter}")
-            counter += 1
+        if resume:
+            # 同一帖子每次下载到同一目录, 不同帖子即使标题相同也不共用目录
+            if self.raw_url:
+                r = "_".join(filter(None, (r, hashlib.sha1(self.raw_url.encode()).hexdigest()[:10])))
+            output_dir = save_dir.joinpath(r)
+        else:
+            output_dir = save_dir.joinpath(r)
+            counter = 2
+            while output_dir.exists():
+                output_dir = save_dir.joinpath(f"{r}_{counter}")
+                counter += 1
         output_dir.mkdir(parents=True, exist_ok=True)
 
         if save_metadata:
@@ -217,10 +317,71 @@ class ParseResult(ABC):  # noqa: B024
                 callback_args=callback_args,
                 callback_kwargs=callback_kwargs,
                 proxy=proxy,
+                aggregate_bytes=aggregate_bytes,
+                digest=digest,
+                resume=resume,
             )
+        except BaseException:
+            if not resume:
+                shutil.rmtree(output_dir, ignore_errors=True)
+            raise
+
+    async def stream(
+        self, index: int = 0, *, proxy: str | None = None, live_photo_video: bool = False
+    ) -> AsyncIterator[bytes]:
+        """
+        流式读取单个媒体, 数据不写入磁盘, 可直接转发给上传接口. 数据流必须读完或关闭, 否则连接要等到被回收时才释放
+        :param index: 媒体序号
+        :param proxy: 代理
+        :param live_photo_video: 读取实况照片的视频部分
+        :return: 数据块的异步迭代器
+
+        Example:
+            ::
+
+                async with aclosing(result.stream(0)) as chunks:
+                    async for chunk in chunks:
+                        ...
+        """
+        media = self._media_at(index)
+        url = media.url
+        if live_photo_video:
+            if not (isinstance(media, LivePhotoRef) and media.video_url):
+                raise DownloadError(f"第 {index} 个媒体不是带视频的实况照片")
+            url = media.video_url
+        proxy, headers = self._request_options(proxy, None)
+        try:
+            async for chunk in iter_bytes(url, headers=headers, proxy=proxy):
+                yield chunk
         except Exception as e:
-            shutil.rmtree(output_dir, ignore_errors=True)
-            raise e
+            raise DownloadError(f"下载失败: {e}") from e
+
+    async def iter_media(self, *, proxy: str | None = None) -> AsyncIterator[tuple[AnyMediaRef, AsyncIterator[bytes]]]:
+        """
+        依次返回每个媒体及其数据流, 数据流在开始迭代时才发起请求, 应在取下一个媒体之前读完
+        :param proxy: 代理
+        :return: (媒体, 数据块的异步迭代器)
+
+        Example:
+            ::
+
+                async for media, chunks in result.iter_media():
+                    await uploader.upload(media.ext, chunks)
+        """
+        if self.media is None:
+            raise DownloadError("没有可下载的媒体")
+        media_list = list(self.media) if isinstance(self.media, Sequence) else [self.media]
+        for i, media in enumerate(media_list):
+            yield media, self.stream(i, proxy=proxy)
+
+    def _media_at(self, index: int) -> AnyMediaRef:
+        if self.media is None:
+            raise DownloadError("没有可下载的媒体")
+        media_list = list(self.media) if isinstance(self.media, Sequence) else [self.media]
+        try:
+            return media_list[index]
+        except IndexError:
+            raise DownloadError(f"媒体序号超出范围: {index}") from None
 
     def download_sync(
         self,
@@ -231,6 +392,9 @@ class ParseResult(ABC):  # noqa: B024
         callback_kwargs: dict | None = None,
         proxy: str | None = None,
         save_metadata: bool = False,
+        aggregate_bytes: bool = False,
+        digest: str | None = None,
+        resume: bool = False,
     ) -> "DownloadResult":
         """
         :param path: 保存路径
@@ -239,6 +403,10 @@ class ParseResult(ABC):  # noqa: B024
         :param callback_kwargs: 回调函数的关键字参数
         :param proxy: 代理
         :param save_metadata: 保存解析结果为 metadata.json, 默认为 False
+        :param aggregate_bytes: 多文件下载时改为报告所有文件的总字节进度, 默认为 False
+        :param digest: 下载时计算文件摘要的算法, 例如 sha256、blake2b, 结果保存在 MediaFile.digest
+        :param resume: 使用由标题和原始链接确定的固定目录, 失败时保留未完成的文件;
+            再次下载时已完成的文件直接使用, 未完成的文件断点续传. 默认每次下载到新目录, 失败时删除
         :return: DownloadResult
 
         Note:
@@ -251,6 +419,9 @@ class ParseResult(ABC):  # noqa: B024
             - unit: 进度单位
                 - ``bytes``: 字节进度，用于单文件下载时报告已下载/总字节数
                 - ``count``: 计数进度，用于多文件下载时报告已完成/总文件数
+
+            多文件并发下载, 并发数由 ``GlobalConfig.download_concurrency`` 控制.
+            ``aggregate_bytes=True`` 时多文件下载也报告 ``bytes``, total 为已开始下载的文件大小之和, 未知时为 0
         """
         return run_sync(
             self.download(
@@ -260,10 +431,51 @@ class ParseResult(ABC):  # noqa: B024
                 callback_kwargs=callback_kwargs,
                 proxy=proxy,
                 save_metadata=save_metadata,
+                aggregate_bytes=aggregate_bytes,
+                digest=digest,
+                resume=resume,
             )
         )
 
 
+_Fetched = tuple[str, str | None, MediaInfo | None]
+"""下载得到的 (文件路径, 文件摘要, 下载时从文件头解析的媒体信息)"""
+
+_Downloaded = tuple[_Fetched, _Fetched | None]
+"""下载得到的 (媒体文件, 实况照片视频)"""
+
+
+def _media_file(media: AnyMediaRef, file: _Fetched, video: _Fetched | None) -> AnyMediaFile:
+    """创建本地媒体, 媒体链接中没有的宽高、时长优先使用下载时解析的文件头, 都没有时从文件读取"""
+    path, digest, info = file
+    video_path, video_digest, video_info = video or (None, None, None)
+    width, height = media.width, media.height
+    duration = media.duration if isinstance(media, VideoRef | AniRef | LivePhotoRef) else None
+    # 与 MediaFile.__post_init__ 一致: 缺少任意一项时整体采用文件中的信息
+    if (header := video_info if video_path else info) and (not width or duration == 0):
+        width, height, duration = header.width, header.height, header.duration
+    duration = duration or 0
+    mf: AnyMediaFile
+    match media:
+        case ImageRef():
+            mf = ImageFile(path=path, width=width, height=height, digest=digest)
+        case VideoRef():
+            mf = VideoFile(path=path, width=width, height=height, duration=duration, digest=digest)
+        case AniRef():
+            mf = AniFile(path=path, width=width, height=height, duration=duration, digest=digest)
+        case LivePhotoRef():
+            mf = LivePhotoFile(
+                path=path,
+                width=width,
+                height=height,
+                duration=duration,
+                digest=digest,
+                video_path=video_path,
+                video_digest=video_digest,
+            )
+    return mf
+
+
 class VideoParseResult(ParseResult):
     """单个视频"""
 
@@ -357,14 +569,21 @@ class RichTextParseResult(ParseResult):
 
 
 class DownloadResult:
-    def __init__(self, media: AnyMediaFile | Sequence[AnyMediaFile], output_dir: str | Path):
+    def __init__(
+        self,
+        media: AnyMediaFile | Sequence[AnyMediaFile],
+        output_dir: str | Path,
+        digest_algorithm: str | None = None,
+    ):
         """
         下载结果
         :param media: 本地媒体路径
         :param output_dir: 输出目录
+        :param digest_algorithm: MediaFile.digest 使用的摘要算法, 未计算摘要时为 None
         """
         self.media = media
         self.output_dir = Path(output_dir).resolve()
+        self.digest_algorithm = digest_algorithm
 
     def delete(self) -> None:
         try:
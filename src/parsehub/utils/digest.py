@@ -0,0 +1,60 @@
+"""下载时增量计算文件摘要"""
+
+import asyncio
+import hashlib
+from pathlib import Path
+
+
+class StreamingDigest:
+    """随下载的数据块增量计算摘要, 不需要在下载完成后重新读取文件
+
+    数据必须按文件顺序传入; 断点续传或分段下载时, 已在磁盘上的部分由 sync 读取文件补算
+
+    Example:
+        ::
+
+            digest = StreamingDigest("blake2b")
+            await download(url, path, digest=digest)
+            print(digest.hexdigest())
+    """
+
+    def __init__(self, algorithm: str = "sha256") -> None:
+        """
+        :param algorithm: hashlib 支持的摘要算法, 例如 sha256、blake2b
+        """
+        self.algorithm = algorithm
+        self._hash = hashlib.new(algorithm)
+        self.size = 0
+        """已计算的字节数"""
+
+    def update(self, data: bytes) -> None:
+        self._hash.update(data)
+        self.size += len(data)
+
+    async def sync(self, path: str | Path, size: int) -> None:
+        """使摘要对应文件的前 size 字节, 与已计算的字节数不一致时从磁盘重新计算
+        :param path: 文件路径
+        :param size: 文件中已写入的字节数
+        """
+        if size == self.size:
+            return
+        self._hash = await asyncio.to_thread(_hash_file, self.algorithm, Path(path), size)
+        self.size = size
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def _hash_file(algorithm: str, path: Path, size: int) -> "hashlib._Hash":
+    h = hashlib.new(algorithm)
+    if size <= 0:
+        return h
+    with path.open("rb") as f:
+        remaining = size
+        while remaining > 0 and (chunk := f.read(min(remaining, 1024 * 1024))):
+            h.update(chunk)
+            remaining -= len(chunk)
+    return h
+
+
+__all__ = ["StreamingDigest"]
@@ -1,14 +1,170 @@
 import asyncio
+import json
 import os
 import re
-from collections.abc import Awaitable, Callable
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import ExitStack, aclosing
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Literal
-from urllib.parse import unquote, urlparse
+from typing import Any, Literal, Self
+from urllib.parse import unquote
 
-import aiofiles
 import httpx
 
+from .digest import StreamingDigest
+from .file_writer import BufferedFileWriter
+from .http_client import HttpClientPool, ProxyTypes, get_http_pool, use_http_pool
+from .media_probe import HeaderProbe
+from .progress import ProgressThrottle, adaptive_chunks
+from .scheduler import download_scheduler
+
+SEGMENT_MIN_SIZE = 4 * 1024 * 1024
+"""分段下载时每段的最小字节数, 小于 segments * SEGMENT_MIN_SIZE 的文件会减少分段数"""
+
+
+@dataclass
+class PartState:
+    """part 文件对应的远端文件信息"""
+
+    url: str
+    etag: str | None = None
+    last_modified: str | None = None
+    length: int = 0
+
+    def validator(self) -> str | None:
+        """If-Range 使用的验证器, 弱 ETag 不能用于 If-Range"""
+        if self.etag and not self.etag.startswith("W/"):
+            return self.etag
+        return self.last_modified
+
+    def matches(self, content_range: str, start: int) -> bool:
+        """续传响应的 Content-Range 是否从 start 开始且文件大小与记录一致"""
+        match = re.fullmatch(r"bytes\s+(\d+)-\d+/(\d+|\*)", content_range.strip())
+        if not match or int(match.group(1)) != start:
+            return False
+        return not self.length or match.group(2) == str(self.length)
+
+
+class PartFile:
+    """下载中的文件
+
+    数据先写入 ``<文件名>.part``, 下载完成后原子地重命名为目标文件名;
+    ``<文件名>.part.json`` 记录链接、ETag、Last-Modified 和文件大小, 用于验证续传.
+    需要跳过已完成的文件时, 下载完成后改为 ``<文件名>.done.json``, 再次下载同一链接时据此判断目标文件是否可以直接使用
+    """
+
+    def __init__(self, path: Path) -> None:
+        """
+        :param path: 目标文件路径
+        """
+        self.path = path
+        self.part = path.with_name(f"{path.name}.part")
+        self.meta = path.with_name(f"{path.name}.part.json")
+        self.done = path.with_name(f"{path.name}.done.json")
+
+    def size(self) -> int:
+        try:
+            return self.part.stat().st_size
+        except OSError:
+            return 0
+
+    def resume_state(self, url: str) -> PartState | None:
+        """读取续传信息, 不能续传时删除 part 文件并返回 None"""
+        try:
+            state = PartState(**json.loads(self.meta.read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            self.discard()
+            return None
+        # 没有 ETag / Last-Modified 时无法通过 If-Range 验证, 只续传同一链接的文件
+        if not self.size() or not (state.validator() or state.url == url):
+            self.discard()
+            return None
+        return state
+
+    def completed(self, url: str) -> bool:
+        """目标文件是否为该链接下载完成的文件
+
+        只有完成记录中的链接相同且文件大小一致时才视为已下载; 同名的其他文件会被重新下载覆盖
+        """
+        try:
+            state = PartState(**json.loads(self.done.read_text(encoding="utf-8")))
+            size = self.path.stat().st_size
+        except (OSError, ValueError, TypeError):
+            return False
+        return state.url == url and state.length == size
+
+    def save(self, url: str, response: httpx.Response, length: int) -> PartState:
+        """开始下载新文件时记录远端文件信息"""
+        state = _response_state(url, response, length)
+        self.meta.write_text(json.dumps(asdict(state)), encoding="utf-8")
+        return state
+
+    def commit(self, state: PartState, *, record: bool = False) -> None:
+        """下载完成, 重命名为目标文件
+        :param state: 远端文件信息, 文件大小以实际写入的大小为准
+        :param record: 写入完成记录, 否则删除旧的完成记录, 输出目录中只保留目标文件
+        """
+        if record:
+            state = PartState(state.url, state.etag, state.last_modified, self.size())
+            self.done.write_text(json.dumps(asdict(state)), encoding="utf-8")
+        else:
+            self.done.unlink(missing_ok=True)
+        os.replace(self.part, self.path)
+        self.meta.unlink(missing_ok=True)
+
+    def discard(self) -> None:
+        self.part.unlink(missing_ok=True)
+        self.meta.unlink(missing_ok=True)
+
+
+def _response_state(url: str, response: httpx.Response, length: int) -> PartState:
+    return PartState(url, response.headers.get("ETag"), response.headers.get("Last-Modified"), length)
+
+
+class DownloadSession:
+    """下载会话
+
+    会话内的多次重试、多个文件共享 HTTP 客户端, 复用 Keep-Alive 连接.
+    当前上下文已启用客户端池 (例如 ``async with ParseHub()`` 或外层的下载会话) 时直接使用该池, 连接在多个帖子之间复用;
+    否则创建一个客户端池, 在会话结束时关闭.
+
+    超时和网络错误只会让 httpx 关闭出错的那个连接, 客户端继续复用; 出现协议错误时才丢弃整个客户端
+    """
+
+    def __init__(self) -> None:
+        self._pool: HttpClientPool | None = None
+        self._owned = False
+        self._ctx = ExitStack()
+
+    @property
+    def pool(self) -> HttpClientPool:
+        if self._pool is None:
+            raise RuntimeError("下载会话未开始, 请使用 async with DownloadSession()")
+        return self._pool
+
+    async def __aenter__(self) -> Self:
+        if (pool := get_http_pool()) is None:
+            pool = HttpClientPool()
+            self._owned = True
+        self._pool = pool
+        self._ctx.enter_context(use_http_pool(pool))
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        self._ctx.close()
+        if self._owned and self._pool is not None:
+            await self._pool.aclose()
+        self._pool = None
+        self._owned = False
+
+    def client(self, proxy: ProxyTypes = None) -> httpx.AsyncClient:
+        """获取下载使用的客户端"""
+        return self.pool.get(proxy=proxy)
+
+    def discard(self, client: httpx.AsyncClient) -> None:
+        """丢弃出现协议错误的客户端, 之后的请求使用新的客户端"""
+        self.pool.discard(client)
+
 
 async def download(
     url: str,
@@ -21,6 +177,12 @@ async def download(
     progress_kwargs: dict | None = None,
     max_retries: int = 3,
     chunk_size: int = 8192,
+    max_chunk_size: int = 1024 * 1024,
+    segments: int = 1,
+    response_hook: Callable[[httpx.Response], None] | None = None,
+    digest: StreamingDigest | None = None,
+    probe: HeaderProbe | None = None,
+    resume: bool = False,
 ) -> str:
     """
     :param url: 下载链接
@@ -31,73 +193,164 @@ async def download(
     :param progress_args: 下载进度回调函数的参数
     :param progress_kwargs: 下载进度回调函数的关键字参数
     :param max_retries: 最大重试次数
-    :param chunk_size: 分块大小
+    :param chunk_size: 最小分块大小, 分块随下载速度在 chunk_size 与 max_chunk_size 之间自动调整
+    :param max_chunk_size: 最大分块大小, 与 chunk_size 相同时固定分块大小
+    :param segments: 分段数, 大于 1 时先探测服务器是否支持 Range 请求, 支持则多连接并发下载各段, 否则单连接下载
+    :param response_hook: 收到下载响应 (分段下载时为探测响应) 时调用, 可用于读取 ETag 等响应头
+    :param digest: 边下载边计算文件摘要; 分段下载的数据不按顺序到达, 完成后读取文件计算
+    :param probe: 边下载边解析文件头, 得到宽高、时长后即可读取 probe.info (例如在进度回调中), 无需下载完成后再打开文件
+    :param resume: 下载完成后写入 ``<文件名>.done.json`` 完成记录, 目标文件是同一链接下载完成的文件时直接返回
     :return: 文件路径
 
+    .. note::
+        下载过程中数据写入 ``<文件名>.part``, 完成后重命名, 同名文件会被覆盖.
+        中断后再次下载同一文件会用 ``Range`` + ``If-Range`` 续传, 远端文件变化时重新下载
+
     .. note::
         下载进度回调函数签名: async def progress(current: int, total: int, *args) -> None:
+
+        回调频率受 GlobalConfig.progress_interval / progress_min_bytes / progress_min_percent 限制, 完成时总是回调
     """
     if headers is None:
         headers = {}
+    report = ProgressThrottle(progress, args=progress_args, kwargs=progress_kwargs) if progress else None
 
     save_dir, filename = _parse_save_path(save_path)
 
-    for attempt in range(max_retries + 1):
-        # 每次重试都创建新的 client，避免复用异常状态的连接池
-        async with httpx.AsyncClient(proxy=proxy, headers=headers) as client:
+    async def finish(path: Path) -> str:
+        """返回已下载完成的文件, 跳过下载或续传时摘要和文件头从磁盘补算"""
+        size = path.stat().st_size
+        if digest:
+            await digest.sync(path, size)
+        if probe:
+            await probe.sync(path, size, total=size)
+        return str(path)
+
+    async with DownloadSession() as session:
+        for attempt in range(max_retries + 1):
+            client = session.client(proxy)
             try:
-                if not filename:
-                    filename = await get_filename_by_url(url, client)
-                if not filename:
-                    raise ValueError("无法获取文件名")
-
-                resolved_path = save_dir.joinpath(filename)
-                resolved_path.parent.mkdir(parents=True, exist_ok=True)
-
-                resume_pos = resolved_path.stat().st_size if resolved_path.exists() else 0
-
-                # 设置Range头进行断点续传
-                extra_headers = {}
-                if resume_pos > 0:
+                # 未指定文件名时从下载请求的响应中获取, 不单独发送 HEAD 请求
+                resolved_path = _prepare_path(save_dir, filename) if filename else None
+                part = PartFile(resolved_path) if resolved_path else None
+                if resume and part and part.completed(url):
+                    return await finish(part.path)
+                state = part.resume_state(url) if part else None
+                resume_pos = part.size() if part and state else 0
+
+                if part and state and 0 < state.length <= resume_pos:
+                    # 上次已下载完整但未来得及重命名
+                    if state.length == resume_pos:
+                        part.commit(state, record=resume)
+                        return await finish(part.path)
+                    part.discard()
+                    state, resume_pos = None, 0
+
+                # 分段下载只用于新文件, 已有的部分文件继续按单连接续传
+                if segments > 1 and resume_pos == 0:
+                    if range_info := await _probe_range(client, url, headers):
+                        probe_response, total_size = range_info
+                        count = min(segments, -(-total_size // SEGMENT_MIN_SIZE))
+                        if count > 1:
+                            filename = filename or _require_filename(probe_response)
+                            part = PartFile(_prepare_path(save_dir, filename))
+                            if resume and part.completed(url):
+                                return await finish(part.path)
+                            if response_hook:
+                                response_hook(probe_response)
+                            # 分段写入的 part 文件不是连续的前缀, 不记录续传信息
+                            part.discard()
+                            if probe:
+                                await probe.sync(part.part, 0, total=total_size)
+                            await _download_segments(
+                                client,
+                                str(probe_response.url),
+                                part.part,
+                                headers=headers,
+                                total=total_size,
+                                segments=count,
+                                chunk_size=chunk_size,
+                                max_chunk_size=max_chunk_size,
+                                max_retries=max_retries,
+                                progress=report,
+                                on_head=probe.feed if probe else None,
+                            )
+                            if digest:
+                                await digest.sync(part.part, total_size)
+                            part.commit(_response_state(url, probe_response, total_size), record=resume)
+                            return str(part.path)
+
+                # 设置 Range 头进行断点续传, If-Range 保证远端文件未变化, 变化时服务器返回完整文件
+                extra_headers = dict(headers)
+                if state and resume_pos > 0:
                     extra_headers["Range"] = f"bytes={resume_pos}-"
-
-                async with client.stream("GET", url, headers=extra_headers, follow_redirects=True) as r:
+                    if validator := state.validator():
+                        extra_headers["If-Range"] = validator
+
+                async with (
+                    download_scheduler.transfer(url) as transfer,
+                    client.stream("GET", url, headers=extra_headers, follow_redirects=True) as r,
+                ):
+                    # 重定向到 CDN 时按实际传输数据的域名限制连接数
+                    await transfer.rebind(str(r.url))
                     r.raise_for_status()
 
-                    # 判断服务器是否真正支持断点续传（206 = Partial Content）
-                    is_resumed = r.status_code == 206
-
-                    # 如果发了 Range 但服务器返回 200，说明不支持续传，需要从头下载
-                    if resume_pos > 0 and not is_resumed:
-                        resume_pos = 0
+                    if part is None:
+                        filename = _require_filename(r)
+                        part = PartFile(_prepare_path(save_dir, filename))
+                        if resume and part.completed(url):
+                            return await finish(part.path)
+                    if response_hook:
+                        response_hook(r)
 
                     content_length = r.headers.get("Content-Length")
-                    if content_length:
-                        total_size = int(content_length)
-                        if is_resumed:
-                            total_size += resume_pos
+                    # 206 且 Content-Range 与记录一致时才续传, 否则 (返回 200 或内容不符) 从头下载
+                    is_resumed = (
+                        resume_pos > 0
+                        and r.status_code == 206
+                        and state is not None
+                        and state.matches(r.headers.get("Content-Range", ""), resume_pos)
+                    )
+                    if resume_pos > 0 and r.status_code == 206 and not is_resumed:
+                        part.discard()
+                        continue
+
+                    if is_resumed and state is not None:
+                        total_size = int(content_length) + resume_pos if content_length else 0
+                        current = resume_pos
                     else:
-                        total_size = 0
+                        total_size = int(content_length) if content_length else 0
+                        current = 0
+                        state = part.save(url, r, total_size)
 
-                    current = resume_pos if is_resumed else 0
+                    if digest:
+                        # 续传时补算已下载的部分; 重新下载时丢弃上一次尝试的摘要
+                        await digest.sync(part.part, current)
+                    if probe:
+                        await probe.sync(part.part, current, total=total_size)
 
                     file_mode: Literal["ab", "wb"] = "ab" if is_resumed else "wb"
 
-                    async with aiofiles.open(file=resolved_path, mode=file_mode) as f:
-                        async for chunk in r.aiter_bytes(chunk_size=chunk_size):
-                            if chunk:
-                                await f.write(chunk)
-                                current += len(chunk)
-                                if progress:
-                                    if progress_kwargs is None:
-                                        progress_kwargs = {}
-                                    await progress(current, total_size, *progress_args, **progress_kwargs)
+                    async with BufferedFileWriter(part.part, file_mode) as f:
+                        async for chunk in adaptive_chunks(r.aiter_bytes(), chunk_size, max_chunk_size):
+                            await transfer.consume(len(chunk))
+                            if digest:
+                                digest.update(chunk)
+                            if probe:
+                                probe.feed(chunk)
+                            await f.write(chunk)
+                            current += len(chunk)
+                            if report:
+                                await report(current, total_size)
+                    if report:
+                        await report.flush()
 
                     # 完整性校验
                     if 0 < total_size != current:
                         raise DownloadError(f"下载不完整: 期望 {total_size} 字节, 实际 {current} 字节")
 
-                    return str(resolved_path)
+                    part.commit(state, record=resume)
+                    return str(part.path)
 
             except (
                 httpx.ConnectTimeout,
@@ -115,6 +368,9 @@ async def download(
                 httpx.RemoteProtocolError,
                 httpx.ReadError,
             ) as e:
+                if isinstance(e, httpx.RemoteProtocolError):
+                    # 协议错误时不确定客户端中其他连接的状态, 之后的重试换用新的客户端
+                    session.discard(client)
                 if attempt == max_retries:
                     raise DownloadError(f"网络连接错误: {e}") from e
                 await asyncio.sleep(2**attempt)
@@ -122,11 +378,9 @@ async def download(
 
             except httpx.HTTPStatusError as e:
                 if e.response.status_code == 416:
-                    # Range Not Satisfiable: 文件可能已完整或服务器不支持续传
+                    # Range Not Satisfiable: 已下载的部分与远端文件不符, 删除后从头下载
                     if filename:
-                        p = save_dir.joinpath(filename)
-                        if p.exists():
-                            p.unlink()
+                        PartFile(save_dir.joinpath(filename)).discard()
                     if attempt == max_retries:
                         raise DownloadError(f"HTTP错误: {e.response.status_code}") from e
                     continue
@@ -145,6 +399,203 @@ async def download(
     raise DownloadError("达到最大重试次数，下载失败")
 
 
+async def iter_bytes(
+    url: str,
+    *,
+    headers: dict | None = None,
+    proxy: str | httpx.Proxy | None = None,
+    max_retries: int = 3,
+    chunk_size: int = 64 * 1024,
+    max_chunk_size: int = 1024 * 1024,
+) -> AsyncIterator[bytes]:
+    """
+    流式读取下载内容, 不写入磁盘
+    :param url: 下载链接
+    :param headers: 请求头
+    :param proxy: 代理
+    :param max_retries: 最大重试次数, 连接中断时用 Range 请求从已读取的位置继续
+    :param chunk_size: 最小分块大小, 分块随下载速度在 chunk_size 与 max_chunk_size 之间自动调整
+    :param max_chunk_size: 最大分块大小
+    :return: 数据块的异步迭代器
+
+    .. note::
+        只在从网络读取数据时占用下载调度器中该域名的连接槽位, 调用方处理数据 (例如上传) 期间不占用,
+        读取慢的数据流不会阻塞同一域名的其他下载.
+
+        数据流必须读完或关闭, 否则连接要等到迭代器被回收时才释放. 提前结束迭代时请用 ``contextlib.aclosing`` 包裹::
+
+            async with aclosing(iter_bytes(url)) as chunks:
+                async for chunk in chunks:
+                    ...
+    """
+    headers = headers or {}
+    pos = 0
+    # 生成器在调用方的上下文中运行, 不通过 DownloadSession 修改当前上下文中的客户端池
+    pool = get_http_pool()
+    owned = pool is None
+    if pool is None:
+        pool = HttpClientPool()
+    try:
+        for attempt in range(max_retries + 1):
+            client = pool.get(proxy=proxy)
+            request_headers = {**headers, "Range": f"bytes={pos}-"} if pos else headers
+            r: httpx.Response | None = None
+            try:
+                async with download_scheduler.transfer(url):
+                    request = client.build_request("GET", url, headers=request_headers)
+                    r = await client.send(request, stream=True, follow_redirects=True)
+                r.raise_for_status()
+                if pos and r.status_code != 206:
+                    raise DownloadError(f"服务器不支持断点续传, 无法从 {pos} 字节继续读取")
+                content_length = r.headers.get("Content-Length")
+                total = int(content_length) + pos if content_length else 0
+                # 重定向到 CDN 时按实际传输数据的域名限制连接数
+                source = str(r.url)
+                async with aclosing(adaptive_chunks(r.aiter_bytes(), chunk_size, max_chunk_size)) as chunks:
+                    while True:
+                        async with download_scheduler.transfer(source) as transfer:
+                            try:
+                                chunk = await anext(chunks)
+                            except StopAsyncIteration:
+                                break
+                            await transfer.consume(len(chunk))
+                        pos += len(chunk)
+                        yield chunk
+                if 0 < total != pos:
+                    raise DownloadError(f"下载不完整: 期望 {total} 字节, 实际 {pos} 字节")
+                return
+            except httpx.HTTPStatusError as e:
+                raise DownloadError(f"HTTP错误: {e.response.status_code}") from e
+            except (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError) as e:
+                if isinstance(e, httpx.RemoteProtocolError):
+                    pool.discard(client)
+                if attempt == max_retries:
+                    raise DownloadError(f"网络连接错误: {e}") from e
+                await asyncio.sleep(2**attempt)
+            finally:
+                if r is not None:
+                    await r.aclose()
+    finally:
+        if owned:
+            await pool.aclose()
+    raise DownloadError("达到最大重试次数，下载失败")
+
+
+async def _probe_range(client: httpx.AsyncClient, url: str, headers: dict) -> tuple[httpx.Response, int] | None:
+    """探测服务器是否支持 Range 请求
+    :return: (已关闭的探测响应, 文件大小), 不支持时返回 None
+    """
+    async with (
+        download_scheduler.transfer(url),
+        client.stream("GET", url, headers={**headers, "Range": "bytes=0-0"}, follow_redirects=True) as r,
+    ):
+        # 返回 200 时不读取正文直接关闭; 压缩传输时 Range 针对的是压缩后的字节, 无法分段
+        if r.status_code != 206 or r.headers.get("Content-Encoding", "identity") != "identity":
+            return None
+        await r.aread()
+        match = re.fullmatch(r"bytes\s+0-0/(\d+)", r.headers.get("Content-Range", "").strip())
+        return (r, int(match.group(1))) if match else None
+
+
+async def _download_segments(
+    client: httpx.AsyncClient,
+    url: str,
+    path: Path,
+    *,
+    headers: dict,
+    total: int,
+    segments: int,
+    chunk_size: int,
+    max_chunk_size: int,
+    max_retries: int,
+    progress: ProgressThrottle | None,
+    on_head: Callable[[bytes], None] | None = None,
+) -> None:
+    """将文件分为 segments 段并发下载, 各段写入预分配文件的对应位置, 任意一段失败时取消其余分段并删除文件
+    :param on_head: 按顺序接收第一段的数据
+    """
+    current = 0
+
+    async def on_chunk(size: int) -> None:
+        nonlocal current
+        current += size
+        if progress:
+            await progress(current, total)
+
+    async with BufferedFileWriter(path, "wb") as f:
+        await f.truncate(total)
+
+    size = -(-total // segments)
+    tasks = [
+        asyncio.create_task(
+            _download_segment(
+                client,
+                url,
+                path,
+                headers=headers,
+                start=start,
+                end=min(start + size, total) - 1,
+                chunk_size=chunk_size,
+                max_chunk_size=max_chunk_size,
+                max_retries=max_retries,
+                on_chunk=on_chunk,
+                on_data=on_head if start == 0 else None,
+            )
+        )
+        for start in range(0, total, size)
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        path.unlink(missing_ok=True)
+        raise
+
+
+async def _download_segment(
+    client: httpx.AsyncClient,
+    url: str,
+    path: Path,
+    *,
+    headers: dict,
+    start: int,
+    end: int,
+    chunk_size: int,
+    max_chunk_size: int,
+    max_retries: int,
+    on_chunk: Callable[[int], Awaitable[None]],
+    on_data: Callable[[bytes], None] | None = None,
+) -> None:
+    """下载 [start, end] 字节段, 连接中断时从已写入的位置重试"""
+    pos = start
+    for attempt in range(max_retries + 1):
+        try:
+            async with (
+                download_scheduler.transfer(url) as transfer,
+                client.stream("GET", url, headers={**headers, "Range": f"bytes={pos}-{end}"}) as r,
+            ):
+                if r.status_code != 206:
+                    raise DownloadError(f"分段下载失败: HTTP {r.status_code}")
+                async with BufferedFileWriter(path, "r+b", offset=pos) as f:
+                    async for chunk in adaptive_chunks(r.aiter_bytes(), chunk_size, max_chunk_size):
+                        chunk = chunk[: end + 1 - pos]
+                        await transfer.consume(len(chunk))
+                        if on_data:
+                            on_data(chunk)
+                        await f.write(chunk)
+                        pos += len(chunk)
+                        await on_chunk(len(chunk))
+                        if pos > end:
+                            return
+        except (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError) as e:
+            if attempt == max_retries:
+                raise DownloadError(f"分段下载失败: {e}") from e
+            await asyncio.sleep(2**attempt)
+    raise DownloadError(f"分段下载不完整: bytes={start}-{end}, 实际下载到 {pos}")
+
+
 def _parse_save_path(save_path: str | Path | None) -> tuple[Path, str | None]:
     """解析保存路径，返回 (目录, 文件名或None)"""
     if not save_path:
@@ -158,26 +609,30 @@ def _parse_save_path(save_path: str | Path | None) -> tuple[Path, str | None]:
     return save_dir, filename if filename else None
 
 
-async def get_filename_by_url(url: str, client: httpx.AsyncClient) -> str | None:
-    """从 URL 或 HTTP 响应头中获取文件名"""
-    try:
-        response = await client.head(url, follow_redirects=True)
-        response.raise_for_status()
-    except httpx.HTTPError:
-        # HEAD 请求失败时，回退到从 URL 路径中解析
-        pass
-    else:
-        if content_disposition := response.headers.get("content-disposition"):
-            if filename := _parse_content_disposition(content_disposition):
-                return _sanitize_filename(filename)
-
-    # 从 URL 路径中提取文件名（去除查询参数和片段）
-    parsed = urlparse(url)
-    path = unquote(parsed.path).removesuffix("/")
+def get_filename_by_response(response: httpx.Response) -> str | None:
+    """从响应头 Content-Disposition 或重定向后的最终链接中获取文件名"""
+    if content_disposition := response.headers.get("content-disposition"):
+        if filename := _parse_content_disposition(content_disposition):
+            return _sanitize_filename(filename)
+
+    # 从最终链接的路径中提取文件名（去除查询参数和片段）
+    path = unquote(response.url.path).removesuffix("/")
     filename = path.split("/")[-1] if path else None
     return _sanitize_filename(filename) if filename else None
 
 
+def _require_filename(response: httpx.Response) -> str:
+    if not (filename := get_filename_by_response(response)):
+        raise ValueError("无法获取文件名")
+    return filename
+
+
+def _prepare_path(save_dir: Path, filename: str) -> Path:
+    path = save_dir.joinpath(filename)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
 def _parse_content_disposition(header: str) -> str | None:
     """解析 Content-Disposition 头中的文件名，支持 filename*= 和带引号的 filename="""
     # 优先匹配 RFC 5987 编码: filename*=UTF-8''encoded_name
@@ -0,0 +1,100 @@
+"""下载文件的缓冲写入"""
+
+import asyncio
+from pathlib import Path
+from types import TracebackType
+from typing import BinaryIO, Literal, Self
+
+
+class BufferedFileWriter:
+    """合并小块写入, 缓冲区满时在线程池中一次写入磁盘
+
+    写入在后台进行, 同时继续接收下一块数据; 同一时间最多只有一次写入在进行,
+    上一次写入未完成时 write 会等待, 因此每个文件占用的内存不超过两个缓冲区.
+    退出 ``async with`` 时 (包括出现异常时) 会写入剩余数据并关闭文件
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        mode: Literal["wb", "ab", "r+b"] = "wb",
+        *,
+        offset: int | None = None,
+        buffer_size: int = 1024 * 1024,
+    ) -> None:
+        """
+        :param path: 文件路径
+        :param mode: 打开模式
+        :param offset: 打开后跳转到的位置, 用于分段下载时写入文件的指定位置
+        :param buffer_size: 缓冲区大小, 缓冲的数据达到该大小时写入磁盘
+        """
+        self.path = path
+        self.mode = mode
+        self.offset = offset
+        self.buffer_size = buffer_size
+        self._buffer = bytearray()
+        self._file: BinaryIO | None = None
+        self._pending: asyncio.Future[int] | None = None
+
+    async def __aenter__(self) -> Self:
+        self._file = await asyncio.to_thread(self._open)
+        return self
+
+    async def __aexit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: TracebackType | None
+    ) -> None:
+        try:
+            await self.flush()
+        finally:
+            if (f := self._file) is not None:
+                self._file = None
+                if self._pending is not None and not self._pending.done():
+                    # 被取消时线程中的写入可能仍在进行, 写入结束后再关闭文件
+                    self._pending.add_done_callback(lambda _: f.close())
+                else:
+                    await asyncio.to_thread(f.close)
+
+    def _open(self) -> BinaryIO:
+        f = open(self.path, self.mode)
+        if self.offset is not None:
+            f.seek(self.offset)
+        return f
+
+    async def write(self, data: bytes) -> None:
+        if not self._buffer and len(data) >= self.buffer_size:
+            # 足够大的块直接写入, 不经过缓冲区复制
+            await self._submit(data)
+            return
+        self._buffer += data
+        if len(self._buffer) >= self.buffer_size:
+            await self._submit()
+
+    async def truncate(self, size: int) -> None:
+        """将文件调整为 size 字节, 用于预分配分段下载的文件"""
+        await self.flush()
+        assert self._file is not None
+        await asyncio.to_thread(self._file.truncate, size)
+
+    async def flush(self) -> None:
+        """写入缓冲区中的全部数据并等待写入完成"""
+        await self._submit()
+        await self._wait()
+
+    async def _submit(self, data: bytes | None = None) -> None:
+        await self._wait()
+        if data is None:
+            if not self._buffer:
+                return
+            data = bytes(self._buffer)
+            self._buffer.clear()
+        assert self._file is not None
+        self._pending = asyncio.get_running_loop().run_in_executor(None, self._file.write, data)
+
+    async def _wait(self) -> None:
+        if self._pending is not None:
+            # 等待被取消时不取消线程中的写入
+            await asyncio.shield(self._pending)
+            self._pending = None
+
+
+__all__ = ["BufferedFileWriter"]
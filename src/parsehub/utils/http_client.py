@@ -0,0 +1,261 @@
+"""共享 HTTP 客户端池"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator, Mapping
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from http.cookiejar import Cookie, CookieJar, DefaultCookiePolicy
+from typing import Any
+
+import httpx
+
+ProxyTypes = str | httpx.Proxy | None
+CookieTypes = Mapping[str, Any] | httpx.Cookies | None
+
+_ClientKey = tuple[Any, str | None, bool]
+
+_current_pool: ContextVar["HttpClientPool | None"] = ContextVar("parsehub_http_pool", default=None)
+# http_client 借出池中客户端期间使用的 Cookie, 只在当前上下文 (及其创建的任务) 中可见
+_borrowed_cookies: ContextVar[httpx.Cookies | None] = ContextVar("parsehub_http_cookies", default=None)
+
+# 被淘汰的客户端至少保留这么久才关闭, 给刚通过 get 拿到它、还未发出请求的调用方留出时间
+_RETIRE_GRACE = 60.0
+
+
+class _RejectCookies(DefaultCookiePolicy):
+    def set_ok(self, cookie: Cookie, request: Any) -> bool:
+        return False
+
+
+class HttpClientPool:
+    """按 (代理, 作用域, HTTP 版本) 复用 httpx.AsyncClient
+
+    池中的客户端不设置默认请求头, 请求头 / 超时 / 重定向等参数需在每次请求时传入,
+    以便同一个客户端可以被不同的调用方安全地共享.
+    客户端的 Cookie jar 不保存响应中的 Set-Cookie, 调用方的 Cookie 需在每次请求时传入, 或通过 http_client 借用
+
+    池中最多保留 max_clients 个客户端, 超出时淘汰最久未使用的客户端;
+    超过 idle_timeout 秒未被获取的客户端同样会被淘汰. 被淘汰的客户端没有进行中的请求时才会关闭
+    """
+
+    def __init__(
+        self,
+        *,
+        limits: httpx.Limits | None = None,
+        timeout: httpx.Timeout | float = 5.0,
+        max_clients: int = 64,
+        idle_timeout: float = 300.0,
+    ) -> None:
+        """
+        :param limits: 每个客户端的连接数限制
+        :param timeout: 每个客户端的默认超时时间
+        :param max_clients: 最多保留的客户端数量
+        :param idle_timeout: 客户端超过该秒数未被获取时淘汰
+        """
+        self.limits = limits or httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30)
+        self.timeout = timeout
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+        self._clients: OrderedDict[_ClientKey, httpx.AsyncClient] = OrderedDict()
+        self._used_at: dict[_ClientKey, float] = {}
+        self._retired: list[tuple[httpx.AsyncClient, float]] = []
+        self._closing: set[asyncio.Task[None]] = set()
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def get(
+        self,
+        *,
+        proxy: ProxyTypes = None,
+        scope: str | None = None,
+        http2: bool = False,
+    ) -> httpx.AsyncClient:
+        """获取 (必要时创建) 客户端
+        :param proxy: 代理
+        :param scope: 作用域, 不同作用域使用不同的客户端 (连接池), 一般为平台 id
+        :param http2: 是否启用 HTTP/2, 需要安装 h2
+        :return: httpx.AsyncClient
+        """
+        if self._closed:
+            raise RuntimeError("HTTP 客户端池已关闭")
+        now = time.monotonic()
+        key = (_proxy_key(proxy), scope, http2)
+        # 按最近使用排序, 超时的客户端都在最前面
+        for old_key, used_at in list(self._used_at.items()):
+            if now - used_at < self.idle_timeout:
+                break
+            self._retire(old_key, now)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                proxy=proxy,
+                cookies=CookieJar(policy=_RejectCookies()),
+                http2=http2,
+                limits=self.limits,
+                timeout=self.timeout,
+                event_hooks={"request": [_send_borrowed_cookies], "response": [_store_borrowed_cookies]},
+            )
+            self._clients[key] = client
+        self._clients.move_to_end(key)
+        self._used_at.pop(key, None)
+        self._used_at[key] = now
+        while len(self._clients) > self.max_clients:
+            self._retire(next(iter(self._clients)), now)
+        self._close_retired(now)
+        return client
+
+    def discard(self, client: httpx.AsyncClient) -> None:
+        """不再分配该客户端, 之后的 get 会创建新的客户端
+
+        其他调用方可能仍在使用该客户端, 因此不立即关闭, 而是在没有进行中的请求后或关闭池时关闭
+        """
+        now = time.monotonic()
+        for key, c in list(self._clients.items()):
+            if c is client:
+                self._retire(key, now)
+
+    def _retire(self, key: _ClientKey, now: float) -> None:
+        self._used_at.pop(key, None)
+        if (client := self._clients.pop(key, None)) is not None:
+            self._retired.append((client, now))
+
+    def _close_retired(self, now: float) -> None:
+        """关闭已过宽限期且没有进行中请求的被淘汰客户端"""
+        if not self._retired:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        retired = []
+        for client, retired_at in self._retired:
+            if client.is_closed:
+                continue
+            if now - retired_at < _RETIRE_GRACE or not _is_idle(client):
+                retired.append((client, retired_at))
+                continue
+            task = loop.create_task(client.aclose())
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+        self._retired = retired
+
+    async def aclose(self) -> None:
+        """关闭池中所有客户端"""
+        self._closed = True
+        clients = [*self._clients.values(), *(c for c, _ in self._retired)]
+        self._clients.clear()
+        self._used_at.clear()
+        self._retired.clear()
+        await asyncio.gather(*(c.aclose() for c in clients), *self._closing, return_exceptions=True)
+
+    async def __aenter__(self) -> "HttpClientPool":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+
+def get_http_pool() -> HttpClientPool | None:
+    """获取当前上下文中启用的客户端池"""
+    pool = _current_pool.get()
+    if pool is None or pool.closed:
+        return None
+    return pool
+
+
+@contextmanager
+def use_http_pool(pool: HttpClientPool | None) -> Iterator[HttpClientPool | None]:
+    """在当前上下文中启用客户端池, pool 为 None 时保持外层设置不变"""
+    if pool is None:
+        yield get_http_pool()
+        return
+    token = _current_pool.set(pool)
+    try:
+        yield pool
+    finally:
+        try:
+            _current_pool.reset(token)
+        except ValueError:
+            # 在其他 Context 中退出时无法还原, 外层上下文中残留的已关闭的池会被 get_http_pool 忽略
+            pass
+
+
+@asynccontextmanager
+async def http_client(
+    *,
+    proxy: ProxyTypes = None,
+    scope: str | None = None,
+    cookies: CookieTypes = None,
+    http2: bool = False,
+) -> AsyncIterator[httpx.AsyncClient]:
+    """借用客户端
+
+    当前上下文启用了客户端池时返回池中的客户端 (退出时不关闭),
+    否则创建一个临时客户端并在退出时关闭.
+    借用期间的请求带上 cookies, 响应中的 Set-Cookie 只在本次借用内生效, 不会留给其他借用方
+
+    :param proxy: 代理
+    :param scope: 作用域
+    :param cookies: 初始 Cookie
+    :param http2: 是否启用 HTTP/2
+    """
+    if (pool := get_http_pool()) is not None:
+        token = _borrowed_cookies.set(_cookie_jar(cookies) or httpx.Cookies())
+        try:
+            yield pool.get(proxy=proxy, scope=scope, http2=http2)
+        finally:
+            _borrowed_cookies.reset(token)
+        return
+    async with httpx.AsyncClient(proxy=proxy, cookies=_cookie_jar(cookies), http2=http2) as client:
+        yield client
+
+
+def _proxy_key(proxy: ProxyTypes) -> Any:
+    if isinstance(proxy, httpx.Proxy):
+        return str(proxy.url), proxy.raw_auth, tuple(proxy.headers.raw)
+    return proxy
+
+
+async def _send_borrowed_cookies(request: httpx.Request) -> None:
+    # 请求已带有 Cookie (每次请求时传入的 cookies) 时不覆盖
+    if (jar := _borrowed_cookies.get()) is not None:
+        jar.set_cookie_header(request)
+
+
+async def _store_borrowed_cookies(response: httpx.Response) -> None:
+    if (jar := _borrowed_cookies.get()) is not None:
+        jar.extract_cookies(response)
+
+
+def _is_idle(client: httpx.AsyncClient) -> bool:
+    """客户端的连接池中没有进行中的请求"""
+    transports = [client._transport, *client._mounts.values()]
+    for transport in transports:
+        if transport is None:
+            continue
+        pool = getattr(transport, "_pool", None)
+        if pool is None or getattr(pool, "_requests", None) is None:
+            # 无法判断的自定义传输层视为使用中, 在关闭池时关闭
+            return False
+        if pool._requests:
+            return False
+    return True
+
+
+def _cookie_jar(cookies: CookieTypes) -> httpx.Cookies | None:
+    if not cookies:
+        return None
+    if isinstance(cookies, httpx.Cookies):
+        return httpx.Cookies(cookies)
+    return httpx.Cookies({str(k): "" if v is None else str(v) for k, v in cookies.items()})
+
+
+__all__ = ["HttpClientPool", "get_http_pool", "http_client", "use_http_pool"]
@@ -1,12 +1,13 @@
-"""媒体文件信息读取"""
+"""媒体文件信息读取
+
+常见格式只解析文件头 (见 media_probe), 其他格式回退到 Pillow / OpenCV, 读取结果可按文件缓存 (见 media_info_cache).
+OpenCV 和 Pillow 导入耗时且占用内存较多, 只在第一次需要时导入
+"""
 
 import math
 from dataclasses import dataclass
 from pathlib import Path
 
-import cv2
-from PIL import Image
-
 _IMAGE_SUFFIXES = frozenset(
     {
         ".jpg",
@@ -52,7 +53,15 @@ class MediaInfoReader:
 
     @staticmethod
     def read(path: str | Path) -> MediaInfo:
-        """根据文件后缀自动选择读取方式"""
+        """根据文件后缀自动选择读取方式, 启用缓存时结果按文件 inode、大小和修改时间缓存 (见 media_info_cache)"""
+        from .media_info_cache import get_media_info_cache
+
+        if (cache := get_media_info_cache()) is not None:
+            return cache.read(path, MediaInfoReader._read)
+        return MediaInfoReader._read(path)
+
+    @staticmethod
+    def _read(path: str | Path) -> MediaInfo:
         suffix = Path(path).suffix.lower()
         if suffix == ".gif":
             return MediaInfoReader.read_gif(path)
@@ -72,12 +81,27 @@ class MediaInfoReader:
     @staticmethod
     def read_image(path: str | Path) -> MediaInfo:
         """读取图片宽高（只解析文件头，不加载像素）"""
+        from .media_probe import probe_header
+
+        if (info := probe_header(path)) is not None:
+            return info
+
+        from PIL import Image
+
         with Image.open(path) as img:
             return MediaInfo(width=img.width, height=img.height)
 
     @staticmethod
     def read_gif(path: str | Path) -> MediaInfo:
         """读取 GIF 宽高和总时长"""
+        from .media_probe import probe_header
+
+        # 只扫描数据块累加帧延迟, 不解码帧; 扩展名为 gif 的 MP4 等文件也按实际格式读取
+        if (info := probe_header(path)) is not None:
+            return info
+
+        from PIL import Image
+
         with Image.open(path) as img:
             width, height = img.size
             total_ms = 0
@@ -92,6 +116,14 @@ class MediaInfoReader:
     @staticmethod
     def read_video(path: str | Path) -> MediaInfo:
         """读取视频宽高和时长（只读容器元数据，不解码帧）"""
+        from .media_probe import probe_header
+
+        # 容器中没有记录时长 (例如部分录制的 WebM) 时由 OpenCV 按帧数估算
+        if (info := probe_header(path)) is not None and info.duration:
+            return info
+
+        import cv2
+
         cap = cv2.VideoCapture(str(path))
         try:
             if not cap.isOpened():
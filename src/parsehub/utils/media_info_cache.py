@@ -0,0 +1,171 @@
+"""媒体信息缓存
+
+默认不启用. 设置 GlobalConfig.media_info_cache_size 或 media_info_cache_path 后, MediaInfoReader.read 的结果
+按 (设备号, inode, 文件大小, 修改时间, 后缀) 缓存, 同一文件重复创建 MediaFile 时只需一次 stat.
+内存中按最近使用保留 GlobalConfig.media_info_cache_size 条; 设置 GlobalConfig.media_info_cache_path
+后同时写入 SQLite, 在多次运行之间保留. 媒体库硬链接到输出目录的文件与媒体库中的对象共享 inode, 也共享缓存.
+
+文件被原地修改但大小和修改时间 (纳秒) 都未变化时会读到修改前的结果
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import replace
+from pathlib import Path
+
+from ..config import GlobalConfig
+from .media_info import MediaInfo
+
+
+def cache_key(path: str | Path) -> str:
+    """文件的缓存键, 文件替换 (新 inode)、大小或修改时间变化后键随之变化
+    :raises OSError: 文件不存在
+    """
+    st = os.stat(path)
+    # 部分文件系统没有 inode, 改用绝对路径
+    identity = f"{st.st_dev}:{st.st_ino}" if st.st_ino else os.path.abspath(path)
+    return f"{identity}:{st.st_size}:{st.st_mtime_ns}:{Path(path).suffix.lower()}"
+
+
+class MediaInfoCache:
+    """媒体信息缓存
+
+    Example:
+        ::
+
+            GlobalConfig.media_info_cache_size = 4096
+            GlobalConfig.media_info_cache_path = Path("./media_info.sqlite3")
+    """
+
+    def __init__(self, maxsize: int = 1024, *, path: str | Path | None = None, disk_max_entries: int = 100_000) -> None:
+        """
+        :param maxsize: 内存中的最大条目数, 为 0 时只使用磁盘缓存
+        :param path: SQLite 数据库文件路径, 为 None 时不使用磁盘缓存
+        :param disk_max_entries: 磁盘缓存的最大条目数, 超出时删除最早写入的条目
+        """
+        self.maxsize = maxsize
+        self.path = Path(path) if path is not None else None
+        self.disk_max_entries = disk_max_entries
+        self._data: OrderedDict[str, MediaInfo] = OrderedDict()
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def read(self, path: str | Path, reader: Callable[[str | Path], MediaInfo]) -> MediaInfo:
+        """读取媒体信息, 未命中时调用 reader 读取文件并写入缓存
+        :param path: 文件路径
+        :param reader: 读取文件的函数
+        :return: MediaInfo
+        """
+        try:
+            key = cache_key(path)
+        except OSError:
+            # 文件不存在时由 reader 报错
+            return reader(path)
+        if (info := self.get(key)) is not None:
+            return info
+        info = reader(path)
+        self.set(key, info)
+        return info
+
+    def get(self, key: str) -> MediaInfo | None:
+        with self._lock:
+            if (info := self._data.get(key)) is not None:
+                self._data.move_to_end(key)
+                return replace(info)
+            if self.path is None:
+                return None
+            row = (
+                self._connect()
+                .execute("SELECT width, height, duration FROM media_info WHERE key = ?", (key,))
+                .fetchone()
+            )
+            if row is None:
+                return None
+            info = MediaInfo(width=row[0], height=row[1], duration=row[2])
+            self._remember(key, info)
+        return replace(info)
+
+    def set(self, key: str, info: MediaInfo) -> None:
+        with self._lock:
+            self._remember(key, replace(info))
+            if self.path is None:
+                return
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO media_info (key, width, height, duration, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, info.width, info.height, info.duration, time.time()),
+            )
+            conn.commit()
+            self._writes += 1
+            if self._writes % 256 == 0:
+                self._prune(conn)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            if self.path is not None:
+                conn = self._connect()
+                conn.execute("DELETE FROM media_info")
+                conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _remember(self, key: str, info: MediaInfo) -> None:
+        if self.maxsize <= 0:
+            return
+        self._data[key] = info
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            assert self.path is not None
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS media_info (key TEXT PRIMARY KEY, width INTEGER NOT NULL, "
+                "height INTEGER NOT NULL, duration INTEGER NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._prune(conn)
+            self._conn = conn
+        return self._conn
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        """删除超出 disk_max_entries 的最早写入的条目"""
+        conn.execute(
+            "DELETE FROM media_info WHERE key NOT IN (SELECT key FROM media_info ORDER BY created_at DESC LIMIT ?)",
+            (self.disk_max_entries,),
+        )
+        conn.commit()
+
+
+_caches: dict[Path | None, MediaInfoCache] = {}
+
+
+def get_media_info_cache() -> MediaInfoCache | None:
+    """获取 GlobalConfig 对应的媒体信息缓存, 内存和磁盘缓存都未启用时返回 None"""
+    path = GlobalConfig.media_info_cache_path
+    if not GlobalConfig.media_info_cache_size and path is None:
+        return None
+    root = path.resolve() if path is not None else None
+    if (cache := _caches.get(root)) is None:
+        cache = _caches[root] = MediaInfoCache(path=root)
+    cache.maxsize = GlobalConfig.media_info_cache_size
+    return cache
+
+
+__all__ = ["MediaInfoCache", "cache_key", "get_media_info_cache"]
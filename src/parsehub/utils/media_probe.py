@@ -0,0 +1,480 @@
+"""只读取文件头的媒体信息解析
+
+直接解析容器结构, 只读取宽高、时长所在的几 KB 数据, 不需要导入 Pillow / OpenCV:
+
+- 图片: JPEG (SOF), PNG (IHDR), WebP (VP8 / VP8L / VP8X), AVIF / HEIF (ispe)
+- 动图: GIF (逐块扫描图形控制扩展中的帧延迟, 跳过 LZW 数据不解码)
+- 视频: MP4 / MOV (mvhd, tkhd), Matroska / WebM (Info, Tracks)
+
+无法识别的格式或结构损坏时返回 None, 由 MediaInfoReader 回退到 Pillow / OpenCV.
+HeaderProbe 在下载时对数据流使用相同的解析, 不需要下载完成后再读取文件
+"""
+
+import asyncio
+import math
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, BinaryIO, Protocol
+
+from .media_info import MediaInfo
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_EBML_MAGIC = b"\x1a\x45\xdf\xa3"
+_GIF_SIGNATURES = (b"GIF87a", b"GIF89a")
+
+# SOF0 ~ SOF15, 不包括 DHT (C4)、JPG (C8)、DAC (CC)
+_JPEG_SOF = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# ftyp 主品牌为以下值时按 HEIF 图片解析, 否则按 MP4 / MOV 视频解析
+_HEIF_BRANDS = frozenset({b"avif", b"avis", b"heic", b"heix", b"heim", b"heis", b"hevc", b"hevx", b"mif1", b"msf1"})
+
+# Matroska 元素 ID
+_MKV_SEGMENT = 0x18538067
+_MKV_INFO = 0x1549A966
+_MKV_TIMESTAMP_SCALE = 0x2AD7B1
+_MKV_DURATION = 0x4489
+_MKV_TRACKS = 0x1654AE6B
+_MKV_TRACK_ENTRY = 0xAE
+_MKV_TRACK_TYPE = 0x83
+_MKV_VIDEO = 0xE0
+_MKV_PIXEL_WIDTH = 0xB0
+_MKV_PIXEL_HEIGHT = 0xBA
+_MKV_CLUSTER = 0x1F43B675
+
+
+class _Reader(Protocol):
+    def seek(self, offset: int, /) -> Any: ...
+
+    def read(self, size: int, /) -> bytes: ...
+
+
+def probe_header(path: str | Path) -> MediaInfo | None:
+    """解析文件头读取媒体信息
+    :param path: 文件路径
+    :return: MediaInfo, 无法识别时返回 None
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        head = f.read(32)
+        try:
+            if head[:6] in _GIF_SIGNATURES:
+                return _probe_gif(f)
+            return _probe(f, head, size)
+        except (struct.error, ValueError, IndexError):
+            return None
+
+
+class HeaderProbe:
+    """随下载的数据块解析文件头, 下载完成时 (或更早) 即可得到宽高、时长, 不需要再次打开文件
+
+    只缓存文件开头最多 max_size 字节, 解析完成或确定无法解析后不再缓存.
+    GIF 的时长需要扫描整个文件, moov 位于媒体数据之后的 MP4 需要文件末尾的数据, 这两种情况得不到结果,
+    由 MediaInfoReader 在下载完成后读取文件
+
+    Example:
+        ::
+
+            probe = HeaderProbe()
+            await download(url, path, probe=probe)
+            print(probe.info)
+    """
+
+    def __init__(self, max_size: int = 2 * 1024 * 1024) -> None:
+        """
+        :param max_size: 最多缓存的文件开头字节数
+        """
+        self.max_size = max_size
+        self.info: MediaInfo | None = None
+        """解析得到的媒体信息, 尚未解析出或无法解析时为 None"""
+        self.done = False
+        """是否已解析完成 (包括无法解析)"""
+        self.size = 0
+        """已接收的字节数"""
+        self._total = 0
+        self._buffer = bytearray()
+        # 下次尝试解析所需的字节数
+        self._need = 32
+
+    def reset(self, total: int = 0) -> None:
+        """从文件开头重新接收数据
+        :param total: 文件大小, 未知时为 0
+        """
+        self.info = None
+        self.done = False
+        self.size = 0
+        self._total = total
+        self._buffer = bytearray()
+        self._need = 32
+
+    def feed(self, data: bytes) -> None:
+        """按文件顺序传入数据块"""
+        self.size += len(data)
+        if self.done:
+            return
+        if room := self.max_size - len(self._buffer):
+            self._buffer += data[:room]
+        if len(self._buffer) >= min(self._need, self._total or self._need):
+            self._parse()
+
+    async def sync(self, path: str | Path, size: int, *, total: int = 0) -> None:
+        """使解析状态对应文件的前 size 字节, 与已接收的字节数不一致时从磁盘读取文件头
+        :param path: 文件路径
+        :param size: 文件中已写入的字节数
+        :param total: 文件大小, 未知时为 0
+        """
+        if size and size == self.size:
+            self._total = total
+            return
+        self.reset(total)
+        if size:
+            self.feed(await asyncio.to_thread(_read_prefix, Path(path), min(size, self.max_size)))
+            self.size = size
+
+    def _parse(self) -> None:
+        buffer = self._buffer
+        try:
+            if buffer[:6] in _GIF_SIGNATURES:
+                self.info = None
+            else:
+                reader = _PrefixReader(buffer, self._total or sys.maxsize)
+                self.info = _probe(reader, bytes(buffer[:32]), self._total or sys.maxsize)
+        except _NeedMore as e:
+            # 所需数据超出缓存上限时放弃, 例如 moov 位于文件末尾的 MP4
+            if e.offset <= self.max_size:
+                self._need = e.offset
+                return
+            self.info = None
+        except (struct.error, ValueError, IndexError):
+            self.info = None
+        self.done = True
+        self._buffer = bytearray()
+
+
+class _NeedMore(Exception):
+    """流式解析时需要的数据尚未到达"""
+
+    def __init__(self, offset: int) -> None:
+        self.offset = offset
+
+
+class _PrefixReader:
+    """已接收的文件开头, 读取尚未到达的数据时抛出 _NeedMore"""
+
+    def __init__(self, data: bytearray, size: int) -> None:
+        self._data = data
+        self._size = size
+        self._pos = 0
+
+    def seek(self, offset: int, /) -> int:
+        self._pos = offset
+        return offset
+
+    def read(self, size: int, /) -> bytes:
+        end = min(self._pos + size, self._size)
+        if end > len(self._data):
+            raise _NeedMore(end)
+        data = bytes(self._data[self._pos : end])
+        self._pos += len(data)
+        return data
+
+
+def _read_prefix(path: Path, size: int) -> bytes:
+    with path.open("rb") as f:
+        return f.read(size)
+
+
+def _probe(f: _Reader, head: bytes, size: int) -> MediaInfo | None:
+    """按文件头的魔数选择解析方式, 不包括 GIF"""
+    if head.startswith(_PNG_SIGNATURE):
+        return _probe_png(f)
+    if head.startswith(b"\xff\xd8"):
+        return _probe_jpeg(f, size)
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return _probe_webp(head)
+    if head[4:8] == b"ftyp":
+        if head[8:12] in _HEIF_BRANDS:
+            return _probe_heif(f, size)
+        return _probe_mp4(f, size)
+    if head.startswith(_EBML_MAGIC):
+        return _probe_matroska(f, size)
+    return None
+
+
+def _read(f: _Reader, offset: int, size: int) -> bytes:
+    f.seek(offset)
+    data = f.read(size)
+    if len(data) < size:
+        raise ValueError("文件不完整")
+    return data
+
+
+def _probe_png(f: _Reader) -> MediaInfo | None:
+    length, kind, width, height = struct.unpack(">I4sII", _read(f, 8, 16))
+    return MediaInfo(width=width, height=height) if kind == b"IHDR" else None
+
+
+def _probe_jpeg(f: _Reader, size: int) -> MediaInfo | None:
+    pos = 2
+    while pos + 4 <= size:
+        header = _read(f, pos, 4)
+        if header[0] != 0xFF:
+            return None
+        marker = header[1]
+        if marker == 0xFF:
+            # 填充字节
+            pos += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            # 没有长度字段的标记
+            pos += 2
+            continue
+        if marker in (0xD9, 0xDA):
+            # 在 SOF 之前遇到 EOI / SOS
+            return None
+        if marker in _JPEG_SOF:
+            height, width = struct.unpack(">HH", _read(f, pos + 5, 4))
+            return MediaInfo(width=width, height=height)
+        pos += 2 + struct.unpack(">H", header[2:4])[0]
+    return None
+
+
+def _probe_webp(head: bytes) -> MediaInfo | None:
+    chunk = head[12:16]
+    if chunk == b"VP8 " and head[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", head[26:30])
+        return MediaInfo(width=width & 0x3FFF, height=height & 0x3FFF)
+    if chunk == b"VP8L" and head[20] == 0x2F:
+        bits = int.from_bytes(head[21:25], "little")
+        return MediaInfo(width=(bits & 0x3FFF) + 1, height=((bits >> 14) & 0x3FFF) + 1)
+    if chunk == b"VP8X":
+        width = int.from_bytes(head[24:27], "little") + 1
+        height = int.from_bytes(head[27:30], "little") + 1
+        return MediaInfo(width=width, height=height)
+    return None
+
+
+def _probe_gif(f: BinaryIO) -> MediaInfo | None:
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        return _scan_gif(buf)
+
+
+def _scan_gif(buf: mmap.mmap | bytes) -> MediaInfo:
+    """扫描 GIF 数据块, 累加每帧的延迟
+
+    帧延迟与 Pillow 一致: 取该帧之前的图形控制扩展中的延迟, 没有图形控制扩展的帧按 100 毫秒计算
+    """
+    width, height, flags = struct.unpack_from("<HHB", buf, 6)
+    pos = 13
+    if flags & 0x80:
+        # 全局颜色表
+        pos += 3 << ((flags & 7) + 1)
+    frames = total_ms = 0
+    delay: int | None = None
+    while pos < len(buf):
+        block = buf[pos]
+        if block == 0x21:
+            # 扩展块, 0xF9 为图形控制扩展: 块大小, 标志, 延迟 (1/100 秒), 透明色索引
+            if buf[pos + 1] == 0xF9 and buf[pos + 2] >= 3:
+                delay = struct.unpack_from("<H", buf, pos + 4)[0] * 10
+            pos = _skip_sub_blocks(buf, pos + 2)
+        elif block == 0x2C:
+            # 图像描述符
+            left, top, w, h, flags = struct.unpack_from("<HHHHB", buf, pos + 1)
+            if not frames:
+                # 第一帧超出逻辑屏幕时 Pillow 会扩大图像尺寸
+                width, height = max(width, left + w), max(height, top + h)
+            pos += 10
+            if flags & 0x80:
+                pos += 3 << ((flags & 7) + 1)
+            # 跳过 LZW 最小码长和图像数据子块
+            pos = _skip_sub_blocks(buf, pos + 1)
+            frames += 1
+            total_ms += 100 if delay is None else delay
+            delay = None
+        else:
+            # 0x3B 为结束块, 其他值说明文件损坏, 按已扫描的帧计算
+            break
+    return MediaInfo(width=width, height=height, duration=math.ceil(total_ms / 1000))
+
+
+def _skip_sub_blocks(buf: mmap.mmap | bytes, pos: int) -> int:
+    """跳过以长度为 0 的子块结尾的数据子块, 返回之后的位置"""
+    end = len(buf)
+    while pos < end and (length := buf[pos]):
+        pos += length + 1
+    return pos + 1
+
+
+def _boxes(f: _Reader, start: int, end: int) -> Iterator[tuple[bytes, int, int]]:
+    """遍历 ISO BMFF [start, end) 范围内的 box
+    :return: (类型, 内容起点, 内容终点)
+    """
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        header = f.read(16)
+        if len(header) < 8:
+            return
+        box_size, kind = struct.unpack(">I4s", header[:8])
+        offset = 8
+        if box_size == 1:
+            if len(header) < 16:
+                return
+            box_size = struct.unpack(">Q", header[8:16])[0]
+            offset = 16
+        elif box_size == 0:
+            box_size = end - pos
+        if box_size < offset:
+            return
+        yield kind, pos + offset, min(pos + box_size, end)
+        pos += box_size
+
+
+def _find_box(f: _Reader, start: int, end: int, kind: bytes) -> tuple[int, int] | None:
+    for box_kind, box_start, box_end in _boxes(f, start, end):
+        if box_kind == kind:
+            return box_start, box_end
+    return None
+
+
+def _probe_mp4(f: _Reader, size: int) -> MediaInfo | None:
+    # moov 可能位于 mdat 之后, 逐个跳过顶层 box 查找, 不读取媒体数据
+    if (moov := _find_box(f, 0, size, b"moov")) is None:
+        return None
+    timescale = duration = fragment_duration = 0
+    width = height = 0
+    for kind, start, end in _boxes(f, *moov):
+        if kind == b"mvhd":
+            data = _read(f, start, 32)
+            if data[0] == 1:
+                timescale, duration = struct.unpack(">IQ", data[20:32])
+            else:
+                timescale, duration = struct.unpack(">II", data[12:20])
+        elif kind == b"mvex" and (mehd := _find_box(f, start, end, b"mehd")):
+            # 分片 MP4 的 mvhd 时长可能为 0, 总时长记录在 mehd
+            data = _read(f, mehd[0], 12)
+            fragment_duration = (
+                struct.unpack(">Q", data[4:12])[0] if data[0] == 1 else struct.unpack(">I", data[4:8])[0]
+            )
+        elif kind == b"trak" and not width and (tkhd := _find_box(f, start, end, b"tkhd")):
+            width, height = _tkhd_size(_read(f, tkhd[0], min(tkhd[1] - tkhd[0], 96)))
+    if not width or not height:
+        return None
+    # 时长全为 1 表示未知
+    if duration in (0xFFFFFFFF, 0xFFFFFFFFFFFFFFFF):
+        duration = 0
+    duration = duration or fragment_duration
+    seconds = math.ceil(duration / timescale) if timescale else 0
+    return MediaInfo(width=width, height=height, duration=seconds)
+
+
+def _tkhd_size(data: bytes) -> tuple[int, int]:
+    """读取 tkhd 中的显示宽高, 旋转 90° / 270° 时交换宽高"""
+    matrix = 52 if data[0] == 1 else 40
+    a, b, _, c, d = struct.unpack(">5i", data[matrix : matrix + 20])
+    width, height = struct.unpack(">II", data[matrix + 36 : matrix + 44])
+    # 16.16 定点数
+    width, height = (width + 0x8000) >> 16, (height + 0x8000) >> 16
+    if a == 0 and d == 0 and b and c:
+        width, height = height, width
+    return width, height
+
+
+def _probe_heif(f: _Reader, size: int) -> MediaInfo | None:
+    if (meta := _find_box(f, 0, size, b"meta")) is None:
+        return None
+    # meta 是 full box, 子 box 从 version / flags 之后开始
+    if (iprp := _find_box(f, meta[0] + 4, meta[1], b"iprp")) is None:
+        return None
+    if (ipco := _find_box(f, *iprp, b"ipco")) is None:
+        return None
+    width = height = 0
+    for kind, start, _ in _boxes(f, *ipco):
+        if kind == b"ispe":
+            w, h = struct.unpack(">II", _read(f, start + 4, 8))
+            # 缩略图也有 ispe, 取面积最大的图像
+            if w * h > width * height:
+                width, height = w, h
+    return MediaInfo(width=width, height=height) if width and height else None
+
+
+def _vint_length(first: int) -> int:
+    """EBML 变长整数的字节数, 由第一个字节的前导零个数决定"""
+    return 9 - first.bit_length() if first else 9
+
+
+def _ebml_elements(f: _Reader, start: int, end: int) -> Iterator[tuple[int, int, int]]:
+    """遍历 EBML [start, end) 范围内的元素
+    :return: (元素 ID, 内容起点, 内容终点)
+    """
+    pos = start
+    while pos < end:
+        f.seek(pos)
+        header = f.read(12)
+        if len(header) < 2:
+            return
+        id_length = _vint_length(header[0])
+        if id_length > 4 or id_length >= len(header):
+            return
+        size_length = _vint_length(header[id_length])
+        if size_length > 8 or id_length + size_length > len(header):
+            return
+        element_id = int.from_bytes(header[:id_length], "big")
+        mask = (1 << (7 * size_length)) - 1
+        value = int.from_bytes(header[id_length : id_length + size_length], "big") & mask
+        data_start = pos + id_length + size_length
+        if value == mask:
+            # 未知长度 (直播流), 延续到父元素结束
+            yield element_id, data_start, end
+            return
+        yield element_id, data_start, min(data_start + value, end)
+        pos = data_start + value
+
+
+def _probe_matroska(f: _Reader, size: int) -> MediaInfo | None:
+    segment = next(((s, e) for i, s, e in _ebml_elements(f, 0, size) if i == _MKV_SEGMENT), None)
+    if segment is None:
+        return None
+    scale, duration = 1_000_000, 0.0
+    width = height = 0
+    for element_id, start, end in _ebml_elements(f, *segment):
+        if element_id == _MKV_INFO:
+            for child, child_start, child_end in _ebml_elements(f, start, end):
+                if child == _MKV_TIMESTAMP_SCALE:
+                    scale = int.from_bytes(_read(f, child_start, child_end - child_start), "big")
+                elif child == _MKV_DURATION:
+                    data = _read(f, child_start, child_end - child_start)
+                    duration = struct.unpack(">f" if len(data) == 4 else ">d", data)[0]
+        elif element_id == _MKV_TRACKS:
+            for entry, entry_start, entry_end in _ebml_elements(f, start, end):
+                if entry == _MKV_TRACK_ENTRY and not width:
+                    width, height = _matroska_video_size(f, entry_start, entry_end)
+        elif element_id == _MKV_CLUSTER:
+            # Info 和 Tracks 位于媒体数据之前
+            break
+    if not width or not height:
+        return None
+    return MediaInfo(width=width, height=height, duration=math.ceil(duration * scale / 1e9))
+
+
+def _matroska_video_size(f: _Reader, start: int, end: int) -> tuple[int, int]:
+    track_type, width, height = 0, 0, 0
+    for element_id, child_start, child_end in _ebml_elements(f, start, end):
+        if element_id == _MKV_TRACK_TYPE:
+            track_type = int.from_bytes(_read(f, child_start, child_end - child_start), "big")
+        elif element_id == _MKV_VIDEO:
+            for child, value_start, value_end in _ebml_elements(f, child_start, child_end):
+                if child in (_MKV_PIXEL_WIDTH, _MKV_PIXEL_HEIGHT):
+                    value = int.from_bytes(_read(f, value_start, value_end - value_start), "big")
+                    if child == _MKV_PIXEL_WIDTH:
+                        width = value
+                    else:
+                        height = value
+    return (width, height) if track_type == 1 else (0, 0)
+
+
+__all__ = ["HeaderProbe", "probe_header"]
@@ -0,0 +1,164 @@
+"""下载进度节流与自适应分块"""
+
+import asyncio
+import time
+from collections.abc import AsyncGenerator, AsyncIterator, Awaitable, Callable
+from typing import Any
+
+from loguru import logger
+
+from ..config import GlobalConfig
+
+
+class ProgressThrottle:
+    """合并高频的进度回调
+
+    距上次回调的时间、字节数、百分比都达到阈值时才回调, 完成 (current >= total) 时总是回调.
+    被跳过的最后一次进度可以通过 flush 补发
+    """
+
+    def __init__(
+        self,
+        callback: Callable[..., Awaitable[None]],
+        *,
+        args: tuple = (),
+        kwargs: dict | None = None,
+        interval: float | None = None,
+        min_bytes: int | None = None,
+        min_percent: float | None = None,
+    ) -> None:
+        """
+        :param callback: 回调函数, 以 (current, total, *args, **kwargs) 调用
+        :param args: 回调函数的参数
+        :param kwargs: 回调函数的关键字参数
+        :param interval: 最小回调间隔, 单位: 秒, 默认为 GlobalConfig.progress_interval
+        :param min_bytes: 两次回调之间的最小字节数, 默认为 GlobalConfig.progress_min_bytes
+        :param min_percent: 两次回调之间的最小百分比, 总大小未知时忽略, 默认为 GlobalConfig.progress_min_percent
+        """
+        self.callback = callback
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.interval = GlobalConfig.progress_interval if interval is None else interval
+        self.min_bytes = GlobalConfig.progress_min_bytes if min_bytes is None else min_bytes
+        self.min_percent = GlobalConfig.progress_min_percent if min_percent is None else min_percent
+        self._last_time = float("-inf")
+        self._last = 0
+        self._pending: tuple[int, int] | None = None
+
+    async def __call__(self, current: int, total: int) -> None:
+        now = time.monotonic()
+        if not (0 < total <= current) and (
+            now - self._last_time < self.interval
+            or current - self._last < self.min_bytes
+            or (total > 0 and (current - self._last) * 100 < self.min_percent * total)
+        ):
+            self._pending = (current, total)
+            return
+        self._pending = None
+        self._last_time = now
+        self._last = current
+        await self.callback(current, total, *self.args, **self.kwargs)
+
+    async def flush(self) -> None:
+        """补发被跳过的最后一次进度"""
+        if self._pending is not None:
+            current, total = self._pending
+            self._pending = None
+            self._last_time = time.monotonic()
+            self._last = current
+            await self.callback(current, total, *self.args, **self.kwargs)
+
+
+class ProgressListener:
+    """合并下载中一个调用者的进度回调
+
+    回调在独立的任务中执行, 通知时不等待回调完成; 回调较慢时只保留最新的进度.
+    回调出错后记录日志并不再通知该调用者, 共享的下载和其他调用者不受影响
+    """
+
+    def __init__(self, callback: Callable[..., Awaitable[None]], *, args: tuple = (), kwargs: dict | None = None):
+        """
+        :param callback: 回调函数, 以 (*progress, *args, **kwargs) 调用
+        :param args: 回调函数的参数
+        :param kwargs: 回调函数的关键字参数
+        """
+        self.callback = callback
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.failed = False
+        self._latest: tuple[Any, ...] | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    def notify(self, *progress: Any) -> None:
+        """通知最新进度"""
+        if self.failed:
+            return
+        self._latest = progress
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._deliver())
+
+    async def drain(self) -> None:
+        """等待已通知的进度回调完成"""
+        if self._task is not None:
+            await self._task
+
+    def cancel(self) -> None:
+        """不再通知, 取消进行中的回调"""
+        self.failed = True
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _deliver(self) -> None:
+        while self._latest is not None and not self.failed:
+            progress, self._latest = self._latest, None
+            try:
+                await self.callback(*progress, *self.args, **self.kwargs)
+            except Exception as e:
+                self.failed = True
+                logger.opt(exception=e).warning("下载进度回调出错, 不再通知该调用者")
+
+
+async def adaptive_chunks(
+    stream: AsyncIterator[bytes],
+    min_size: int,
+    max_size: int,
+    target_interval: float = 0.05,
+) -> AsyncGenerator[bytes]:
+    """将网络读取到的数据合并为自适应大小的块
+
+    块大小从 min_size 开始, 填满一块的耗时低于 target_interval 的一半时翻倍, 高于两倍时减半,
+    吞吐量越高块越大, 每块的写入和进度回调开销随之摊薄. 读取出错时先交出已缓冲的数据再抛出异常
+    :param stream: 原始数据流, 例如 response.aiter_bytes()
+    :param min_size: 最小块大小
+    :param max_size: 最大块大小, 与 min_size 相同时固定块大小
+    :param target_interval: 填满一块的目标耗时, 单位: 秒
+    """
+    size = min_size
+    buffer = bytearray()
+    started = time.monotonic()
+    try:
+        async for data in stream:
+            if not buffer and len(data) >= size:
+                yield data
+            else:
+                buffer += data
+                if len(buffer) < size:
+                    continue
+                yield bytes(buffer)
+                buffer.clear()
+            now = time.monotonic()
+            elapsed, started = now - started, now
+            if elapsed < target_interval / 2:
+                size = min(size * 2, max_size)
+            elif elapsed > target_interval * 2:
+                size = max(size // 2, min_size)
+    except Exception:
+        if buffer:
+            yield bytes(buffer)
+            buffer.clear()
+        raise
+    if buffer:
+        yield bytes(buffer)
+
+
+__all__ = ["ProgressListener", "ProgressThrottle", "adaptive_chunks"]
@@ -0,0 +1,119 @@
+"""短链接重定向解析"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from urllib.parse import parse_qsl, urlsplit
+
+import httpx
+
+from .http_client import ProxyTypes, http_client
+
+# 最终链接带有这些参数时通常是一次性 / 会过期的分享令牌或签名, 不缓存
+_TOKEN_PARAMS = frozenset(
+    {
+        "xsec_token",
+        "token",
+        "access_token",
+        "auth_key",
+        "sign",
+        "signature",
+        "x-signature",
+        "x-expires",
+        "expires",
+        "x-amz-signature",
+        "x-amz-expires",
+        "oe",
+    }
+)
+
+
+class RedirectResolver:
+    """逐跳跟随重定向并缓存 短链接 -> 最终链接 的映射
+
+    每一跳使用流式 GET 请求, 只读取响应头, 不下载落地页正文.
+    不使用 HEAD 是因为部分短链接服务对 HEAD 请求返回 404/405 或不返回重定向.
+    最终链接带有分享令牌或签名参数 (如 xsec_token, x-expires, signature) 时不缓存
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 10 * 60, max_redirects: int = 10) -> None:
+        """
+        :param maxsize: 最多缓存的链接数, 为 0 时不缓存
+        :param ttl: 缓存有效期, 单位: 秒
+        :param max_redirects: 最大重定向次数
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_redirects = max_redirects
+        self._cache: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get_cached(self, url: str) -> str | None:
+        """获取已缓存的最终链接"""
+        if (item := self._cache.get(url)) is None:
+            return None
+        expires_at, final_url = item
+        if expires_at <= time.time():
+            del self._cache[url]
+            return None
+        self._cache.move_to_end(url)
+        return final_url
+
+    def set_cached(self, url: str, final_url: str) -> None:
+        if self.maxsize <= 0 or _has_token(final_url):
+            return
+        self._cache[url] = (time.time() + self.ttl, final_url)
+        self._cache.move_to_end(url)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    async def resolve(
+        self,
+        url: str,
+        *,
+        proxy: ProxyTypes = None,
+        scope: str | None = None,
+        headers: Mapping[str, str] | None = None,
+        timeout: float = 30,
+    ) -> str:
+        """获取重定向后的最终链接
+        :param url: 链接
+        :param proxy: 代理
+        :param scope: 作用域, 一般为平台 id
+        :param headers: 请求头
+        :param timeout: 每一跳的超时时间
+        :return: 最终链接
+        """
+        if (cached := self.get_cached(url)) is not None:
+            return cached
+
+        async with http_client(proxy=proxy, scope=scope) as client:
+            request = client.build_request("GET", url, headers=headers, timeout=timeout)
+            for _ in range(self.max_redirects + 1):
+                response = await client.send(request, stream=True, follow_redirects=False)
+                # 不读取正文直接关闭
+                await response.aclose()
+                if response.next_request is None:
+                    break
+                request = response.next_request
+            else:
+                raise httpx.TooManyRedirects("重定向次数过多", request=request)
+
+        final_url = str(response.url)
+        self.set_cached(url, final_url)
+        return final_url
+
+
+def _has_token(url: str) -> bool:
+    return any(key.lower() in _TOKEN_PARAMS for key, _ in parse_qsl(urlsplit(url).query, keep_blank_values=True))
+
+
+redirect_resolver = RedirectResolver()
+"""进程内共享的重定向解析器"""
+
+__all__ = ["RedirectResolver", "redirect_resolver"]
@@ -0,0 +1,209 @@
+"""进程内的下载调度
+
+所有下载请求都经过 ``download_scheduler``:
+
+- 同一域名的并发连接数不超过 ``GlobalConfig.download_host_connections``, 排队的请求按下载任务轮流分配连接,
+  文件多的任务不会让之后的任务一直等待. 短链接 / 分享链接重定向到 CDN 后, 按实际传输数据的域名计算
+- 全局和各平台的下载速度由令牌桶限制, 见 ``GlobalConfig.download_bandwidth`` 和 ``download_platform_bandwidth``
+
+下载任务由 ``download_job`` 标记, ``ParseResult.download`` 会为每个帖子创建一个任务; 任务之外的下载各自作为一个任务
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Hashable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+from ..config import GlobalConfig
+
+
+class TokenBucket:
+    """令牌桶限速, 允许透支: 消费后令牌为负时等待其恢复, 并发的消费者按到达顺序依次等待"""
+
+    def __init__(self, rate: float, burst: float | None = None) -> None:
+        """
+        :param rate: 每秒产生的令牌数 (字节/秒)
+        :param burst: 令牌桶容量, 默认为 rate (即最多积累 1 秒)
+        """
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def consume(self, amount: int) -> None:
+        self._refill()
+        self._tokens -= amount
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+
+class _HostSlots:
+    """单个域名的连接槽位, 排队的请求按任务轮流获得槽位"""
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.waiters: OrderedDict[Hashable, deque[asyncio.Future[None]]] = OrderedDict()
+
+    async def acquire(self, job: Hashable, limit: int) -> None:
+        if self.active < limit and not self.waiters:
+            self.active += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self.waiters.setdefault(job, deque()).append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # 已经分配到槽位后被取消, 转交给下一个请求
+                self.release(limit)
+            else:
+                self._remove(job, fut)
+            raise
+
+    def release(self, limit: int) -> None:
+        while self.active <= limit and self.waiters:
+            job, queue = next(iter(self.waiters.items()))
+            fut = queue.popleft()
+            if queue:
+                # 该任务的下一个请求排到队尾, 先轮到其他任务
+                self.waiters.move_to_end(job)
+            else:
+                del self.waiters[job]
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self.active -= 1
+
+    def _remove(self, job: Hashable, fut: asyncio.Future[None]) -> None:
+        if (queue := self.waiters.get(job)) is not None:
+            try:
+                queue.remove(fut)
+            except ValueError:
+                pass
+            if not queue:
+                del self.waiters[job]
+
+
+@dataclass(frozen=True, eq=False)
+class DownloadJob:
+    """下载任务, 同一任务的请求共享公平队列中的一个位置"""
+
+    platform: str | None = None
+
+
+_current_job: ContextVar[DownloadJob | None] = ContextVar("parsehub_download_job", default=None)
+
+
+@contextmanager
+def download_job(platform: str | None = None) -> Iterator[DownloadJob]:
+    """将当前上下文中的下载归为同一个任务
+    :param platform: 平台 id, 用于平台限速
+    """
+    job = DownloadJob(platform)
+    token = _current_job.set(job)
+    try:
+        yield job
+    finally:
+        _current_job.reset(token)
+
+
+@dataclass
+class Transfer:
+    """一次下载连接, 读取数据后调用 consume 限速"""
+
+    buckets: list[TokenBucket] = field(default_factory=list)
+    host: str | None = None
+    """当前占用槽位的域名"""
+    scheduler: "DownloadScheduler | None" = field(default=None, repr=False)
+    job: DownloadJob | None = field(default=None, repr=False)
+
+    async def consume(self, amount: int) -> None:
+        for bucket in self.buckets:
+            await bucket.consume(amount)
+
+    async def rebind(self, url: str) -> None:
+        """重定向到其他域名后, 改为占用实际传输数据的域名的连接槽位
+        :param url: 响应的最终链接, 即 response.url
+        """
+        host = _host(url)
+        if self.scheduler is None or self.job is None or host == self.host:
+            return
+        # 先释放再排队, 不同时占用两个域名的槽位, 避免相互重定向的域名之间死锁
+        if self.host is not None:
+            self.scheduler._release(self.host)
+            self.host = None
+        await self.scheduler._acquire(host, self.job)
+        self.host = host
+
+
+class DownloadScheduler:
+    """下载调度器"""
+
+    def __init__(self) -> None:
+        self._hosts: dict[str, _HostSlots] = {}
+        self._buckets: dict[str | None, TokenBucket] = {}
+
+    def _bucket(self, key: str | None, rate: int | None) -> TokenBucket | None:
+        """获取限速令牌桶, 配置变化时重新创建"""
+        if not rate:
+            self._buckets.pop(key, None)
+            return None
+        bucket = self._buckets.get(key)
+        if bucket is None or bucket.rate != rate:
+            bucket = self._buckets[key] = TokenBucket(rate)
+        return bucket
+
+    async def _acquire(self, host: str, job: DownloadJob) -> None:
+        slots = self._hosts.setdefault(host, _HostSlots())
+        await slots.acquire(job, GlobalConfig.download_host_connections)
+
+    def _release(self, host: str) -> None:
+        slots = self._hosts[host]
+        slots.release(GlobalConfig.download_host_connections)
+        if not slots.active and not slots.waiters:
+            self._hosts.pop(host, None)
+
+    @asynccontextmanager
+    async def transfer(self, url: str) -> AsyncIterator[Transfer]:
+        """占用目标域名的一个连接槽位
+        :param url: 下载链接; 跟随重定向时槽位按该链接的域名计算, 收到响应后用 Transfer.rebind 改为最终域名
+        :return: Transfer, 读取数据后调用 consume 限速
+        """
+        host = _host(url)
+        job = _current_job.get() or DownloadJob()
+        await self._acquire(host, job)
+        transfer = Transfer(host=host, scheduler=self, job=job)
+        try:
+            transfer.buckets = [
+                bucket
+                for bucket in (
+                    self._bucket(None, GlobalConfig.download_bandwidth),
+                    self._bucket(job.platform, GlobalConfig.download_platform_bandwidth.get(job.platform or ""))
+                    if job.platform
+                    else None,
+                )
+                if bucket is not None
+            ]
+            yield transfer
+        finally:
+            if transfer.host is not None:
+                self._release(transfer.host)
+
+
+def _host(url: str) -> str:
+    return (urlsplit(url).hostname or "").lower()
+
+
+download_scheduler = DownloadScheduler()
+"""进程内共享的下载调度器"""
+
+__all__ = ["DownloadJob", "DownloadScheduler", "TokenBucket", "Transfer", "download_job", "download_scheduler"]
@@ -0,0 +1,63 @@
+"""合并相同的并发请求"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from functools import partial
+from typing import Any
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future[Any]) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """同一个键同时只执行一次, 期间的其他调用等待并共享其结果或异常
+
+    执行中的任务在所有等待者都取消后才会被取消, 单个等待者取消不会影响其他等待者
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, _Call] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def do[T](self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """执行或加入执行中的调用
+        :param key: 键
+        :param fn: 无参数的协程函数, 只有第一个调用者的 fn 会被执行
+        :return: fn 的结果
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(partial(self._on_done, key, call))
+
+        call.waiters += 1
+        try:
+            result: T = await asyncio.shield(call.task)
+            return result
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # 先移除再取消, 之后的调用会重新执行而不是加入正在取消的任务
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _on_done(self, key: Hashable, call: _Call, _: asyncio.Future[Any]) -> None:
+        self._forget(key, call)
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+
+__all__ = ["SingleFlight"]
@@ -2,6 +2,7 @@ import asyncio
 import json
 import re
 from collections.abc import Coroutine
+from functools import cache
 from typing import Any
 
 from urlextract import URLExtract
@@ -17,16 +18,81 @@ def run_sync[T](coro: Coroutine[Any, Any, T]) -> T:
     raise RuntimeError("sync API cannot be called from a running event loop; use async API instead")
 
 
-_url_extractor = URLExtract()
+_SCHEME = re.compile(r"https?://", re.IGNORECASE)
+_URL_CANDIDATE = re.compile(
+    # 可选协议 + 域名 (顶级域名以字母开头) + 可选端口 + 路径 (可打印 ASCII, 不含空格 " < >)
+    r"(?:https?://)?(?:[a-z0-9-]+\.)+[a-z][a-z0-9-]*(?::\d+)?(?:[/?#][!#-;=?-~]*)?",
+    re.IGNORECASE,
+)
+
+
+# 链接末尾的这些 ASCII 标点通常属于正文 (句号、逗号、感叹号、引号等), 不属于链接
+_TRAILING_PUNCTUATION = ".,;:!?'\""
+_CLOSING_BRACKETS = {")": "(", "]": "[", "}": "{"}
+
+
+def _strip_trailing_punctuation(url: str) -> str:
+    """去掉链接末尾的标点和未配对的右括号, 保留 /a_(b) 这样成对出现在路径中的括号"""
+    while url:
+        ch = url[-1]
+        if ch in _TRAILING_PUNCTUATION or (
+            ch in _CLOSING_BRACKETS and url.count(ch) > url.count(_CLOSING_BRACKETS[ch])
+        ):
+            url = url[:-1]
+        else:
+            break
+    return url
+
+
+@cache
+def _url_extractor() -> URLExtract:
+    # 初始化时需要加载顶级域名列表, 在第一次回退时再创建
+    return URLExtract()
+
+
+@cache
+def _known_hosts() -> frozenset[str]:
+    from ..parsers.manifest import MANIFEST
+
+    return frozenset(host.lower() for spec in MANIFEST for host in spec["hosts"])
+
+
+def _is_known_host(host: str) -> bool:
+    labels = host.lower().rstrip(".").split(".")
+    known = _known_hosts()
+    return any(".".join(labels[i:]) in known for i in range(len(labels) - 1))
+
+
+def _match_known_url(text: str) -> str | None:
+    """快速提取已支持平台的链接
+
+    只检查文本中第一个形似链接的片段, 属于已知平台域名时直接返回, 否则返回 None 交给 URLExtract 处理.
+    链接在非 ASCII 字符 (中文标点、emoji) 处结束. 与 URLExtract 一样跳过邮箱形式的片段 (如抖音口令中的 k@p.Dh)
+    """
+    for m in _URL_CANDIDATE.finditer(text):
+        if m.start() == 0 or text[m.start() - 1] != "@":
+            break
+    else:
+        return None
+    url = m.group()
+    if next_url := _SCHEME.search(url, 1):
+        # 相邻的链接, 例如 https://a.com/1https://b.com/2
+        url = url[: next_url.start()]
+    host = re.split(r"[:/?#]", _SCHEME.sub("", url, count=1), maxsplit=1)[0]
+    if not _is_known_host(host):
+        return None
+    return url
 
 
 def match_url(text: str) -> str:
-    """从文本中提取url"""
+    """从文本中提取url, 两种提取方式的结果都去掉末尾的标点, 同一文案总是得到相同的链接"""
     if not text:
         return ""
+    if url := _match_known_url(text):
+        return _strip_trailing_punctuation(url)
     text = re.sub(r"(https?://)", r" \1", text)  # 协议前面增加空格, 方便提取
-    url = _url_extractor.find_urls(text, only_unique=True)
-    return url[0] if url else ""
+    urls = _url_extractor().find_urls(text, only_unique=True)
+    return _strip_trailing_punctuation(urls[0]) if urls else ""
 
 
 def cookie_ellipsis(cookie: dict[str, Any] | None) -> str:
@@ -0,0 +1,106 @@
+"""下载 CPU 开销基准测试
+
+在子进程中启动本地 HTTP 服务器, 下载 SIZE_MB 大小的文件, 再同时下载 PARALLEL 个文件 (共 SIZE_MB),
+输出每 GB 消耗的进程 CPU 时间、事件循环线程 CPU 时间以及进度回调次数.
+``before`` 为原来的实现 (``aiter_bytes(8192)``, 每块通过 aiofiles 写入并回调一次), ``after`` 为 ``download()``
+(自适应分块, 缓冲写入, 按默认阈值节流回调)::
+
+    python test/bench_download.py
+"""
+
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import aiofiles
+import httpx
+
+from parsehub.utils.downloader import download
+from parsehub.utils.http_client import HttpClientPool, use_http_pool
+
+SIZE_MB = 512
+PARALLEL = 50
+BLOCK = b"\0" * (1024 * 1024)
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        # /<大小 MB>/<文件名>
+        size_mb = int(self.path.split("/")[1])
+        self.send_response(200)
+        self.send_header("Content-Length", str(size_mb * len(BLOCK)))
+        self.end_headers()
+        for _ in range(size_mb):
+            self.wfile.write(BLOCK)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port) -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    port.value = server.server_address[1]
+    server.serve_forever()
+
+
+async def legacy_download(
+    url: str, path: str, *, client: httpx.AsyncClient, progress: Callable[[int, int], Awaitable[None]]
+) -> str:
+    async with client.stream("GET", url) as r:
+        total, current = int(r.headers["Content-Length"]), 0
+        async with aiofiles.open(path, "wb") as f:
+            async for chunk in r.aiter_bytes(chunk_size=8192):
+                await f.write(chunk)
+                current += len(chunk)
+                await progress(current, total)
+    return path
+
+
+async def run(fn: Callable[..., Awaitable[str]], urls: list[str]) -> tuple[float, float, float, int]:
+    calls = 0
+
+    async def progress(current: int, total: int) -> None:
+        nonlocal calls
+        calls += 1
+
+    # 两种实现都复用同一个客户端, 避免创建客户端的开销影响结果
+    limits = httpx.Limits(max_connections=len(urls))
+    async with httpx.AsyncClient(limits=limits) as client, HttpClientPool(limits=limits) as pool:
+        if fn is legacy_download:
+            fn = partial(legacy_download, client=client)
+        with tempfile.TemporaryDirectory() as tmp, use_http_pool(pool):
+            wall, cpu, loop_cpu = time.perf_counter(), time.process_time(), time.thread_time()
+            await asyncio.gather(
+                *(fn(url, os.path.join(tmp, f"{i}.bin"), progress=progress) for i, url in enumerate(urls))
+            )
+    return time.perf_counter() - wall, time.process_time() - cpu, time.thread_time() - loop_cpu, calls
+
+
+def main() -> None:
+    port = multiprocessing.Value("i", 0)
+    server = multiprocessing.Process(target=serve, args=(port,), daemon=True)
+    server.start()
+    while not port.value:
+        time.sleep(0.01)
+    base = f"http://127.0.0.1:{port.value}"
+    cases = {
+        "single": [f"{base}/{SIZE_MB}/file.bin"],
+        f"{PARALLEL} files": [f"{base}/{SIZE_MB // PARALLEL}/{i}.bin" for i in range(PARALLEL)],
+    }
+
+    gb = SIZE_MB / 1024
+    print(f"{'case':<10} {'mode':<8} {'wall (s)':>10} {'cpu s/GB':>10} {'loop s/GB':>10} {'callbacks':>10}")
+    for case, urls in cases.items():
+        for name, fn in (("before", legacy_download), ("after", download)):
+            wall, cpu, loop_cpu, calls = asyncio.run(run(fn, urls))
+            print(f"{case:<10} {name:<8} {wall:>10.2f} {cpu / gb:>10.2f} {loop_cpu / gb:>10.2f} {calls:>10}")
+    server.terminate()
+
+
+if __name__ == "__main__":
+    main()
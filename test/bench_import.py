@@ -0,0 +1,46 @@
+"""冷启动基准测试
+
+多次以 ``python -X importtime -c "import parsehub"`` 启动新的解释器, 输出 ``import parsehub`` 的中位耗时
+以及累计耗时最高的模块::
+
+    python test/bench_import.py
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+
+RUNS = 7
+TOP = 15
+
+
+def import_times() -> dict[str, int]:
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    env = {**os.environ, "PYTHONPATH": src}
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import parsehub"], capture_output=True, text=True, env=env
+    ).stderr
+    times: dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line.removeprefix("import time:").split("|"))
+        if cumulative.isdigit():
+            times[name] = int(cumulative)
+    return times
+
+
+def main() -> None:
+    runs = [import_times() for _ in range(RUNS)]
+    total = statistics.median(r["parsehub"] for r in runs)
+    print(f"import parsehub: {total / 1000:.1f} ms (median of {RUNS})")
+
+    last = runs[-1]
+    print(f"{'module':<40} {'cumulative (ms)':>16}")
+    for name, us in sorted(last.items(), key=lambda item: item[1], reverse=True)[:TOP]:
+        print(f"{name:<40} {us / 1000:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
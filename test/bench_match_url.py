@@ -0,0 +1,56 @@
+"""链接提取基准测试
+
+对比 ``match_url`` (已知平台域名快速路径 + URLExtract 回退) 与只使用 URLExtract 的单次耗时::
+
+    python test/bench_match_url.py
+"""
+
+import re
+import timeit
+
+from parsehub.utils.utils import _match_known_url, _url_extractor, match_url
+
+SHARE_TEXTS = [
+    "7.64 复制打开抖音，看看【某某的作品】今天也是元气满满的一天 https://v.douyin.com/iABC123/ k@p.Dh 04/12 mdd:/",
+    "3.51 05/20 Q@x.Sv 复制打开抖音，看看【xxx的图文作品】＃旅行 ＃日落🌅 https://v.douyin.com/i5Xabcd/ yfu:/",
+    "64 某某发布了一篇小红书笔记，快来看吧！😆 abcdef 😆 http://xhslink.com/a/example，复制本条信息，打开【小红书】App查看精彩内容！",
+    "【小红书】今天的穿搭分享✨ 👉 http://xhslink.com/o/2AbCdEf 复制后打开【小红书】查看笔记。",
+    "【这个视频太好笑了-哔哩哔哩】 https://b23.tv/abc123",
+    "【【4K】夕阳下的城市-哔哩哔哩】https://b23.tv/xYz789?share_medium=android&share_source=copy_link",
+    "BV1R6NFzXE1H",
+    "https://x.com/ann_photo05/status/2030931621810254258",
+    "https://tieba.baidu.com/p/9939510114?share=9105&fr=sharewise",
+    "https://www.youtube.com/watch?v=1h_uc3K4Cpg",
+    "https://weibo.com/1234567890/OabCdEfGh 转发微博",
+    "https://mp.weixin.qq.com/s/AbCdEfGhIjKlMnOpQrStUv",
+    "https://www.kuaishou.com/f/X-abcDEF123，复制此链接，打开【快手】直接观看！",
+    "看看这个 https://example.invalid/not-supported 怎么样",
+]
+
+
+def urlextract_only(text: str) -> str:
+    urls = _url_extractor().find_urls(re.sub(r"(https?://)", r" \1", text), only_unique=True)
+    return urls[0] if urls else ""
+
+
+def bench(texts: list[str], number: int = 200) -> tuple[float, float]:
+    fast = timeit.timeit(lambda: [match_url(t) for t in texts], number=number)
+    slow = timeit.timeit(lambda: [urlextract_only(t) for t in texts], number=number)
+    per_call = number * len(texts)
+    return fast / per_call * 1e6, slow / per_call * 1e6
+
+
+def main() -> None:
+    match_url(SHARE_TEXTS[0])
+    known = [t for t in SHARE_TEXTS if _match_known_url(t)]
+    print(f"{'corpus':<12} {'texts':>6} {'match_url (µs)':>16} {'URLExtract (µs)':>16}")
+    for name, texts in (("known hosts", known), ("all", SHARE_TEXTS)):
+        fast, slow = bench(texts)
+        print(f"{name:<12} {len(texts):>6} {fast:>16.1f} {slow:>16.1f}")
+    print()
+    for text in SHARE_TEXTS:
+        print(f"{match_url(text)!r:<80} <- {text[:40]!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""媒体信息读取基准测试
+
+对比 Pillow / OpenCV (原来的实现) 与只解析文件头的 ``probe_header``, 输出每种格式的平均耗时以及结果不一致的文件数.
+默认生成一组样例文件, 也可以指定样例目录 (递归读取其中的所有文件)::
+
+    python test/bench_media_probe.py [样例目录]
+"""
+
+import math
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from pathlib import Path
+
+from parsehub.utils.media_info import MediaInfo
+from parsehub.utils.media_probe import probe_header
+
+ROUNDS = 5
+VIDEO_SECONDS = 20
+GIF_FRAMES = 300
+
+
+def legacy_read(path: Path) -> MediaInfo:
+    import cv2
+    from PIL import Image
+
+    try:
+        with Image.open(path) as img:
+            if img.format == "GIF":
+                total_ms = 0
+                for i in range(getattr(img, "n_frames", 1)):
+                    img.seek(i)
+                    total_ms += img.info.get("duration", 100)
+                return MediaInfo(width=img.width, height=img.height, duration=math.ceil(total_ms / 1000))
+            return MediaInfo(width=img.width, height=img.height)
+    except Exception:
+        pass
+    cap = cv2.VideoCapture(str(path))
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        return MediaInfo(
+            width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            duration=math.ceil(frame_count / fps) if fps > 0 else 0,
+        )
+    finally:
+        cap.release()
+
+
+def make_corpus(root: Path) -> list[Path]:
+    import cv2
+    import numpy as np
+    from PIL import Image, features
+
+    image = Image.effect_noise((1920, 1080), 64).convert("RGB")
+    paths = []
+    for name, options in (
+        ("photo.jpg", {"quality": 90}),
+        ("photo.png", {}),
+        ("photo.webp", {}),
+        ("photo-lossless.webp", {"lossless": True}),
+        *((("photo.avif", {}),) if features.check("avif") else ()),
+    ):
+        image.save(root / name, **options)
+        paths.append(root / name)
+
+    frames = [Image.effect_noise((480, 270), 64 + i % 32).convert("P") for i in range(GIF_FRAMES)]
+    frames[0].save(root / "anim.gif", save_all=True, append_images=frames[1:], duration=40)
+    paths.append(root / "anim.gif")
+
+    frame = np.random.default_rng(0).integers(0, 255, (720, 1280, 3), np.uint8)
+    for name, fourcc in (("clip.mp4", "mp4v"), ("clip.mkv", "XVID"), ("clip.avi", "MJPG")):
+        writer = cv2.VideoWriter(str(root / name), cv2.VideoWriter_fourcc(*fourcc), 30, (1280, 720))
+        for _ in range(30 * VIDEO_SECONDS):
+            writer.write(frame)
+        writer.release()
+        paths.append(root / name)
+    return paths
+
+
+def timed(fn: Callable[[Path], MediaInfo | None], path: Path) -> tuple[float, MediaInfo | None]:
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        result = fn(path)
+    return (time.perf_counter() - started) / ROUNDS, result
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        if len(sys.argv) > 1:
+            paths = sorted(p for p in Path(sys.argv[1]).rglob("*") if p.is_file())
+        else:
+            paths = make_corpus(Path(tmp))
+
+        # 先各读一次, 排除导入 Pillow / OpenCV 的耗时
+        legacy_read(paths[0])
+        stats: dict[str, list[float]] = defaultdict(lambda: [0, 0.0, 0.0, 0, 0])
+        for path in paths:
+            legacy_time, expected = timed(legacy_read, path)
+            probe_time, probed = timed(probe_header, path)
+            row = stats[path.suffix.lower()]
+            row[0] += 1
+            row[1] += legacy_time
+            row[2] += probe_time
+            row[3] += probed is None
+            row[4] += probed is not None and probed != expected
+
+    print(f"{'format':<8} {'files':>6} {'before (ms)':>12} {'after (ms)':>12} {'fallback':>9} {'mismatch':>9}")
+    for suffix, (count, legacy_time, probe_time, fallback, mismatch) in sorted(stats.items()):
+        print(
+            f"{suffix:<8} {count:>6} {legacy_time / count * 1000:>12.3f} {probe_time / count * 1000:>12.3f}"
+            f" {fallback:>9} {mismatch:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
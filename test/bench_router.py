@@ -0,0 +1,64 @@
+"""解析器路由基准测试
+
+对比逐个解析器调用 ``match`` 与 ``ParserRouter.route`` 的单次耗时, 并在注册表中追加合成解析器,
+观察解析器数量增加时的耗时变化::
+
+    python test/bench_router.py
+"""
+
+import timeit
+
+from parsehub import ParseHub
+from parsehub.parsers.base import BaseParser
+from parsehub.parsers.router import ParserRouter
+from parsehub.types import Platform
+
+SHARE_TEXTS = [
+    "7.64 复制打开抖音，看看【某某的作品】今天也是元气满满的一天 https://v.douyin.com/iABC123/ k@p.Dh 04/12 mdd:/",
+    "【这个视频太好笑了-哔哩哔哩】 https://b23.tv/abc123",
+    "64 某某发布了一篇小红书笔记，快来看吧！😆 abcdef 😆 http://xhslink.com/a/example，复制本条信息，打开【小红书】App查看精彩内容！",
+    "https://x.com/ann_photo05/status/2030931621810254258",
+    "https://tieba.baidu.com/p/9939510114",
+    "https://www.youtube.com/watch?v=1h_uc3K4Cpg",
+    "https://example.invalid/not-supported",
+]
+
+
+def synthetic_parsers(count: int) -> list[type[BaseParser]]:
+    parsers: list[type[BaseParser]] = []
+    for i in range(count):
+        host = f"bench{i}.example"
+        attrs = {
+            "__platform__": Platform.TIEBA,
+            "__match__": rf"^(https?://)?(www\.)?{host}/.+",
+            "__hosts__": [host],
+            "_do_parse": None,
+        }
+        parsers.append(type(f"BenchParser{i}", (BaseParser,), attrs, register=False))
+    return parsers
+
+
+def linear_select(parsers: list[type[BaseParser]], text: str) -> type[BaseParser] | None:
+    for parser in parsers:
+        if parser.match(text):
+            return parser
+    return None
+
+
+def main() -> None:
+    registry = ParseHub().parsers
+    print(f"{'parsers':>8} {'linear (µs)':>12} {'router (µs)':>12}")
+    for extra in (0, 32, 128, 512):
+        parsers = [*registry, *synthetic_parsers(extra)]
+        router = ParserRouter(parsers)
+        number = 20
+
+        linear = timeit.timeit(lambda: [linear_select(parsers, t) for t in SHARE_TEXTS], number=number)  # noqa: B023
+        routed = timeit.timeit(lambda: [router.route(t) for t in SHARE_TEXTS], number=number)  # noqa: B023
+
+        per_call = number * len(SHARE_TEXTS)
+        print(f"{len(parsers):>8} {linear / per_call * 1e6:>12.1f} {routed / per_call * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,62 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+import re
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import unittest
+from contextlib import aclosing
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from operator import itemgetter
+from pathlib import Path
+from unittest.mock import Mock, patch
 from urllib.parse import parse_qs, urlparse
 
+import httpx
+
 from parsehub import ParseHub
-from parsehub.errors import ParseError, UnknownPlatform
+from parsehub.cache import MemoryCache, ParseCache, SQLiteCache
+from parsehub.config import GlobalConfig
+from parsehub.errors import DownloadError, ParseError, UnknownPlatform
+from parsehub.media_store import MediaStore, get_media_store, normalize_url
 from parsehub.parsers.base import BaseParser
+from parsehub.parsers.lazy import LazyParser, build_manifest
+from parsehub.parsers.manifest import MANIFEST
+from parsehub.parsers.parser.douyin import DouyinVideoParseResult
+from parsehub.parsers.router import ParserRouter
 from parsehub.provider_api.threads import ThreadsPost
-from parsehub.types import ImageParseResult, ImageRef, Platform, VideoParseResult, VideoRef
-from parsehub.utils.utils import match_url, normalize_cookie, run_sync
+from parsehub.types import (
+    AniFile,
+    DownloadResult,
+    ImageFile,
+    ImageParseResult,
+    ImageRef,
+    MultimediaParseResult,
+    Platform,
+    VideoParseResult,
+    VideoRef,
+)
+from parsehub.utils.digest import StreamingDigest
+from parsehub.utils.downloader import DownloadError as DownloaderError
+from parsehub.utils.downloader import DownloadSession, download, iter_bytes
+from parsehub.utils.file_writer import BufferedFileWriter
+from parsehub.utils.http_client import HttpClientPool, get_http_pool, http_client, use_http_pool
+from parsehub.utils.media_info import MediaInfo, MediaInfoReader
+from parsehub.utils.media_info_cache import MediaInfoCache, get_media_info_cache
+from parsehub.utils.media_probe import HeaderProbe, probe_header
+from parsehub.utils.progress import ProgressThrottle, adaptive_chunks
+from parsehub.utils.redirect import RedirectResolver
+from parsehub.utils.scheduler import DownloadScheduler, TokenBucket, download_job
+from parsehub.utils.singleflight import SingleFlight
+from parsehub.utils.utils import _url_extractor, match_url, normalize_cookie, run_sync
 
 
 class DummyParser(BaseParser):
@@ -43,7 +93,86 @@ class ParseErrorParser(BaseParser):
         raise ParseError("already normalized")
 
 
-for _parser in (DummyParser, BrokenParser, ParseErrorParser):
+class SlowParser(BaseParser):
+    __platform__ = Platform.WEIBO
+    __supported_type__ = ["测试"]
+    __match__ = r"^(https?://)?slow\.example\.com/items/\d+"
+    __hosts__ = ["slow.example.com"]
+
+    active = 0
+    peak = 0
+
+    async def _do_parse(self, raw_url: str) -> VideoParseResult:
+        cls = type(self)
+        cls.active += 1
+        cls.peak = max(cls.peak, cls.active)
+        try:
+            await asyncio.sleep(0.05 if raw_url.endswith("/0") else 0.01)
+        finally:
+            cls.active -= 1
+        return VideoParseResult(title=raw_url, video="https://cdn.example/video.mp4")
+
+
+class FastParser(BaseParser):
+    __platform__ = Platform.WEIXIN
+    __supported_type__ = ["测试"]
+    __match__ = r"^(https?://)?fast\.example\.com/items/\d+"
+    __hosts__ = ["fast.example.com"]
+
+    async def _do_parse(self, raw_url: str) -> VideoParseResult:
+        return VideoParseResult(title=raw_url, video="https://cdn.example/video.mp4")
+
+
+class CountingParser(BaseParser):
+    __platform__ = Platform.TIEBA
+    __supported_type__ = ["测试"]
+    __match__ = r"^(https?://)?counting\.example\.com/items/\d+"
+    __hosts__ = ["counting.example.com"]
+    __after_clean_parameters__ = ["token"]
+
+    calls = 0
+
+    async def _do_parse(self, raw_url: str) -> VideoParseResult:
+        type(self).calls += 1
+        return VideoParseResult(title=raw_url, video=VideoRef(url="https://cdn.example/video.mp4", width=720))
+
+
+class SharedVideoParseResult(VideoParseResult):
+    downloads = 0
+
+    async def _do_download(self, *, output_dir, callback=None, callback_args=(), callback_kwargs=None, **kwargs):
+        type(self).downloads += 1
+        await asyncio.sleep(0.02)
+        await callback(1, 1, "bytes")
+        return DownloadResult([], output_dir)
+
+
+class ViralParser(BaseParser):
+    __platform__ = Platform.KUAISHOU
+    __supported_type__ = ["测试"]
+    __match__ = r"^(https?://)?viral\.example\.com/items/\d+"
+    __hosts__ = ["viral.example.com"]
+
+    calls = 0
+    fail = False
+
+    async def _do_parse(self, raw_url: str) -> VideoParseResult:
+        type(self).calls += 1
+        await asyncio.sleep(0.02)
+        if type(self).fail:
+            raise ValueError("rate limited")
+        return SharedVideoParseResult(title="viral", video="https://cdn.example/video.mp4")
+
+
+for _parser in (
+    DummyParser,
+    BrokenParser,
+    ParseErrorParser,
+    SlowParser,
+    FastParser,
+    CountingParser,
+    ViralParser,
+):
     if _parser in BaseParser._registry:
         BaseParser._registry.remove(_parser)
 
@@ -63,6 +192,51 @@ class TestCoreUtilities(unittest.TestCase):
 
         self.assertEqual(match_url(text), "https://example.com/first")
 
+    def test_match_url_fast_path_agrees_with_urlextract_for_known_hosts(self):
+        texts = [
+            "7.64 复制打开抖音，看看【某某的作品】 https://v.douyin.com/iABC123/ k@p.Dh 04/12 mdd:/",
+            "3.51 05/20 Q@x.Sv 复制打开抖音，看看【图文作品】 https://v.douyin.com/i5Xabcd/ yfu:/",
+            "【这个视频太好笑了-哔哩哔哩】 https://b23.tv/abc123 ",
+            "x.com/ann_photo05/status/2030931621810254258 转发",
+            "https://www.youtube.com/watch?v=1h_uc3K4Cpg&t=1s;",
+            "<https://www.xiaohongshu.com/explore/abc?xsec_token=AB%3D>",
+            "看看 https://x.com/a/status/1https://x.com/b/status/2",
+            "https://M.WEIBO.CN/status/123#comment",
+        ]
+        for text in texts:
+            with self.subTest(text=text):
+                expected = _url_extractor().find_urls(text.replace("https://", " https://"), only_unique=True)[0]
+                self.assertEqual(match_url(text), expected)
+
+    def test_match_url_stops_known_host_links_at_chinese_punctuation_and_emoji(self):
+        self.assertEqual(
+            match_url("😆 abcdef 😆 http://xhslink.com/a/example，复制本条信息，打开【小红书】App查看精彩内容！"),
+            "http://xhslink.com/a/example",
+        )
+        self.assertEqual(match_url("【标题】https://b23.tv/abc123?share=1。"), "https://b23.tv/abc123?share=1")
+        self.assertEqual(match_url("https://b23.tv/abc😆"), "https://b23.tv/abc")
+
+    def test_match_url_strips_trailing_punctuation_on_both_paths(self):
+        for host in ("b23.tv", "unknown-example.com"):
+            url = f"https://{host}/abc?share=1"
+            for text in (
+                f"看这个 {url}.",
+                f"看这个 {url}, 还有",
+                f"看这个 {url}! 好笑",
+                f"(看这个 {url})",
+                f"[{url}].",
+                f"看这个 {url}?!",
+                f'"{url}"',
+            ):
+                with self.subTest(text=text):
+                    self.assertEqual(match_url(text), url)
+        self.assertEqual(match_url("(https://b23.tv/a_(b))."), "https://b23.tv/a_(b)")
+
+    def test_match_url_falls_back_to_urlextract_for_unknown_or_earlier_links(self):
+        self.assertEqual(match_url("https://evilx.com/a/status/1"), "https://evilx.com/a/status/1")
+        self.assertEqual(match_url("先看 example.com 再看 https://b23.tv/x"), "example.com")
+        self.assertEqual(match_url("Mr.Bean https://b23.tv/x"), "https://b23.tv/x")
+
     def test_normalize_cookie_preserves_none_and_dict_values(self):
         cookie = {"session": "abc", "flag": ""}
 
@@ -141,6 +315,375 @@ class TestParserRegistry(unittest.TestCase):
         self.assertIsNone(parsehub.get_platform("https://example.invalid/not-supported"))
 
 
+class TestParserRouter(unittest.TestCase):
+    def test_route_extracts_url_once_and_returns_matched_url(self):
+        router = ParserRouter(BaseParser.get_registry())
+
+        with patch("parsehub.parsers.router.match_url", wraps=match_url) as extract:
+            routed = router.route("复制打开抖音 https://v.douyin.com/iABC123/ 看看")
+
+        self.assertEqual(extract.call_count, 1)
+        self.assertIsNotNone(routed)
+        parser, url = routed
+        self.assertEqual(parser.__platform__, Platform.DOUYIN)
+        self.assertEqual(url, "https://v.douyin.com/iABC123/")
+
+    def test_route_dispatches_by_host_suffix(self):
+        router = ParserRouter(BaseParser.get_registry())
+
+        def platforms(url):
+            return [p.__platform__ for p in router.candidates(url)]
+
+        self.assertEqual(platforms("https://mobile.twitter.com/a"), [Platform.TWITTER])
+        self.assertEqual(platforms("b23.tv/abc"), [Platform.BILIBILI])
+        self.assertEqual(router.candidates("https://example.invalid/"), [])
+        self.assertIsNone(router.route("https://example.invalid/not-supported"))
+
+    def test_route_handles_bilibili_bvid_without_url(self):
+        router = ParserRouter(BaseParser.get_registry())
+
+        parser, url = router.route("BV1R6NFzXE1H")
+
+        self.assertEqual(parser.__platform__, Platform.BILIBILI)
+        self.assertEqual(url, "BV1R6NFzXE1H")
+
+    def test_parsers_without_hosts_are_candidates_for_every_host(self):
+        router = ParserRouter([*BaseParser.get_registry(), DummyParser])
+
+        self.assertIn(DummyParser, router.candidates("https://www.douyin.com/video/1"))
+        self.assertEqual(router.route("https://dummy.com/items/42"), (DummyParser, "https://dummy.com/items/42"))
+
+    def test_parsehub_rebuilds_router_when_parsers_change(self):
+        parsehub = ParseHub()
+        parsehub.get_platform("https://tieba.baidu.com/p/1")
+
+        parsehub.parsers = [DummyParser]
+
+        self.assertEqual(parsehub.get_parser("https://dummy.com/items/42"), DummyParser)
+        self.assertIsNone(parsehub.get_platform("https://tieba.baidu.com/p/1"))
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    """在新的解释器中运行, 用于测量冷启动"""
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [src, os.environ.get("PYTHONPATH")]))}
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env, check=True)
+
+
+class TestLazyParserRegistry(unittest.TestCase):
+    IMPORT_BUDGET = float(os.environ.get("PARSEHUB_IMPORT_BUDGET", "2.0"))
+    HEAVY_MODULES = ["yt_dlp", "instaloader", "gmssl", "stealth_requests"]
+
+    def run_python(self, code: str) -> dict:
+        return json.loads(run_python("-c", code).stdout.strip().splitlines()[-1])
+
+    def test_manifest_matches_registered_parsers(self):
+        registry = [p for p in BaseParser.get_registry() if p.__module__.startswith("parsehub.parsers.parser.")]
+
+        key = itemgetter("module", "name")
+        self.assertEqual(sorted(build_manifest(registry), key=key), sorted(MANIFEST, key=key))
+
+    def test_parsehub_starts_without_importing_parsers_within_budget(self):
+        data = self.run_python(
+            "import json, sys, time\n"
+            "start = time.perf_counter()\n"
+            "import parsehub\n"
+            "parsehub.ParseHub()\n"
+            "elapsed = time.perf_counter() - start\n"
+            "print(json.dumps({'elapsed': elapsed, 'modules': sorted(sys.modules)}))"
+        )
+
+        self.assertEqual([m for m in data["modules"] if m.startswith("parsehub.parsers.parser.")], [])
+        self.assertEqual([m for m in self.HEAVY_MODULES if m in data["modules"]], [])
+        self.assertLess(data["elapsed"], self.IMPORT_BUDGET)
+
+    def test_routing_imports_only_the_matched_parser(self):
+        data = self.run_python(
+            "import json, sys\n"
+            "import parsehub\n"
+            "parser = parsehub.ParseHub().get_parser('https://tieba.baidu.com/p/9939510114')\n"
+            "loaded = [m for m in sys.modules if m.startswith('parsehub.parsers.parser.')]\n"
+            "print(json.dumps({'parser': parser.__name__, 'loaded': loaded}))"
+        )
+
+        self.assertEqual(data, {"parser": "TieBaParser", "loaded": ["parsehub.parsers.parser.tieba"]})
+
+    def test_lazy_parsers_route_like_parser_classes(self):
+        parsehub = ParseHub()
+        entries = [
+            (p.module, p.name) if isinstance(p, LazyParser) else (p.__module__, p.__name__) for p in parsehub.parsers
+        ]
+
+        self.assertEqual(entries, [(spec["module"], spec["name"]) for spec in MANIFEST])
+        self.assertEqual(parsehub.get_platform("BV1R6NFzXE1H"), Platform.BILIBILI)
+        self.assertEqual([p["id"] for p in parsehub.get_platforms()], [spec["platform"] for spec in MANIFEST])
+
+
+class TestColdStartImportTime(unittest.TestCase):
+    """基于 ``python -X importtime`` 的冷启动基准"""
+
+    IMPORT_BUDGET_US = int(float(os.environ.get("PARSEHUB_IMPORT_BUDGET", "2.0")) * 1_000_000)
+    MEDIA_PROBE_MODULES = ["cv2", "PIL", "numpy"]
+
+    @classmethod
+    def setUpClass(cls):
+        # import time: self [us] | cumulative | imported package
+        cls.cumulative: dict[str, int] = {}
+        for line in run_python("-X", "importtime", "-c", "import parsehub").stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            _, cumulative, name = (part.strip() for part in line.removeprefix("import time:").split("|"))
+            if cumulative.isdigit():
+                cls.cumulative[name] = int(cumulative)
+
+    def slowest(self, count: int = 10) -> str:
+        top = sorted(self.cumulative.items(), key=lambda item: item[1], reverse=True)[:count]
+        return ", ".join(f"{name}={us / 1000:.0f}ms" for name, us in top)
+
+    def test_import_parsehub_does_not_load_media_probing_stack(self):
+        self.assertEqual([m for m in self.MEDIA_PROBE_MODULES if m in self.cumulative], [])
+
+    def test_import_parsehub_cold_start_within_budget(self):
+        self.assertLess(self.cumulative["parsehub"], self.IMPORT_BUDGET_US, self.slowest())
+
+    def test_media_probe_still_reads_image_headers(self):
+        from PIL import Image
+
+        from parsehub.utils.media_info import MediaInfoReader
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = f"{tmp}/image.png"
+            Image.new("RGB", (32, 18)).save(path)
+
+            info = MediaInfoReader.read(path)
+
+        self.assertEqual((info.width, info.height), (32, 18))
+
+
+def mp4_box(kind: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+
+def mp4_file(width: int, height: int, duration_ms: int, *, mdat_size: int = 0, moov_last: bool = False) -> bytes:
+    mvhd = bytes(12) + struct.pack(">II", 1000, duration_ms) + bytes(80)
+    tkhd = bytes(40) + struct.pack(">9i", 0x10000, 0, 0, 0, 0x10000, 0, 0, 0, 0x40000000)
+    tkhd += struct.pack(">II", width << 16, height << 16)
+    moov = mp4_box(b"moov", mp4_box(b"mvhd", mvhd) + mp4_box(b"trak", mp4_box(b"tkhd", tkhd)))
+    mdat = mp4_box(b"mdat", bytes(mdat_size))
+    return mp4_box(b"ftyp", b"isom" + bytes(4)) + (mdat + moov if moov_last else moov + mdat)
+
+
+class TestMediaProbe(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+
+    def test_image_headers_match_pillow(self):
+        from PIL import Image, features
+
+        cases = {"image.jpg": {}, "image.png": {}, "lossy.webp": {}, "lossless.webp": {"lossless": True}}
+        if features.check("avif"):
+            cases["image.avif"] = {}
+        for name, options in cases.items():
+            with self.subTest(name):
+                path = os.path.join(self.tmp, name)
+                Image.new("RGB", (33, 17)).save(path, **options)
+
+                self.assertEqual(probe_header(path), MediaInfo(width=33, height=17))
+
+        path = os.path.join(self.tmp, "animated.webp")
+        frames = [Image.new("RGBA", (33, 17), color) for color in ("red", "blue")]
+        frames[0].save(path, save_all=True, append_images=frames[1:], duration=100)
+        self.assertEqual(probe_header(path), MediaInfo(width=33, height=17))
+
+    def test_video_headers_match_opencv(self):
+        import cv2
+        import numpy as np
+
+        for name, fourcc in (("video.mp4", "mp4v"), ("video.mkv", "XVID")):
+            with self.subTest(name):
+                path = os.path.join(self.tmp, name)
+                writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), 25, (64, 48))
+                for _ in range(60):
+                    writer.write(np.zeros((48, 64, 3), np.uint8))
+                writer.release()
+
+                self.assertEqual(probe_header(path), MediaInfo(width=64, height=48, duration=3))
+
+    def test_mp4_moov_after_mdat_and_rotation(self):
+        mvhd = bytes(12) + struct.pack(">II", 1000, 2500) + bytes(80)
+        rotate_90 = struct.pack(">9i", 0, 0x10000, 0, -0x10000, 0, 0, 0, 0, 0x40000000)
+        tkhd = bytes(40) + rotate_90 + struct.pack(">II", 1920 << 16, 1080 << 16)
+        moov = mp4_box(b"moov", mp4_box(b"mvhd", mvhd) + mp4_box(b"trak", mp4_box(b"tkhd", tkhd)))
+        path = Path(self.tmp, "video.mp4")
+        path.write_bytes(mp4_box(b"ftyp", b"isom" + bytes(4)) + mp4_box(b"mdat", bytes(1024 * 1024)) + moov)
+
+        with patch.dict(sys.modules, {"cv2": None}):
+            info = MediaInfoReader.read(path)
+
+        self.assertEqual(info, MediaInfo(width=1080, height=1920, duration=3))
+
+    def test_gif_duration_matches_pillow_frame_walk(self):
+        from PIL import Image
+
+        path = Path(self.tmp, "animated.gif")
+        frames = [Image.new("RGB", (20, 10), (i * 40, 255 - i * 40, 0)) for i in range(6)]
+        frames[0].save(path, save_all=True, append_images=frames[1:], duration=[40, 250, 60, 40, 500, 20])
+        # 去掉第 1、4 帧 (40 毫秒) 的图形控制扩展, 这两帧按 100 毫秒计算
+        data = re.sub(rb"\x21\xf9\x04.\x04\x00.\x00", b"", path.read_bytes(), flags=re.DOTALL)
+        path.write_bytes(data)
+
+        with Image.open(path) as img:
+            expected_ms = 0
+            for i in range(img.n_frames):
+                img.seek(i)
+                expected_ms += img.info.get("duration", 100)
+
+        with patch.dict(sys.modules, {"PIL": None}):
+            info = MediaInfoReader.read_gif(path)
+
+        self.assertEqual(expected_ms, 1030)
+        self.assertEqual(info, MediaInfo(width=20, height=10, duration=2))
+
+    def test_gif_extension_with_mp4_content_is_read_as_video(self):
+        mvhd = bytes(12) + struct.pack(">II", 1000, 1500) + bytes(80)
+        tkhd = bytes(40) + struct.pack(">9i", 0x10000, 0, 0, 0, 0x10000, 0, 0, 0, 0x40000000)
+        tkhd += struct.pack(">II", 320 << 16, 240 << 16)
+        moov = mp4_box(b"moov", mp4_box(b"mvhd", mvhd) + mp4_box(b"trak", mp4_box(b"tkhd", tkhd)))
+        path = Path(self.tmp, "0.gif")
+        path.write_bytes(mp4_box(b"ftyp", b"mp42" + bytes(4)) + moov)
+
+        self.assertEqual(AniFile(path=path), AniFile(path=path, width=320, height=240, duration=2))
+
+    def test_unknown_or_truncated_files_return_none(self):
+        from PIL import Image
+
+        path = os.path.join(self.tmp, "image.jpg")
+        Image.new("RGB", (33, 17)).save(path)
+        data = Path(path).read_bytes()
+        Path(path).write_bytes(data[:20])
+        self.assertIsNone(probe_header(path))
+
+        Path(path).write_bytes(b"not media" * 10)
+        self.assertIsNone(probe_header(path))
+
+        Path(path).write_bytes(b"GIF89a" + bytes(3))
+        self.assertIsNone(probe_header(path))
+
+    def test_header_probe_matches_file_probe_for_any_chunking(self):
+        from PIL import Image
+
+        image = Image.effect_noise((120, 80), 64).convert("RGB")
+        files = {"video.mp4": mp4_file(640, 360, 4500, mdat_size=50_000)}
+        for name, fmt in (("image.jpg", "JPEG"), ("image.png", "PNG"), ("image.webp", "WEBP")):
+            buf = io.BytesIO()
+            image.save(buf, fmt)
+            files[name] = buf.getvalue()
+        for name, data in files.items():
+            path = Path(self.tmp, name)
+            path.write_bytes(data)
+            expected = probe_header(path)
+            self.assertIsNotNone(expected)
+            for chunk_size in (1, 7, 4096):
+                for total in (len(data), 0):
+                    with self.subTest(name, chunk_size=chunk_size, total=total):
+                        probe = HeaderProbe()
+                        probe.reset(total)
+                        for i in range(0, len(data), chunk_size):
+                            probe.feed(data[i : i + chunk_size])
+
+                        self.assertTrue(probe.done)
+                        self.assertEqual(probe.info, expected)
+                        self.assertEqual(probe.size, len(data))
+
+    def test_header_probe_gives_up_without_buffering_the_whole_file(self):
+        from PIL import Image
+
+        gif = io.BytesIO()
+        Image.new("RGB", (20, 10)).save(gif, "GIF")
+        trailing_moov = mp4_file(640, 360, 4500, mdat_size=1024 * 1024, moov_last=True)
+        for name, data in (("gif", gif.getvalue()), ("moov after mdat", trailing_moov)):
+            with self.subTest(name):
+                probe = HeaderProbe(max_size=64 * 1024)
+                probe.reset(len(data))
+                probe.feed(data[:4096])
+
+                self.assertTrue(probe.done)
+                self.assertIsNone(probe.info)
+
+
+class TestMediaInfoCache(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        for name in ("media_info_cache_size", "media_info_cache_path"):
+            self.addCleanup(setattr, GlobalConfig, name, getattr(GlobalConfig, name))
+
+    def write_png(self, name: str, size: tuple[int, int]) -> Path:
+        from PIL import Image
+
+        path = Path(self.tmp, name)
+        Image.new("RGB", size).save(path)
+        return path
+
+    def test_repeated_reads_probe_the_file_once(self):
+        GlobalConfig.media_info_cache_size = 16
+        path = self.write_png("image.png", (32, 18))
+        get_media_info_cache().clear()
+
+        with patch.object(MediaInfoReader, "read_image", wraps=MediaInfoReader.read_image) as read_image:
+            first = ImageFile(path=path)
+            second = ImageFile(path=path)
+            hardlink = Path(self.tmp, "link.png")
+            os.link(path, hardlink)
+            third = ImageFile(path=hardlink)
+
+            self.assertEqual(read_image.call_count, 1)
+            self.assertEqual([(f.width, f.height) for f in (first, second, third)], [(32, 18)] * 3)
+
+            # 替换文件后 inode、大小和修改时间变化, 重新读取
+            os.replace(self.write_png("new.png", (40, 30)), path)
+            self.assertEqual(MediaInfoReader.read(path), MediaInfo(width=40, height=30))
+            self.assertEqual(read_image.call_count, 2)
+
+    def test_memory_tier_is_bounded_and_disabled_by_default(self):
+        self.assertEqual(type(GlobalConfig)().media_info_cache_size, 0)
+        cache = MediaInfoCache(maxsize=2)
+        for i in range(3):
+            cache.read(self.write_png(f"{i}.png", (i + 1, 1)), MediaInfoReader.read)
+        self.assertEqual(len(cache), 2)
+
+        GlobalConfig.media_info_cache_size = 0
+        GlobalConfig.media_info_cache_path = None
+        self.assertIsNone(get_media_info_cache())
+
+    def test_disk_tier_survives_restart(self):
+        db = Path(self.tmp, "media_info.sqlite3")
+        path = self.write_png("image.png", (32, 18))
+        cache = MediaInfoCache(maxsize=0, path=db)
+        self.assertEqual(cache.read(path, MediaInfoReader.read), MediaInfo(width=32, height=18))
+        cache.close()
+
+        restarted = MediaInfoCache(path=db)
+        self.addCleanup(restarted.close)
+        info = restarted.read(path, Mock(side_effect=AssertionError("文件被再次读取")))
+        self.assertEqual(info, MediaInfo(width=32, height=18))
+
+    def test_disk_tier_keeps_newest_entries(self):
+        db = Path(self.tmp, "media_info.sqlite3")
+        cache = MediaInfoCache(path=db, disk_max_entries=2)
+        for i in range(3):
+            cache.set(f"key-{i}", MediaInfo(width=i))
+            time.sleep(0.01)
+        cache.close()
+
+        restarted = MediaInfoCache(maxsize=0, path=db, disk_max_entries=2)
+        self.addCleanup(restarted.close)
+        self.assertEqual([restarted.get(f"key-{i}") for i in range(3)], [None, MediaInfo(width=1), MediaInfo(width=2)])
+
+
 class TestThreadsProvider(unittest.TestCase):
     def test_reply_quote_with_image_uses_traditional_chinese_placeholder(self):
         quote_post = {
@@ -186,6 +729,346 @@ class TestParseHubExceptionBoundary(unittest.IsolatedAsyncioTestCase):
             await parsehub.parse("https://example.invalid/not-supported")
 
 
+class TestParseMany(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.parsehub = ParseHub()
+        self.parsehub.parsers = [SlowParser, FastParser, BrokenParser]
+        SlowParser.active = SlowParser.peak = 0
+
+    async def test_parse_many_yields_results_and_errors_as_they_complete(self):
+        urls = [
+            "https://slow.example.com/items/0",
+            "https://fast.example.com/items/1",
+            "https://broken.example.com/items/2",
+            "https://example.invalid/3",
+        ]
+
+        items = [item async for item in self.parsehub.parse_many(urls, concurrency=4)]
+
+        self.assertEqual(len(items), 4)
+        self.assertEqual(items[-1][0], "https://slow.example.com/items/0")
+        results = dict(items)
+        self.assertEqual(results["https://fast.example.com/items/1"].title, "https://fast.example.com/items/1")
+        self.assertIsInstance(results["https://broken.example.com/items/2"], ParseError)
+        self.assertIsInstance(results["https://example.invalid/3"], UnknownPlatform)
+
+    async def test_parse_many_ordered_mode_preserves_input_order(self):
+        urls = [f"https://slow.example.com/items/{i}" for i in range(3)] + ["https://fast.example.com/items/9"]
+
+        items = [item async for item in self.parsehub.parse_many(urls, ordered=True)]
+
+        self.assertEqual([url for url, _ in items], urls)
+
+    async def test_parse_many_limits_per_platform_without_starving_others(self):
+        urls = [f"https://slow.example.com/items/{i}" for i in range(1, 9)] + ["https://fast.example.com/items/1"]
+
+        items = [item async for item in self.parsehub.parse_many(urls, concurrency=3, per_platform_limit=2)]
+
+        self.assertEqual(SlowParser.peak, 2)
+        self.assertEqual(items[0][0], "https://fast.example.com/items/1")
+
+    async def test_parse_many_cancels_pending_work_when_consumer_stops(self):
+        urls = [f"https://slow.example.com/items/{i}" for i in range(1, 6)]
+
+        async with aclosing(self.parsehub.parse_many(urls, concurrency=1)) as results:
+            async for _ in results:
+                break
+
+        self.assertEqual(SlowParser.active, 0)
+
+    async def test_parse_many_pulls_input_lazily_with_fixed_workers(self):
+        pulled = 0
+
+        def urls():
+            nonlocal pulled
+            while True:
+                pulled += 1
+                yield f"https://fast.example.com/items/{pulled}"
+
+        baseline = len(asyncio.all_tasks())
+        for ordered in (False, True):
+            with self.subTest(ordered=ordered):
+                pulled = 0
+                async with aclosing(self.parsehub.parse_many(urls(), concurrency=2, ordered=ordered)) as results:
+                    async for _ in results:
+                        tasks = len(asyncio.all_tasks()) - baseline
+                        break
+
+                # 每个 worker 至多还有一个进行中的合并解析任务
+                self.assertLessEqual(tasks, 2 * 2)
+                self.assertLess(pulled, 20)
+
+    def test_parse_many_sync_returns_ordered_list(self):
+        urls = ["https://slow.example.com/items/0", "https://fast.example.com/items/1"]
+
+        items = self.parsehub.parse_many_sync(urls)
+
+        self.assertEqual([url for url, _ in items], urls)
+
+
+class TestParseCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        CountingParser.calls = 0
+
+    def hub(self, cache: ParseCache) -> ParseHub:
+        parsehub = ParseHub(cache=cache)
+        parsehub.parsers = [CountingParser]
+        return parsehub
+
+    async def test_cache_is_keyed_by_canonical_url_and_counts_hits(self):
+        cache = ParseCache()
+        parsehub = self.hub(cache)
+
+        first = await parsehub.parse("看看 https://counting.example.com/items/1?token=a&utm=x")
+        second = await parsehub.parse("https://counting.example.com/items/1?token=b")
+
+        self.assertEqual(CountingParser.calls, 1)
+        self.assertIsNot(first, second)
+        self.assertEqual(second.raw_url, "https://counting.example.com/items/1")
+        self.assertEqual(second.media.width, 720)
+        self.assertEqual((cache.stats.hits, cache.stats.misses), (1, 1))
+        self.assertEqual(cache.platform_stats[Platform.TIEBA].hit_rate, 0.5)
+
+    async def test_platform_ttl_controls_expiry_and_opt_out(self):
+        parsehub = self.hub(ParseCache(platform_ttl={Platform.TIEBA: 60}))
+        await parsehub.parse("https://counting.example.com/items/1")
+        with patch("parsehub.cache.time.time", return_value=10**12):
+            await parsehub.parse("https://counting.example.com/items/1")
+        self.assertEqual(CountingParser.calls, 2)
+
+        parsehub = self.hub(ParseCache(platform_ttl={Platform.TIEBA: 0}))
+        await parsehub.parse("https://counting.example.com/items/1")
+        await parsehub.parse("https://counting.example.com/items/1")
+        self.assertEqual(CountingParser.calls, 4)
+
+    async def test_cookie_results_are_cached_separately(self):
+        parsehub = self.hub(ParseCache())
+
+        await parsehub.parse("https://counting.example.com/items/1")
+        await parsehub.parse("https://counting.example.com/items/1", cookie="SESSDATA=a")
+        await parsehub.parse("https://counting.example.com/items/1", cookie="SESSDATA=a")
+
+        self.assertEqual(CountingParser.calls, 2)
+
+    async def test_memory_cache_evicts_least_recently_used(self):
+        backend = MemoryCache(maxsize=2)
+        parsehub = self.hub(ParseCache(backend))
+
+        for i in (1, 2, 1, 3, 1):
+            await parsehub.parse(f"https://counting.example.com/items/{i}")
+
+        self.assertEqual(len(backend), 2)
+        self.assertEqual(CountingParser.calls, 3)
+
+    async def test_sqlite_cache_survives_new_instances(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = f"{tmp}/cache.sqlite3"
+            for _ in range(2):
+                cache = ParseCache(SQLiteCache(path))
+                result = await self.hub(cache).parse("https://counting.example.com/items/1")
+                await cache.aclose()
+
+        self.assertEqual(CountingParser.calls, 1)
+        self.assertEqual((cache.stats.hits, cache.stats.misses), (1, 0))
+        self.assertEqual(result.title, "https://counting.example.com/items/1")
+
+
+class TestRequestCoalescing(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.parsehub = ParseHub()
+        self.parsehub.parsers = [ViralParser]
+        ViralParser.calls = 0
+        ViralParser.fail = False
+        SharedVideoParseResult.downloads = 0
+
+    async def test_concurrent_parses_of_same_canonical_url_share_one_fetch(self):
+        results = await asyncio.gather(
+            *(self.parsehub.parse(f"https://viral.example.com/items/1?from=user{i}") for i in range(5)),
+            self.parsehub.parse("https://viral.example.com/items/2"),
+        )
+
+        self.assertEqual(ViralParser.calls, 2)
+        self.assertIs(results[0], results[4])
+        self.assertIsNot(results[0], results[5])
+        self.assertEqual(len(self.parsehub._parse_flight), 0)
+
+    async def test_concurrent_parses_share_the_exception(self):
+        ViralParser.fail = True
+
+        results = await asyncio.gather(
+            *(self.parsehub.parse("https://viral.example.com/items/1") for _ in range(3)), return_exceptions=True
+        )
+
+        self.assertEqual(ViralParser.calls, 1)
+        self.assertTrue(all(isinstance(r, ParseError) for r in results))
+
+    async def test_concurrent_downloads_share_one_download_and_broadcast_progress(self):
+        progress = []
+
+        async def callback(current, total, unit, name):
+            progress.append(name)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            results = await asyncio.gather(
+                *(
+                    self.parsehub.download(
+                        "https://viral.example.com/items/1", tmp, callback=callback, callback_args=(f"user{i}",)
+                    )
+                    for i in range(3)
+                )
+            )
+
+        self.assertEqual((ViralParser.calls, SharedVideoParseResult.downloads), (1, 1))
+        self.assertIs(results[0], results[2])
+        self.assertEqual(sorted(progress), ["user0", "user1", "user2"])
+        self.assertEqual(self.parsehub._download_listeners, {})
+
+    async def test_failing_progress_callback_does_not_break_other_waiters(self):
+        progress = []
+
+        async def callback(current, total, unit, name):
+            if name == "broken":
+                raise RuntimeError("callback exploded")
+            progress.append((name, current, total))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            results = await asyncio.gather(
+                *(
+                    self.parsehub.download(
+                        "https://viral.example.com/items/1", tmp, callback=callback, callback_args=(name,)
+                    )
+                    for name in ("broken", "user")
+                )
+            )
+
+        self.assertEqual(SharedVideoParseResult.downloads, 1)
+        self.assertIs(results[0], results[1])
+        self.assertEqual(progress, [("user", 1, 1)])
+        self.assertEqual(self.parsehub._download_listeners, {})
+
+    async def test_singleflight_keeps_running_until_every_waiter_cancels(self):
+        flight = SingleFlight()
+        started = asyncio.Event()
+
+        async def work():
+            started.set()
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.create_task(flight.do("key", work))
+        second = asyncio.create_task(flight.do("key", work))
+        await started.wait()
+        first.cancel()
+
+        self.assertEqual(await second, "done")
+        with self.assertRaises(asyncio.CancelledError):
+            await first
+
+        lone = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+        lone.cancel()
+        await asyncio.gather(lone, return_exceptions=True)
+        self.assertNotIn("key", flight)
+
+
+class FakeDownloader:
+    """替代 parsehub.types.result.download, 记录并发数并按 URL 控制耗时和失败"""
+
+    def __init__(self, fail: str | None = None):
+        self.fail = fail
+        self.active = 0
+        self.peak = 0
+        self.cancelled: list[str] = []
+
+    async def __call__(self, url, save_path, *, headers=None, proxy=None, progress=None, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            delay = int(url.rsplit("/", 1)[-1]) / 100
+            if progress:
+                await progress(0, 10)
+            await asyncio.sleep(delay)
+            if url == self.fail:
+                raise httpx.ConnectError("boom")
+            with open(save_path, "wb") as f:
+                f.write(b"0123456789")
+            if progress:
+                await progress(10, 10)
+            return save_path
+        except asyncio.CancelledError:
+            self.cancelled.append(url)
+            raise
+        finally:
+            self.active -= 1
+
+
+class TestConcurrentMediaDownload(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        concurrency = GlobalConfig.download_concurrency
+        self.addCleanup(setattr, GlobalConfig, "download_concurrency", concurrency)
+        GlobalConfig.download_concurrency = 2
+        # 耗时递减, 完成顺序与索引顺序相反
+        self.result = ImageParseResult(
+            photo=[ImageRef(url=f"https://cdn.example/{d}", width=1, height=1) for d in (4, 3, 2, 1)]
+        )
+
+    async def test_downloads_are_bounded_and_keep_index_order(self):
+        fake = FakeDownloader()
+        progress = []
+
+        async def callback(current, total, unit):
+            progress.append((current, total, unit))
+
+        with tempfile.TemporaryDirectory() as tmp, patch("parsehub.types.result.download", fake):
+            result = await self.result.download(tmp, callback=callback)
+
+        self.assertEqual(fake.peak, 2)
+        self.assertEqual([os.path.basename(m.path) for m in result.media], ["0.jpg", "1.jpg", "2.jpg", "3.jpg"])
+        self.assertEqual(progress, [(i, 4, "count") for i in range(1, 5)])
+
+    async def test_media_info_is_read_off_the_event_loop(self):
+        threads = []
+
+        def read(path):
+            threads.append(threading.get_ident())
+            return MediaInfo(width=2, height=3)
+
+        post = ImageParseResult(photo=["https://cdn.example/2", "https://cdn.example/1"])
+        with (
+            tempfile.TemporaryDirectory() as tmp,
+            patch("parsehub.types.result.download", FakeDownloader()),
+            patch("parsehub.types.media_file.MediaInfoReader.read", side_effect=read),
+        ):
+            result = await post.download(tmp)
+
+        self.assertEqual([(m.width, m.height) for m in result.media], [(2, 3), (2, 3)])
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(threading.get_ident(), threads)
+
+    async def test_aggregate_bytes_reports_total_of_all_files(self):
+        progress = []
+
+        async def callback(current, total, unit):
+            progress.append((current, total, unit))
+
+        with tempfile.TemporaryDirectory() as tmp, patch("parsehub.types.result.download", FakeDownloader()):
+            await self.result.download(tmp, callback=callback, aggregate_bytes=True)
+
+        self.assertTrue(all(unit == "bytes" for _, _, unit in progress))
+        self.assertEqual(progress[-1][:2], (40, 40))
+
+    async def test_failure_cancels_siblings_and_removes_output_dir(self):
+        fake = FakeDownloader(fail="https://cdn.example/3")
+
+        with tempfile.TemporaryDirectory() as tmp, patch("parsehub.types.result.download", fake):
+            with self.assertRaises(DownloadError):
+                await self.result.download(tmp)
+            self.assertEqual(os.listdir(tmp), [])
+
+        self.assertEqual(fake.active, 0)
+        self.assertIn("https://cdn.example/4", fake.cancelled)
+
+
 class TestParseResultToDict(unittest.TestCase):
     def test_video_parse_result_to_dict_serializes_platform_type_and_single_media(self):
         result = VideoParseResult(
@@ -379,6 +1262,928 @@ class TestPlatformUrlMatching(unittest.TestCase):
                 self.assertIsNone(parsehub.get_platform(url))
 
 
+class TestHttpClientPool(unittest.IsolatedAsyncioTestCase):
+    async def test_pool_reuses_clients_per_proxy_and_scope(self):
+        async with HttpClientPool() as pool:
+            client = pool.get(scope="xhs")
+
+            self.assertIs(pool.get(scope="xhs"), client)
+            self.assertIsNot(pool.get(scope="tieba"), client)
+            self.assertIsNot(pool.get(scope="xhs", proxy="http://127.0.0.1:7890"), client)
+            self.assertEqual(len(pool), 3)
+
+        self.assertTrue(client.is_closed)
+        self.assertEqual(len(pool), 0)
+        with self.assertRaises(RuntimeError):
+            pool.get()
+
+    async def test_http_client_borrows_from_active_pool(self):
+        async with HttpClientPool() as pool:
+            with use_http_pool(pool):
+                async with http_client(scope="weibo") as client:
+                    pass
+
+                self.assertIs(client, pool.get(scope="weibo"))
+                self.assertFalse(client.is_closed)
+
+    async def test_http_client_without_pool_closes_temporary_client(self):
+        self.assertIsNone(get_http_pool())
+
+        async with http_client(scope="weibo") as client:
+            self.assertFalse(client.is_closed)
+
+        self.assertTrue(client.is_closed)
+
+    async def test_discarded_client_is_replaced_and_closed_with_pool(self):
+        async with HttpClientPool() as pool:
+            client = pool.get()
+            pool.discard(client)
+
+            self.assertIsNot(pool.get(), client)
+            self.assertFalse(client.is_closed)
+
+        self.assertTrue(client.is_closed)
+
+    async def test_pool_evicts_least_recently_used_clients(self):
+        with patch("parsehub.utils.http_client._RETIRE_GRACE", 0):
+            async with HttpClientPool(max_clients=2) as pool:
+                a = pool.get(scope="a")
+                b = pool.get(scope="b")
+                self.assertIs(pool.get(scope="a"), a)
+                pool.get(scope="c")
+                await asyncio.sleep(0)
+
+                self.assertEqual(len(pool), 2)
+                self.assertTrue(b.is_closed)
+                self.assertFalse(a.is_closed)
+                self.assertIsNot(pool.get(scope="b"), b)
+
+    async def test_pool_evicts_idle_clients(self):
+        with patch("parsehub.utils.http_client._RETIRE_GRACE", 0):
+            async with HttpClientPool(idle_timeout=0) as pool:
+                client = pool.get()
+                self.assertIsNot(pool.get(), client)
+                await asyncio.sleep(0)
+
+                self.assertEqual(len(pool), 1)
+                self.assertTrue(client.is_closed)
+
+    async def test_parsehub_context_manager_owns_pool(self):
+        async with ParseHub() as hub:
+            pool = hub.http
+            self.assertIsNotNone(pool)
+            self.assertIs(get_http_pool(), pool)
+
+        self.assertIsNone(hub.http)
+        self.assertIsNone(get_http_pool())
+        self.assertTrue(pool.closed)
+
+
+class CookieHandler(BaseHTTPRequestHandler):
+    """/login?user=... 设置 session Cookie, 其他路径返回请求中的 Cookie 头"""
+
+    def do_GET(self):
+        self.send_response(200)
+        if self.path.startswith("/login"):
+            self.send_header("Set-Cookie", f"session={parse_qs(urlparse(self.path).query)['user'][0]}; Path=/")
+        body = self.headers.get("Cookie", "").encode()
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHttpClientPoolCookies(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), CookieHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    async def test_pooled_client_does_not_keep_response_cookies(self):
+        async with HttpClientPool() as pool:
+            client = pool.get(scope="bilibili")
+
+            await client.get(f"{self.base}/login?user=alice")
+            response = await client.get(f"{self.base}/echo")
+
+            self.assertEqual(response.text, "")
+            self.assertEqual(len(client.cookies), 0)
+
+    async def test_borrowed_cookies_stay_within_the_borrow(self):
+        async with HttpClientPool() as pool:
+            with use_http_pool(pool):
+                async with http_client(scope="weibo", cookies={"uid": "1"}) as client:
+                    await client.get(f"{self.base}/login?user=alice")
+                    first = (await client.get(f"{self.base}/echo")).text
+                async with http_client(scope="weibo") as other:
+                    second = (await other.get(f"{self.base}/echo")).text
+
+        self.assertIs(other, client)
+        self.assertEqual(sorted(first.split("; ")), ["session=alice", "uid=1"])
+        self.assertEqual(second, "")
+
+
+class RedirectHandler(BaseHTTPRequestHandler):
+    requests: list[tuple[str, str]] = []
+
+    def do_GET(self):
+        type(self).requests.append(("GET", self.path))
+        if self.path.startswith("/s/"):
+            self.send_response(302)
+            self.send_header("Location", f"/hop/{self.path[3:]}")
+            self.end_headers()
+        elif self.path.startswith("/hop/"):
+            self.send_response(301)
+            self.send_header("Location", f"/video/{self.path[5:]}?share_id=1")
+            self.end_headers()
+        elif self.path.startswith("/loop"):
+            self.send_response(302)
+            self.send_header("Location", "/loop")
+            self.end_headers()
+        elif self.path.startswith("/signed/"):
+            self.send_response(302)
+            self.send_header("Location", f"/video/{self.path[8:]}?xsec_token=abc&xsec_source=pc_share")
+            self.end_headers()
+        else:
+            self.send_response(200)
+            self.send_header("Content-Length", str(1024 * 1024))
+            self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestRedirectResolver(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), RedirectHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        RedirectHandler.requests = []
+
+    async def test_resolve_follows_each_hop_and_caches_result(self):
+        resolver = RedirectResolver()
+
+        first = await resolver.resolve(f"{self.base}/s/abc")
+        second = await resolver.resolve(f"{self.base}/s/abc")
+
+        self.assertEqual(first, f"{self.base}/video/abc?share_id=1")
+        self.assertEqual(second, first)
+        self.assertEqual(
+            RedirectHandler.requests, [("GET", "/s/abc"), ("GET", "/hop/abc"), ("GET", "/video/abc?share_id=1")]
+        )
+
+    async def test_resolve_does_not_cache_urls_with_tokens(self):
+        resolver = RedirectResolver()
+
+        first = await resolver.resolve(f"{self.base}/signed/abc")
+        second = await resolver.resolve(f"{self.base}/signed/abc")
+
+        self.assertEqual(first, f"{self.base}/video/abc?xsec_token=abc&xsec_source=pc_share")
+        self.assertEqual(second, first)
+        self.assertEqual(len(resolver), 0)
+        self.assertEqual(len(RedirectHandler.requests), 4)
+
+    async def test_resolve_cache_is_bounded(self):
+        resolver = RedirectResolver(maxsize=1)
+
+        await resolver.resolve(f"{self.base}/s/a")
+        await resolver.resolve(f"{self.base}/s/b")
+
+        self.assertEqual(len(resolver), 1)
+        self.assertIsNone(resolver.get_cached(f"{self.base}/s/a"))
+
+    async def test_resolve_raises_on_redirect_loop(self):
+        resolver = RedirectResolver(max_redirects=3)
+
+        with self.assertRaises(httpx.TooManyRedirects):
+            await resolver.resolve(f"{self.base}/loop")
+        self.assertEqual(len(RedirectHandler.requests), 4)
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """/file 支持 Range, /plain 忽略 Range, /flaky 中第一个非首段的请求只返回一半正文后断开
+
+    /go 重定向到 /media/clip%20one.mp4, /named 通过 Content-Disposition 返回文件名,
+    /broken-once 第一次请求只返回一半正文后断开, 之后支持 Range; If-Range 与 ETag 不符时返回完整文件
+    """
+
+    protocol_version = "HTTP/1.1"
+    body = bytes(range(256)) * 40
+    etag: str | None = '"v1"'
+    last_modified: str | None = None
+    requests: list[tuple[str, str | None]] = []
+    referers: list[str | None] = []
+    if_ranges: list[str | None] = []
+    ports: set[int] = set()
+    flaky_failed = False
+
+    def do_GET(self):
+        cls = type(self)
+        cls.requests.append((self.path, self.headers.get("Range")))
+        cls.referers.append(self.headers.get("Referer"))
+        cls.if_ranges.append(self.headers.get("If-Range"))
+        cls.ports.add(self.client_address[1])
+        if self.path == "/go":
+            self.send_response(302)
+            self.send_header("Location", "/media/clip%20one.mp4?sign=1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path == "/broken-once" and not cls.flaky_failed:
+            cls.flaky_failed = True
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(cls.body)))
+            self.end_headers()
+            self.wfile.write(cls.body[: len(cls.body) // 2])
+            self.wfile.flush()
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range") or "")
+        if self.headers.get("If-Range") not in (None, cls.etag):
+            match = None
+        if self.path not in ("/file", "/flaky", "/broken-once") or not match:
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(cls.body)))
+            if cls.etag:
+                self.send_header("ETag", cls.etag)
+            if cls.last_modified:
+                self.send_header("Last-Modified", cls.last_modified)
+            if self.path == "/named":
+                self.send_header("Content-Disposition", "attachment; filename*=UTF-8''%E8%A7%86%E9%A2%91.mp4")
+            self.end_headers()
+            self.wfile.write(cls.body)
+            return
+
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else len(cls.body) - 1
+        data = cls.body[start : end + 1]
+        self.send_response(206)
+        self.send_header("ETag", cls.etag)
+        self.send_header("Content-Range", f"bytes {start}-{end}/{len(cls.body)}")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if self.path == "/flaky" and start > 0 and end > start and not cls.flaky_failed:
+            cls.flaky_failed = True
+            self.wfile.write(data[: len(data) // 2])
+            self.wfile.flush()
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestDownloader(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        RangeHandler.requests = []
+        RangeHandler.referers = []
+        RangeHandler.if_ranges = []
+        RangeHandler.ports = set()
+        RangeHandler.flaky_failed = False
+        patcher = patch("parsehub.utils.downloader.SEGMENT_MIN_SIZE", 1024)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def download(self, path: str, **kwargs) -> bytes:
+        with tempfile.TemporaryDirectory() as tmp:
+            saved = await download(f"{self.base}{path}", os.path.join(tmp, "video.mp4"), **kwargs)
+            with open(saved, "rb") as f:
+                return f.read()
+
+    async def test_filename_comes_from_final_url_of_the_download_request(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            saved = await download(f"{self.base}/go", f"{tmp}/")
+
+            self.assertEqual(os.path.basename(saved), "clip one.mp4")
+        self.assertEqual(RangeHandler.requests, [("/go", None), ("/media/clip%20one.mp4?sign=1", None)])
+
+    async def test_filename_comes_from_content_disposition(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            saved = await download(f"{self.base}/named", f"{tmp}/")
+
+            self.assertEqual(os.path.basename(saved), "视频.mp4")
+        self.assertEqual(RangeHandler.requests, [("/named", None)])
+
+    async def test_segmented_download_takes_filename_from_probe(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            saved = await download(f"{self.base}/file", f"{tmp}/", segments=2)
+
+            self.assertEqual(os.path.basename(saved), "file")
+        self.assertEqual(len(RangeHandler.requests), 3)
+
+    async def test_files_of_a_post_share_one_connection(self):
+        concurrency = GlobalConfig.download_concurrency
+        self.addCleanup(setattr, GlobalConfig, "download_concurrency", concurrency)
+        GlobalConfig.download_concurrency = 1
+        result = ImageParseResult(photo=[ImageRef(url=f"{self.base}/plain?{i}", width=1, height=1) for i in range(3)])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            await result.download(tmp)
+
+        self.assertEqual(len(RangeHandler.requests), 3)
+        self.assertEqual(len(RangeHandler.ports), 1)
+
+    async def test_protocol_error_retries_with_a_new_client(self):
+        async with DownloadSession() as session:
+            data = await self.download("/broken-once")
+            retired = [client for client, _ in session.pool._retired]
+
+        self.assertEqual(data, RangeHandler.body)
+        self.assertEqual(len(RangeHandler.requests), 2)
+        self.assertEqual(len(retired), 1)
+        self.assertTrue(retired[0].is_closed)
+
+    async def test_digest_is_computed_while_downloading(self):
+        for path, kwargs in (("/file", {}), ("/file", {"segments": 4}), ("/broken-once", {})):
+            with self.subTest(path=path, **kwargs):
+                RangeHandler.flaky_failed = False
+                digest = StreamingDigest("blake2b")
+                await self.download(path, digest=digest, **kwargs)
+
+                self.assertEqual(digest.hexdigest(), hashlib.blake2b(RangeHandler.body).hexdigest())
+                self.assertEqual(digest.size, len(RangeHandler.body))
+
+    async def test_header_is_probed_while_downloading(self):
+        body = mp4_file(640, 360, 4500, mdat_size=20_000)
+        expected = MediaInfo(width=640, height=360, duration=5)
+        with patch.object(RangeHandler, "body", body):
+            for path, kwargs in (("/file", {}), ("/file", {"segments": 4}), ("/broken-once", {})):
+                with self.subTest(path=path, **kwargs):
+                    RangeHandler.flaky_failed = False
+                    probe = HeaderProbe()
+                    await self.download(path, probe=probe, **kwargs)
+
+                    self.assertEqual(probe.info, expected)
+
+            # 续传时已下载的文件头从 part 文件读取
+            with tempfile.TemporaryDirectory() as tmp:
+                path = self.write_part(tmp, body[:100], etag=RangeHandler.etag)
+                probe = HeaderProbe()
+                await download(f"{self.base}/file", path, probe=probe)
+
+                self.assertEqual(probe.info, expected)
+                self.assertEqual(RangeHandler.requests[-1], ("/file", "bytes=100-"))
+
+            result = VideoParseResult(video=VideoRef(url=f"{self.base}/file"))
+            with (
+                tempfile.TemporaryDirectory() as tmp,
+                patch.object(MediaInfoReader, "read", side_effect=AssertionError("文件被再次读取")),
+            ):
+                downloaded = await result.download(tmp)
+
+        self.assertEqual((downloaded.media.width, downloaded.media.height, downloaded.media.duration), (640, 360, 5))
+
+    async def test_post_video_download_uses_single_request_by_default(self):
+        result = VideoParseResult(video=VideoRef(url=f"{self.base}/file"))
+        with tempfile.TemporaryDirectory() as tmp, patch.object(RangeHandler, "body", mp4_file(640, 360, 4500)):
+            await result.download(tmp)
+
+        self.assertEqual(RangeHandler.requests, [("/file", None)])
+
+    def write_part(self, tmp: str, data: bytes, **state) -> Path:
+        path = Path(tmp, "video.mp4")
+        Path(tmp, "video.mp4.part").write_bytes(data)
+        state = {"url": f"{self.base}/file", "length": len(RangeHandler.body), **state}
+        Path(tmp, "video.mp4.part.json").write_text(json.dumps(state))
+        return path
+
+    async def test_part_file_is_resumed_with_if_range(self):
+        half = len(RangeHandler.body) // 2
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.write_part(tmp, RangeHandler.body[:half], etag=RangeHandler.etag)
+            await download(f"{self.base}/file", path)
+
+            self.assertEqual(path.read_bytes(), RangeHandler.body)
+            self.assertEqual(sorted(os.listdir(tmp)), ["video.mp4"])
+        self.assertEqual(RangeHandler.requests, [("/file", f"bytes={half}-")])
+        self.assertEqual(RangeHandler.if_ranges, [RangeHandler.etag])
+
+    async def test_changed_remote_file_is_downloaded_again(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.write_part(tmp, b"stale" * 100, etag='"old"')
+            await download(f"{self.base}/file", path)
+
+            self.assertEqual(path.read_bytes(), RangeHandler.body)
+            self.assertEqual(sorted(os.listdir(tmp)), ["video.mp4"])
+
+    async def test_part_file_without_sidecar_is_discarded(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            Path(tmp, "video.mp4.part").write_bytes(b"stale" * 100)
+            saved = await download(f"{self.base}/file", os.path.join(tmp, "video.mp4"))
+
+            self.assertEqual(Path(saved).read_bytes(), RangeHandler.body)
+        self.assertEqual(RangeHandler.requests, [("/file", None)])
+
+    async def test_finished_file_is_skipped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "video.mp4")
+            await download(f"{self.base}/file", path, resume=True)
+            self.assertEqual(sorted(os.listdir(tmp)), ["video.mp4", "video.mp4.done.json"])
+            RangeHandler.requests = []
+            digest = StreamingDigest()
+            probe = HeaderProbe()
+
+            saved = await download(f"{self.base}/file", path, digest=digest, probe=probe, resume=True)
+
+            self.assertEqual(Path(saved).read_bytes(), RangeHandler.body)
+            self.assertTrue(probe.done)
+        self.assertEqual(RangeHandler.requests, [])
+        # 跳过下载时摘要从磁盘计算
+        self.assertEqual(digest.hexdigest(), hashlib.sha256(RangeHandler.body).hexdigest())
+
+    async def test_finished_file_is_downloaded_again_without_resume(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "video.mp4")
+            await download(f"{self.base}/file", path, resume=True)
+            await download(f"{self.base}/file", path)
+
+            # 不续传时删除旧的完成记录, 输出目录中只有下载的文件
+            self.assertEqual(sorted(os.listdir(tmp)), ["video.mp4"])
+        self.assertEqual(RangeHandler.requests, [("/file", None), ("/file", None)])
+
+    async def test_existing_file_from_another_url_is_replaced(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "video.mp4")
+            Path(path).write_bytes(b"done")
+            await download(f"{self.base}/plain", path, resume=True)
+            # 完成记录属于 /plain, 同名文件不能作为 /file 的下载结果
+            digest = StreamingDigest()
+            await download(f"{self.base}/file", path, digest=digest, resume=True)
+
+            self.assertEqual(Path(path).read_bytes(), RangeHandler.body)
+        self.assertEqual(RangeHandler.requests, [("/plain", None), ("/file", None)])
+        self.assertEqual(digest.hexdigest(), hashlib.sha256(RangeHandler.body).hexdigest())
+
+    async def test_complete_part_file_is_committed_with_digest(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.write_part(tmp, RangeHandler.body, etag=RangeHandler.etag)
+            digest = StreamingDigest()
+            await download(f"{self.base}/file", path, digest=digest)
+
+            self.assertEqual(sorted(os.listdir(tmp)), ["video.mp4"])
+        self.assertEqual(RangeHandler.requests, [])
+        self.assertEqual(digest.hexdigest(), hashlib.sha256(RangeHandler.body).hexdigest())
+
+    async def test_post_download_resumes_in_the_same_directory(self):
+        concurrency = GlobalConfig.download_concurrency
+        self.addCleanup(setattr, GlobalConfig, "download_concurrency", concurrency)
+        GlobalConfig.download_concurrency = 1
+        result = MultimediaParseResult(
+            title="clip",
+            media=[ImageRef(url=f"{self.base}/{path}", width=1, height=1) for path in ("plain", "broken-once")],
+        )
+        result.raw_url = "https://example.com/post/1"
+        with tempfile.TemporaryDirectory() as tmp:
+            # 第二个文件中断且不重试, 目录和未完成的文件保留
+            with (
+                patch("parsehub.types.result.download", partial(download, max_retries=0)),
+                self.assertRaises(DownloadError),
+            ):
+                await result.download(tmp, resume=True)
+            (output_dir,) = Path(tmp).iterdir()
+            self.assertIn("1.jpg.part", os.listdir(output_dir))
+            RangeHandler.requests = []
+
+            downloaded = await result.download(tmp, resume=True, digest="sha256")
+
+            self.assertEqual(downloaded.output_dir, output_dir)
+            self.assertEqual([Path(m.path).read_bytes() for m in downloaded.media], [RangeHandler.body] * 2)
+            self.assertEqual([m.digest for m in downloaded.media], [hashlib.sha256(RangeHandler.body).hexdigest()] * 2)
+        # 已完成的文件不再请求, 中断的文件从已下载的位置续传
+        self.assertEqual(len(RangeHandler.requests), 1)
+        self.assertRegex(RangeHandler.requests[0][1], r"^bytes=[1-9]\d*-$")
+
+    async def test_post_download_without_resume_removes_directory_on_failure(self):
+        result = ImageParseResult(title="clip", photo=[ImageRef(url=f"{self.base}/broken-once", width=1, height=1)])
+        with tempfile.TemporaryDirectory() as tmp:
+            with (
+                patch("parsehub.types.result.download", partial(download, max_retries=0)),
+                self.assertRaises(DownloadError),
+            ):
+                await result.download(tmp)
+
+            self.assertEqual(os.listdir(tmp), [])
+
+    async def test_interrupted_download_resumes_in_next_call(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "video.mp4")
+            with self.assertRaises(DownloaderError):
+                await download(f"{self.base}/broken-once", path, max_retries=0)
+            self.assertEqual(sorted(os.listdir(tmp)), ["video.mp4.part", "video.mp4.part.json"])
+
+            await download(f"{self.base}/broken-once", path)
+
+            self.assertEqual(Path(path).read_bytes(), RangeHandler.body)
+        self.assertRegex(RangeHandler.requests[1][1], r"^bytes=[1-9]\d*-$")
+
+    async def read_stream(self, chunks) -> bytes:
+        async with aclosing(chunks) as stream:
+            return b"".join([chunk async for chunk in stream])
+
+    async def test_stream_uses_platform_headers(self):
+        result = DouyinVideoParseResult(video=f"{self.base}/file")
+
+        data = await self.read_stream(result.stream())
+
+        self.assertEqual(data, RangeHandler.body)
+        self.assertEqual(RangeHandler.referers, ["https://www.douyin.com/"])
+
+    async def test_stream_resumes_from_read_position_after_disconnect(self):
+        result = VideoParseResult(video=f"{self.base}/broken-once")
+
+        data = await self.read_stream(result.stream())
+
+        self.assertEqual(data, RangeHandler.body)
+        self.assertEqual(len(RangeHandler.requests), 2)
+        self.assertRegex(RangeHandler.requests[1][1], r"^bytes=[1-9]\d*-$")
+
+    async def test_abandoned_stream_does_not_hold_host_slot(self):
+        limit = GlobalConfig.download_host_connections
+        self.addCleanup(setattr, GlobalConfig, "download_host_connections", limit)
+        GlobalConfig.download_host_connections = 1
+        body = os.urandom(1024 * 1024)
+        with patch.object(RangeHandler, "body", body):
+            chunks = iter_bytes(f"{self.base}/file", chunk_size=1024, max_chunk_size=1024)
+
+            first = await anext(chunks)
+            # 迭代中途不修改调用方上下文中的客户端池, 也不占用同一域名唯一的连接槽位
+            self.assertIsNone(get_http_pool())
+            data = await asyncio.wait_for(self.download("/file"), 5)
+            await chunks.aclose()
+
+        self.assertTrue(0 < len(first) < len(body))
+        self.assertEqual(data, body)
+
+    async def test_iter_media_opens_streams_lazily(self):
+        result = ImageParseResult(photo=[f"{self.base}/file", f"{self.base}/named"])
+
+        refs, data = [], []
+        async for media, chunks in result.iter_media():
+            self.assertEqual(len(RangeHandler.requests), len(data))
+            refs.append(media.url)
+            data.append(await self.read_stream(chunks))
+
+        self.assertEqual(refs, [f"{self.base}/file", f"{self.base}/named"])
+        self.assertEqual(data, [RangeHandler.body] * 2)
+
+    async def test_stream_rejects_invalid_index(self):
+        result = VideoParseResult(video=f"{self.base}/file")
+
+        with self.assertRaises(DownloadError):
+            await self.read_stream(result.stream(1))
+        with self.assertRaises(DownloadError):
+            await self.read_stream(result.stream(0, live_photo_video=True))
+
+    async def test_segments_are_fetched_concurrently_into_one_file(self):
+        progress = []
+
+        async def on_progress(current, total):
+            progress.append((current, total))
+
+        data = await self.download("/file", segments=4, progress=on_progress)
+
+        self.assertEqual(data, RangeHandler.body)
+        ranges = sorted(r for _, r in RangeHandler.requests)
+        self.assertEqual(
+            ranges, ["bytes=0-0", "bytes=0-2559", "bytes=2560-5119", "bytes=5120-7679", "bytes=7680-10239"]
+        )
+        self.assertEqual(progress[-1], (len(RangeHandler.body), len(RangeHandler.body)))
+
+    async def test_small_files_use_fewer_segments(self):
+        with patch("parsehub.utils.downloader.SEGMENT_MIN_SIZE", 6000):
+            data = await self.download("/file", segments=4)
+
+        self.assertEqual(data, RangeHandler.body)
+        self.assertEqual(len(RangeHandler.requests), 3)
+
+    async def test_falls_back_to_single_stream_without_range_support(self):
+        data = await self.download("/plain", segments=4)
+
+        self.assertEqual(data, RangeHandler.body)
+        self.assertEqual(RangeHandler.requests, [("/plain", "bytes=0-0"), ("/plain", None)])
+
+    async def test_interrupted_segment_resumes_from_written_offset(self):
+        data = await self.download("/flaky", segments=2)
+
+        self.assertEqual(data, RangeHandler.body)
+        self.assertTrue(RangeHandler.flaky_failed)
+        # 断开前收到的半段数据已写入, 重试只请求剩余部分
+        self.assertEqual(RangeHandler.requests[-1], ("/flaky", "bytes=7680-10239"))
+
+
+class TestMediaStore(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        RangeHandler.requests = []
+        RangeHandler.etag = '"v1"'
+        RangeHandler.last_modified = None
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        store_dir = GlobalConfig.media_store_dir
+        self.addCleanup(setattr, GlobalConfig, "media_store_dir", store_dir)
+        GlobalConfig.media_store_dir = Path(self.tmp, "store")
+
+    async def asyncTearDown(self):
+        await get_media_store().aclose()
+
+    async def download(self, url: str) -> str:
+        result = await ImageParseResult(photo=[ImageRef(url=url, width=1, height=1)]).download(self.tmp)
+        with open(result.media[0].path, "rb") as f:
+            self.assertEqual(f.read(), RangeHandler.body)
+        return result.media[0].path
+
+    def test_normalize_url_ignores_scheme_and_platform_signature_params(self):
+        self.assertEqual(
+            normalize_url("https://v3-web.douyinvod.com/v/a.mp4?x-expires=1&id=2&x-signature=a#frag"),
+            normalize_url("http://v3-web.douyinvod.com/v/a.mp4?x-signature=b&id=2&x-expires=9"),
+        )
+        self.assertEqual(normalize_url("https://sns-webpic-qc.xhscdn.com/a?sign=1&t=2"), "sns-webpic-qc.xhscdn.com/a")
+        self.assertNotEqual(
+            normalize_url("https://cdn.example/img?id=1"), normalize_url("https://cdn.example/img?id=2")
+        )
+        # 未知域名的参数可能决定内容, 全部保留
+        self.assertNotEqual(
+            normalize_url("https://cdn.example/img?t=1&sign=a"), normalize_url("https://cdn.example/img?t=2&sign=b")
+        )
+
+    async def test_repeated_download_is_linked_from_store(self):
+        first = await self.download(f"{self.base}/plain")
+        RangeHandler.requests = []
+        second = await self.download(f"{self.base}/plain")
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(RangeHandler.requests, [("/plain", "bytes=0-0")])
+        self.assertEqual(get_media_store().size(), len(RangeHandler.body))
+
+    async def test_response_without_etag_or_last_modified_downloads_again(self):
+        RangeHandler.etag = None
+        await self.download(f"{self.base}/plain")
+        RangeHandler.requests = []
+        await self.download(f"{self.base}/plain")
+
+        self.assertEqual(RangeHandler.requests, [("/plain", None)])
+
+    async def test_last_modified_is_compared_when_etag_is_missing(self):
+        RangeHandler.etag = None
+        RangeHandler.last_modified = "Wed, 21 Oct 2026 07:28:00 GMT"
+        await self.download(f"{self.base}/plain")
+        RangeHandler.requests = []
+        await self.download(f"{self.base}/plain")
+        RangeHandler.last_modified = "Thu, 22 Oct 2026 07:28:00 GMT"
+        await self.download(f"{self.base}/plain")
+
+        self.assertEqual(RangeHandler.requests, [("/plain", "bytes=0-0"), ("/plain", "bytes=0-0"), ("/plain", None)])
+
+    async def test_digest_is_passed_to_store_and_returned_on_hit(self):
+        expected = hashlib.sha256(RangeHandler.body).hexdigest()
+        post = ImageParseResult(photo=[ImageRef(url=f"{self.base}/plain", width=1, height=1)])
+        with patch.object(MediaStore, "_add", autospec=True, side_effect=MediaStore._add) as add:
+            first = await post.download(self.tmp, digest="sha256")
+        second = await post.download(self.tmp, digest="sha256")
+
+        self.assertEqual(add.call_args.args[-1], expected)
+        self.assertEqual([first.media[0].digest, second.media[0].digest], [expected, expected])
+        self.assertEqual(second.digest_algorithm, "sha256")
+        self.assertTrue(get_media_store().object_path(expected).exists())
+
+    async def test_changed_etag_downloads_again(self):
+        await self.download(f"{self.base}/plain")
+        RangeHandler.etag = '"v2"'
+        RangeHandler.requests = []
+        await self.download(f"{self.base}/plain")
+
+        self.assertEqual(RangeHandler.requests, [("/plain", "bytes=0-0"), ("/plain", None)])
+
+    async def test_least_recently_used_objects_are_evicted(self):
+        store = MediaStore(Path(self.tmp, "lru"), max_size=2500)
+        for i in range(3):
+            path = Path(self.tmp, f"{i}.bin")
+            path.write_bytes(bytes([i]) * 1000)
+            await store.add(f"https://cdn.example/{i}.bin", path)
+
+        self.assertEqual(store.size(), 2000)
+        self.assertIsNone(store._lookup(normalize_url("https://cdn.example/0.bin")))
+        self.assertIsNotNone(store._lookup(normalize_url("https://cdn.example/2.bin")))
+        await store.aclose()
+
+
+class TestDownloadScheduler(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        for name in ("download_host_connections", "download_bandwidth", "download_platform_bandwidth"):
+            self.addCleanup(setattr, GlobalConfig, name, getattr(GlobalConfig, name))
+        self.scheduler = DownloadScheduler()
+
+    async def hold(self, url: str, log: list, name: str, delay: float = 0.01):
+        async with self.scheduler.transfer(url):
+            log.append(name)
+            await asyncio.sleep(delay)
+
+    async def test_connections_per_host_are_limited(self):
+        GlobalConfig.download_host_connections = 2
+        active = {"a": 0, "b": 0}
+        peak = {"a": 0, "b": 0}
+
+        async def transfer(host: str):
+            async with self.scheduler.transfer(f"https://{host}.cdn.example/file"):
+                active[host] += 1
+                peak[host] = max(peak[host], active[host])
+                await asyncio.sleep(0.01)
+                active[host] -= 1
+
+        await asyncio.gather(*(transfer(host) for host in "aaaaaabb"))
+
+        self.assertEqual(peak, {"a": 2, "b": 2})
+        self.assertEqual(self.scheduler._hosts, {})
+
+    async def test_waiting_jobs_are_served_round_robin(self):
+        GlobalConfig.download_host_connections = 1
+        log: list[str] = []
+        url = "https://cdn.example/file"
+
+        async def job(name: str, count: int):
+            with download_job():
+                await asyncio.gather(*(self.hold(url, log, f"{name}{i}") for i in range(count)))
+
+        big = asyncio.create_task(job("a", 4))
+        await asyncio.sleep(0)
+        await asyncio.gather(big, job("b", 2))
+
+        self.assertEqual(log, ["a0", "a1", "b0", "a2", "b1", "a3"])
+
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        GlobalConfig.download_host_connections = 1
+        log: list[str] = []
+        url = "https://cdn.example/file"
+
+        first = asyncio.create_task(self.hold(url, log, "first", 0.05))
+        waiter = asyncio.create_task(self.hold(url, log, "cancelled"))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(first, waiter, return_exceptions=True)
+        await self.hold(url, log, "last")
+
+        self.assertEqual(log, ["first", "last"])
+
+    async def test_rebind_moves_slot_to_final_host(self):
+        GlobalConfig.download_host_connections = 1
+        log: list[str] = []
+
+        async with self.scheduler.transfer("https://short.example/s/1") as transfer:
+            await transfer.rebind("https://cdn.example/file")
+            # 短链接域名的槽位已释放, 同一 CDN 的其他下载需要等待
+            await self.hold("https://short.example/s/2", log, "short")
+            waiter = asyncio.create_task(self.hold("https://cdn.example/other", log, "cdn"))
+            await asyncio.sleep(0.02)
+            self.assertEqual(log, ["short"])
+        await waiter
+
+        self.assertEqual(log, ["short", "cdn"])
+        self.assertEqual(self.scheduler._hosts, {})
+
+    async def test_token_bucket_limits_rate(self):
+        bucket = TokenBucket(10_000)
+        started = time.monotonic()
+        await bucket.consume(10_000)
+        self.assertLess(time.monotonic() - started, 0.05)
+        await bucket.consume(2_000)
+        self.assertGreaterEqual(time.monotonic() - started, 0.18)
+
+    async def test_global_and_platform_buckets_apply_to_transfers(self):
+        GlobalConfig.download_bandwidth = 1_000_000
+        GlobalConfig.download_platform_bandwidth = {"douyin": 200_000}
+
+        async with self.scheduler.transfer("https://a.example/file") as plain:
+            pass
+        with download_job("douyin"):
+            async with self.scheduler.transfer("https://a.example/file") as douyin:
+                pass
+
+        self.assertEqual([b.rate for b in plain.buckets], [1_000_000])
+        self.assertEqual([b.rate for b in douyin.buckets], [1_000_000, 200_000])
+
+
+class TestProgressThrottle(unittest.IsolatedAsyncioTestCase):
+    async def test_updates_are_coalesced_but_completion_is_always_reported(self):
+        calls = []
+
+        async def callback(current, total, name):
+            calls.append((current, total, name))
+
+        throttle = ProgressThrottle(callback, args=("a",), interval=60)
+        for current in range(0, 101, 10):
+            await throttle(current, 100)
+
+        self.assertEqual(calls, [(0, 100, "a"), (100, 100, "a")])
+
+    async def test_byte_and_percent_thresholds(self):
+        calls = []
+
+        async def callback(current, total):
+            calls.append(current)
+
+        by_bytes = ProgressThrottle(callback, interval=0, min_bytes=30)
+        for current in range(10, 100, 10):
+            await by_bytes(current, 0)
+        await by_bytes.flush()
+        self.assertEqual(calls, [30, 60, 90])
+
+        calls.clear()
+        by_percent = ProgressThrottle(callback, interval=0, min_percent=25)
+        for current in range(10, 201, 10):
+            await by_percent(current, 200)
+        self.assertEqual(calls, [50, 100, 150, 200])
+
+    async def test_adaptive_chunks_grow_and_keep_all_bytes(self):
+        async def stream():
+            for _ in range(64):
+                yield b"x" * 1024
+
+        sizes = [len(chunk) async for chunk in adaptive_chunks(stream(), 1024, 8192, target_interval=60)]
+
+        self.assertEqual(sum(sizes), 64 * 1024)
+        self.assertEqual(sizes[:4], [1024, 2048, 4096, 8192])
+        self.assertEqual(max(sizes), 8192)
+
+    async def test_adaptive_chunks_yield_buffered_bytes_before_error(self):
+        async def stream():
+            yield b"abc"
+            raise httpx.ReadError("boom")
+
+        received = []
+        with self.assertRaises(httpx.ReadError):
+            async for chunk in adaptive_chunks(stream(), 1024, 1024):
+                received.append(chunk)
+
+        self.assertEqual(received, [b"abc"])
+
+
+class TestBufferedFileWriter(unittest.IsolatedAsyncioTestCase):
+    async def test_small_chunks_are_coalesced_into_large_writes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "file.bin")
+            async with BufferedFileWriter(path, buffer_size=4096) as f:
+                with patch.object(f._file, "write", wraps=f._file.write) as write:
+                    for i in range(100):
+                        await f.write(bytes([i]) * 100)
+                    await f.flush()
+
+            with open(path, "rb") as fp:
+                self.assertEqual(fp.read(), b"".join(bytes([i]) * 100 for i in range(100)))
+            self.assertEqual(write.call_count, 3)
+
+    async def test_writes_at_offset_and_flushes_on_error(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "file.bin")
+            async with BufferedFileWriter(path) as f:
+                await f.truncate(10)
+            with self.assertRaises(ValueError):
+                async with BufferedFileWriter(path, "r+b", offset=4) as f:
+                    await f.write(b"abc")
+                    raise ValueError
+
+            with open(path, "rb") as fp:
+                self.assertEqual(fp.read(), b"\0\0\0\0abc\0\0\0")
+
+
 class TestRunSyncInsideEventLoop(unittest.IsolatedAsyncioTestCase):
     async def test_run_sync_raises_inside_existing_event_loop(self):
         async def get_value():